@@ -1,9 +1,12 @@
 # backend/analyzer.py
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from resume_parser import parse_resume  # NEW fixed import
 from Courses import ds_course, web_course, android_course, ios_course, uiux_course
+from recommender import CourseRecommender
+from catalog import catalog_key
+from field_classifier import predict_field, FIELD_MIN_CONFIDENCE
 
 # ----------------- KEYWORD LISTS -----------------
 DS_KEYWORDS = [
@@ -33,6 +36,37 @@ UIUX_KEYWORDS = [
     'wireframes', 'prototyping', 'user research', 'ui/ux', 'design'
 ]
 
+FIELD_KEYWORDS = {
+    "Data Science": DS_KEYWORDS,
+    "Web Development": WEB_KEYWORDS,
+    "Android Development": ANDROID_KEYWORDS,
+    "iOS Development": IOS_KEYWORDS,
+    "UI/UX Design": UIUX_KEYWORDS,
+}
+
+FIELD_COURSES = {
+    "Data Science": ds_course,
+    "Web Development": web_course,
+    "Android Development": android_course,
+    "iOS Development": ios_course,
+    "UI/UX Design": uiux_course,
+}
+
+# catalog.py course list of each field, to resolve the aliases the frontend sends
+FIELD_CATALOG_KEYS = {
+    "Data Science": "data_science",
+    "Web Development": "web_development",
+    "Android Development": "android",
+    "iOS Development": "ios",
+    "UI/UX Design": "ui_ux",
+}
+_CATALOG_FIELDS = {key: field for field, key in FIELD_CATALOG_KEYS.items()}
+
+# Built once per process; see recommender.py
+course_recommender = CourseRecommender(FIELD_COURSES, FIELD_KEYWORDS)
+RECOMMENDED_COURSES = 10
+RECOMMENDED_SKILLS = 8
+
 # ----------------- ATS SCORE  -----------------
 def calculate_ats_score(text: str, skills: list, field_keywords: list):
     score = 0
@@ -92,40 +126,57 @@ def predict_candidate_level(text: str, pages: int) -> str:
 
 
 # ----------------- FIELD & RECOMMENDATIONS -----------------
-def detect_field_and_recommendations(skills):
+def detect_field(skills, text: Optional[str] = None) -> Tuple[str, Optional[float]]:
+    """
+    (field, confidence). The trained classifier (field_classifier.py) decides
+    when it is loaded and confident; otherwise the keyword rules below,
+    which have no confidence.
+    """
+    prediction = predict_field(text) if text else None
+    if prediction and prediction["confidence"] >= FIELD_MIN_CONFIDENCE and prediction["field"] in FIELD_KEYWORDS:
+        return prediction["field"], prediction["confidence"]
+
     s = [x.lower() for x in skills]
 
     def score(keywords):
         return sum(1 for k in keywords if k in s)
 
-    scores = {
-        "Data Science": score(DS_KEYWORDS),
-        "Web Development": score(WEB_KEYWORDS),
-        "Android Development": score(ANDROID_KEYWORDS),
-        "iOS Development": score(IOS_KEYWORDS),
-        "UI/UX Design": score(UIUX_KEYWORDS)
-    }
+    scores = {field: score(keywords) for field, keywords in FIELD_KEYWORDS.items()}
 
     predicted_field = max(scores, key=scores.get)
 
     # If no meaningful match
     if scores[predicted_field] == 0:
-        return "Not Detected", [], []
+        return "Not Detected", None
+    return predicted_field, None
+
 
-    if predicted_field == "Data Science":
-        return "Data Science", [], [c[0] for c in ds_course]
+def resolve_field(name: str) -> Optional[str]:
+    """Field name for a display name in any case ("data science") or a catalog alias ("datascience"), else None"""
+    name = " ".join(str(name).lower().split())
+    for field in FIELD_KEYWORDS:
+        if field.lower() == name:
+            return field
+    return _CATALOG_FIELDS.get(catalog_key(name))
 
-    if predicted_field == "Web Development":
-        return "Web Development", [], [c[0] for c in web_course]
 
-    if predicted_field == "Android Development":
-        return "Android Development", [], [c[0] for c in android_course]
+def field_recommendations(field: str, skills) -> Tuple[List[str], List[str]]:
+    """(recommended skills, recommended course titles) for a detected field"""
+    if field not in FIELD_KEYWORDS:
+        return [], []
 
-    if predicted_field == "iOS Development":
-        return "iOS Development", [], [c[0] for c in ios_course]
+    # Courses ranked by how much of the field's missing skills they cover
+    # (the whole field if nothing is missing)
+    missing = course_recommender.missing_skills(skills, field=field)
+    courses = course_recommender.rank(
+        missing or course_recommender.field_skills[field], k=RECOMMENDED_COURSES
+    )
+    return missing[:RECOMMENDED_SKILLS], [c["title"] for c in courses]
 
-    if predicted_field == "UI/UX Design":
-        return "UI/UX Design", [], [c[0] for c in uiux_course]
+
+def detect_field_and_recommendations(skills, text: Optional[str] = None):
+    field, _ = detect_field(skills, text)
+    return (field, *field_recommendations(field, skills))
 
 
 # ----------------- RESUME SCORING -----------------
@@ -154,6 +205,25 @@ def score_resume(text: str):
     return score, tips
 
 
+# ----------------- COMBINED SCORING -----------------
+# Bump whenever calculate_ats_score / score_resume change, so stored
+# analyses scored by an older formula can be found and re-scored
+# (see rescore.py).
+SCORING_VERSION = 1
+
+ALL_FIELD_KEYWORDS = DS_KEYWORDS + WEB_KEYWORDS + ANDROID_KEYWORDS + IOS_KEYWORDS + UIUX_KEYWORDS
+
+def score_text(text: str, skills: list) -> Dict[str, Any]:
+    """Every stored score for a resume text - shared by analysis and re-scoring"""
+    score, tips = score_resume(text)
+    return {
+        "resume_score": score,
+        "tips": tips,
+        "ats_score": calculate_ats_score(text, skills, ALL_FIELD_KEYWORDS),
+        "scoring_version": SCORING_VERSION,
+    }
+
+
 # ----------------- MAIN FUNCTION -----------------
 def analyze_resume(file_bytes: bytes, user_id: str = None, filename: str = None) -> Dict[str, Any]:
     """Analyze resume PDF with optional user tracking"""
@@ -178,18 +248,16 @@ def analyze_resume(file_bytes: bytes, user_id: str = None, filename: str = None)
     print("=== END DEBUG ===")
 
     # Field prediction
-    field, rec_skills, rec_courses = detect_field_and_recommendations(skills)
+    field, field_confidence = detect_field(skills, text)
+    rec_skills, rec_courses = field_recommendations(field, skills)
 
-    # Resume score
-    score, tips = score_resume(text)
+    # Resume & ATS score
+    scores = score_text(text, skills)
+    score, tips, ats_score = scores["resume_score"], scores["tips"], scores["ats_score"]
 
     # Candidate level
     level = predict_candidate_level(text, pages)
 
-    # ATS score
-    field_keywords = DS_KEYWORDS + WEB_KEYWORDS + ANDROID_KEYWORDS + IOS_KEYWORDS + UIUX_KEYWORDS
-    ats_score = calculate_ats_score(text, skills, field_keywords)
-
     # Extract degree if possible
     degree = "N/A"
     education_keywords = ["bachelor", "master", "phd", "degree", "b.tech", "m.tech", "b.sc", "m.sc"]
@@ -209,12 +277,14 @@ def analyze_resume(file_bytes: bytes, user_id: str = None, filename: str = None)
         "no_of_pages": pages,
         "candidate_level": level, 
         "predicted_field": field,
+        "field_confidence": field_confidence,
         "skills": skills,
         "recommended_skills": rec_skills,
         "recommended_courses": rec_courses,
         "resume_score": score,
         "tips": tips,
         "ats_score": ats_score,
+        "scoring_version": SCORING_VERSION,
         "raw_text": text,
     }
     
@@ -0,0 +1,46 @@
+# backend/archive.py
+# Move old analyses from resume_analyses to the compact analyses_archive
+# collection (format in database.py, see ARCHIVE_FIELDS). History, detail,
+# delete and stats read both tiers, so this is invisible to users.
+#
+#   python archive.py                        # older than ARCHIVE_AFTER_DAYS (default 180)
+#   python archive.py --older-than-days 365 --batch-size 1000
+#   python archive.py --dry-run              # only count what would move
+#
+# Safe to run from cron and to re-run after an interruption.
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import time
+
+from database import db, ARCHIVE_AFTER_DAYS, ArchivedAnalysesCollection
+
+
+async def run(older_than_days: int, batch_size: int, dry_run: bool, backend: str = None):
+    await db.connect(backend=backend)
+    try:
+        await db.wait_for_indexes()
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        started = time.monotonic()
+        moved = await ArchivedAnalysesCollection.archive_before(cutoff, batch_size=batch_size, dry_run=dry_run)
+        if dry_run:
+            print(f"🔎 {moved} analyses older than {cutoff:%Y-%m-%d} would be archived")
+        else:
+            print(f"🏁 Archived {moved} analyses older than {cutoff:%Y-%m-%d} in {time.monotonic() - started:.1f}s")
+        return moved
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old resume analyses")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Count, don't move")
+    parser.add_argument("--backend", default=None, help="Storage backend (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+    asyncio.run(run(args.older_than_days, args.batch_size, args.dry_run, args.backend))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+# backend/benchmark.py
+# Micro-benchmarks that run the real application code paths.
+#
+#   python benchmark.py storage                      # sqlite + mongo (if reachable)
+#   python benchmark.py storage --backend sqlite --users 50 --analyses 40
+#   python benchmark.py report --reports 200          # PDF renders per core
+#   python benchmark.py classifier                    # field classifier latency, exit 1 over budget
+#   python benchmark.py classifier --require-model    # exit 2 instead of timing a synthetic model
+#
+# The storage benchmark drives the collection classes from database.py, so
+# every backend is measured on the exact queries the API issues.
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+import database
+from database import (
+    DATABASE_NAME,
+    ANALYSIS_SUMMARY_PROJECTION,
+    UsersCollection,
+    ResumeAnalysesCollection,
+    UserStatsCollection,
+)
+from storage import BACKENDS
+
+FIELDS = ["Data Science", "Web Development", "Android Development", "IOS Development", "UI-UX Development"]
+SKILLS = ["python", "react", "sql", "docker", "figma", "kotlin", "swift", "django", "flask", "pandas"]
+
+
+class Timer:
+    """Collects per-operation latencies for one benchmark step"""
+
+    def __init__(self):
+        self.samples = []
+
+    async def measure(self, coro):
+        started = time.perf_counter()
+        result = await coro
+        self.samples.append(time.perf_counter() - started)
+        return result
+
+    def measure_sync(self, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        self.samples.append(time.perf_counter() - started)
+        return result
+
+    def summary(self) -> dict:
+        samples = sorted(self.samples)
+        total = sum(samples)
+        return {
+            "ops": len(samples),
+            "ops_per_sec": len(samples) / total if total else 0.0,
+            "p50_ms": statistics.median(samples) * 1000 if samples else 0.0,
+            "p95_ms": samples[int(len(samples) * 0.95) - 1] * 1000 if samples else 0.0,
+        }
+
+
+def _analysis(user_id: str, when: datetime, rng: random.Random) -> dict:
+    return {
+        "user_id": user_id,
+        "original_filename": "resume.pdf",
+        "resume_score": rng.randint(20, 100),
+        "ats_score": rng.randint(20, 100),
+        "predicted_field": rng.choice(FIELDS),
+        "candidate_level": rng.choice(["Fresher", "Intermediate", "Experienced"]),
+        "skills": rng.sample(SKILLS, 4),
+        "extracted_data": {"raw_text": "x" * 1000},
+        "analysis_date": when,
+    }
+
+
+async def run_storage_workload(backend: str, users: int, analyses: int, page_size: int, seed: int) -> dict:
+    """Same workload for every backend: signup, analyze, history paging, stats, delete"""
+    database_name = f"{DATABASE_NAME}_benchmark"
+    await database.db.connect(backend=backend, database_name=database_name)
+    await database.db.wait_for_indexes()
+    for name in ("users", "resume_analyses", "user_stats"):
+        await database.db.db[name].delete_many({})
+
+    rng = random.Random(seed)
+    steps = {name: Timer() for name in ("create_user", "save_analysis", "find_by_email", "history_page", "stats_summary", "delete_analysis")}
+    user_ids = []
+
+    try:
+        for i in range(users):
+            user = await steps["create_user"].measure(UsersCollection.create_user({
+                "email": f"bench{i}@example.com",
+                "name": f"Bench {i}",
+                "resume_count": 0,
+                "created_at": datetime.utcnow(),
+            }))
+            user_ids.append(user["id"])
+
+        start = datetime.utcnow() - timedelta(days=365)
+        analysis_ids = []
+        for user_id in user_ids:
+            for j in range(analyses):
+                saved = await steps["save_analysis"].measure(ResumeAnalysesCollection.save_user_analysis(
+                    _analysis(user_id, start + timedelta(hours=j * 7 + rng.random()), rng)
+                ))
+                analysis_ids.append((saved["id"], user_id))
+
+        for i in range(users):
+            await steps["find_by_email"].measure(UsersCollection.find_by_email(f"bench{i}@example.com"))
+
+        for user_id in user_ids:
+            cursor = None
+            while True:
+                page = await steps["history_page"].measure(ResumeAnalysesCollection.get_user_analyses(
+                    user_id, limit=page_size, cursor=cursor, projection=ANALYSIS_SUMMARY_PROJECTION
+                ))
+                cursor = page["next_cursor"]
+                if not cursor:
+                    break
+            await steps["stats_summary"].measure(UserStatsCollection.get_summary(user_id))
+
+        for analysis_id, user_id in rng.sample(analysis_ids, max(1, len(analysis_ids) // 10)):
+            await steps["delete_analysis"].measure(ResumeAnalysesCollection.delete_user_analysis(analysis_id, user_id))
+    finally:
+        for name in ("users", "resume_analyses", "user_stats"):
+            await database.db.db[name].delete_many({})
+        await database.db.disconnect()
+
+    return {name: timer.summary() for name, timer in steps.items()}
+
+
+def print_table(results: dict):
+    backends = list(results)
+    steps = list(next(iter(results.values())))
+    print(f"\n{'step':<18}" + "".join(f"{b + ' ops/s':>16}{b + ' p95 ms':>16}" for b in backends))
+    for step in steps:
+        row = f"{step:<18}"
+        for backend in backends:
+            stats = results[backend][step]
+            row += f"{stats['ops_per_sec']:>16.0f}{stats['p95_ms']:>16.2f}"
+        print(row)
+
+
+async def benchmark_storage(args):
+    backends = BACKENDS if args.backend == "all" else (args.backend,)
+    results = {}
+    for backend in backends:
+        try:
+            results[backend] = await run_storage_workload(backend, args.users, args.analyses, args.page_size, args.seed)
+        except Exception as e:
+            print(f"⚠️ Skipping {backend}: {e}")
+    if results:
+        print_table(results)
+
+
+def _report(rng: random.Random, long: bool) -> dict:
+    count = 40 if long else 6
+    return {
+        "name": "Bench Candidate",
+        "email": "bench@example.com",
+        "mobile_number": "+15550100",
+        "resume_score": rng.randint(20, 100),
+        "ats_score": rng.randint(20, 100),
+        "candidate_level": rng.choice(["Fresher", "Intermediate", "Experienced"]),
+        "skills": [rng.choice(SKILLS) for _ in range(count)],
+        "recommended_skills": rng.sample(SKILLS, 5),
+        "recommended_courses": [f"Course {i} " + "with a long descriptive title " * (3 if long else 0) for i in range(count)],
+        "tips": ["Quantify your achievements"] * (count // 2),
+    }
+
+
+def benchmark_report(args):
+    """Single-process render throughput (= per core) of each path in pdf_report"""
+    from pdf_report import render_canvas, render_platypus, render_pdf_bytes
+
+    rng = random.Random(args.seed)
+    workloads = {
+        "short": [_report(rng, long=False) for _ in range(args.reports)],
+        "long": [_report(rng, long=True) for _ in range(args.reports)],
+    }
+    renderers = {
+        "canvas": render_canvas,
+        "platypus": render_platypus,
+        "auto": render_pdf_bytes,
+    }
+
+    print(f"\n{'workload':<10}{'renderer':<10}{'reports/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'fast path':>11}")
+    for workload, reports in workloads.items():
+        for name, render in renderers.items():
+            timer = Timer()
+            render(reports[0])  # warm-up: font metrics and module caches
+            rendered = [timer.measure_sync(render, data) for data in reports]
+            stats = timer.summary()
+            fast = sum(pdf is not None for pdf in rendered) if name == "canvas" else "-"
+            print(f"{workload:<10}{name:<10}{stats['ops_per_sec']:>12.0f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{str(fast):>11}")
+
+
+def _resume_text(rng: random.Random, titles: list, words: int = 450) -> str:
+    vocabulary = " ".join(titles).split()
+    filler = ["experience", "team", "project", "developed", "education", "skills", "university", "built"]
+    return " ".join(rng.choice(vocabulary if rng.random() < 0.3 else filler) for _ in range(words))
+
+
+def benchmark_classifier(args) -> int:
+    """Single-resume latency (p95 must stay under the budget) and batch throughput"""
+    from catalog import COURSE_LISTS
+    import field_classifier
+
+    rng = random.Random(args.seed)
+    fields = {field: [entry[0] for entry in entries if isinstance(entry, (list, tuple))] for field, entries in COURSE_LISTS.items()}
+    fields = {field: titles for field, titles in fields.items() if titles}
+
+    path = args.model or field_classifier.FIELD_MODEL_PATH
+    model = field_classifier.load_model(path)
+    if model is None and args.require_model:
+        print(f"❌ No trained field classifier at {path}")
+        return 2
+    if model is None:
+        # Latency doesn't depend on what the labels mean - a synthetic corpus will do.
+        # Its labels are catalog keys, not analyzer fields: never deploy it.
+        print(f"⚠️ No trained model at {path}, timing one trained on synthetic resumes (catalog-key labels)")
+        texts, labels = [], []
+        for field, titles in fields.items():
+            for _ in range(200):
+                texts.append(_resume_text(rng, titles))
+                labels.append(field)
+        model = field_classifier.train(texts, labels)
+
+    resumes = [_resume_text(rng, rng.choice(list(fields.values()))) for _ in range(args.resumes)]
+    field_classifier.predict_fields(resumes[:1], model)  # warm-up
+
+    single = Timer()
+    for text in resumes:
+        single.measure_sync(field_classifier.predict_fields, [text], model)
+    stats = single.summary()
+
+    batch = Timer()
+    for start in range(0, len(resumes), args.batch_size):
+        batch.measure_sync(field_classifier.predict_fields, resumes[start:start + args.batch_size], model)
+    batch_rate = len(resumes) / sum(batch.samples)
+
+    print(f"\nsingle: p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"batch of {args.batch_size}: {batch_rate:.0f} resumes/s")
+    if stats["p95_ms"] > args.budget_ms:
+        print("❌ Field classifier is over its latency budget")
+        return 1
+    print("✅ Field classifier is within its latency budget")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the resume analyzer backend")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    storage = commands.add_parser("storage", help="Collection classes against each storage backend")
+    storage.add_argument("--backend", choices=("all",) + BACKENDS, default="all")
+    storage.add_argument("--users", type=int, default=20)
+    storage.add_argument("--analyses", type=int, default=25, help="Analyses per user")
+    storage.add_argument("--page-size", type=int, default=10)
+    storage.add_argument("--seed", type=int, default=42)
+
+    report = commands.add_parser("report", help="PDF report renders per second on one core")
+    report.add_argument("--reports", type=int, default=100, help="Reports per workload")
+    report.add_argument("--seed", type=int, default=42)
+
+    classifier = commands.add_parser("classifier", help="Field classifier latency and batch throughput")
+    classifier.add_argument("--model", default=None, help="Model file (default: FIELD_MODEL_PATH)")
+    classifier.add_argument("--require-model", action="store_true", help="Fail if the model file is missing")
+    classifier.add_argument("--resumes", type=int, default=300)
+    classifier.add_argument("--batch-size", type=int, default=100)
+    classifier.add_argument("--budget-ms", type=float, default=10.0, help="p95 limit for one resume")
+    classifier.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+    if args.command == "storage":
+        asyncio.run(benchmark_storage(args))
+    elif args.command == "report":
+        benchmark_report(args)
+    elif args.command == "classifier":
+        sys.exit(benchmark_classifier(args))
+
+
+if __name__ == "__main__":
+    main()
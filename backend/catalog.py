@@ -0,0 +1,140 @@
+# backend/catalog.py
+# The Courses.py catalog as pre-built HTTP responses. The catalog never
+# changes at runtime, so every body is serialized and gzipped once at
+# import, with its content hash as a strong ETag - requests are answered
+# with a 304 or the stored bytes.
+from typing import Dict, List, Optional
+import gzip
+import json
+import os
+import re
+
+from fastapi import Request
+from fastapi.responses import Response
+
+import Courses
+from compression import content_hash
+from http_cache import accepts_encoding, etag_matches
+
+COURSE_CACHE_MAX_AGE = int(os.getenv("COURSE_CACHE_MAX_AGE", "86400"))  # seconds
+GZIP_MIN_SIZE = 512  # smaller bodies aren't worth the Content-Encoding
+
+# Same keys and order as the /api/all-courses response
+COURSE_LISTS: Dict[str, List] = {
+    "data_science": Courses.ds_course,
+    "web_development": Courses.web_course,
+    "android": Courses.android_course,
+    "ios": Courses.ios_course,
+    "ui_ux": Courses.uiux_course,
+    "resume_videos": Courses.resume_videos,
+    "interview_videos": Courses.interview_videos,
+}
+
+# Field names the frontend sends -> COURSE_LISTS key
+FIELD_ALIASES = {
+    # Data Science
+    "data_science": "data_science",
+    "datascience": "data_science",
+    "data-science": "data_science",
+
+    # Web Development
+    "web_development": "web_development",
+    "webdevelopment": "web_development",
+    "web": "web_development",
+
+    # Android
+    "android": "android",
+    "android_development": "android",
+    "androiddevelopment": "android",
+
+    # iOS
+    "ios": "ios",
+    "ios_development": "ios",
+    "iosdevelopment": "ios",
+
+    # UI/UX
+    "ui_ux": "ui_ux",
+    "uiux": "ui_ux",
+    "ui_ux_design": "ui_ux",
+    "design": "ui_ux",
+
+    # Resume Videos
+    "resume": "resume_videos",
+    "resume_writing": "resume_videos",
+    "resumevideos": "resume_videos",
+
+    # Interview Videos
+    "interview": "interview_videos",
+    "interview_preparation": "interview_videos",
+    "interviewvideos": "interview_videos",
+}
+
+
+def catalog_key(field) -> Optional[str]:
+    """COURSE_LISTS key for an alias or a display name ("Data Science", "UI/UX Design"), else None"""
+    name = " ".join(str(field or "").lower().split())
+    return FIELD_ALIASES.get(name) or FIELD_ALIASES.get(re.sub(r"[\s/-]+", "_", name))
+
+
+class PrebuiltResponse:
+    """A JSON body serialized once, plus its gzip encoding and strong ETags"""
+
+    def __init__(self, payload: dict):
+        # Same encoding FastAPI's JSONResponse would produce
+        self.body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+        digest = content_hash(self.body)
+        self.etag = f'"{digest}"'
+        # Each encoding is a different representation, so it gets its own strong ETag
+        self.gzip_etag = f'"{digest}-gzip"'
+        self.gzip_body = gzip.compress(self.body, 9, mtime=0) if len(self.body) >= GZIP_MIN_SIZE else None
+
+    def respond(self, request: Request) -> Response:
+        use_gzip = self.gzip_body is not None and accepts_encoding(request.headers.get("accept-encoding"), "gzip")
+        headers = {
+            "ETag": self.gzip_etag if use_gzip else self.etag,
+            "Cache-Control": f"public, max-age={COURSE_CACHE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if etag_matches(if_none_match, self.etag) or etag_matches(if_none_match, self.gzip_etag):
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type="application/json", headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def field_payload(field: str, courses: list) -> dict:
+    return {
+        "field": field,
+        "courses": courses,
+        "count": len(courses),
+        "message": f"Found {len(courses)} courses for {field}"
+    }
+
+
+FIELD_RESPONSES = {
+    alias: PrebuiltResponse(field_payload(alias, COURSE_LISTS[name]))
+    for alias, name in FIELD_ALIASES.items()
+}
+
+ALL_COURSES_RESPONSE = PrebuiltResponse({
+    **COURSE_LISTS,
+    "message": "All available courses",
+    "total_count": sum(len(courses) for courses in COURSE_LISTS.values()),
+})
+
+
+def field_response(field: str, request: Request) -> Response:
+    """
+    Courses for a field alias, echoing `field` as sent. Aliases spelled as
+    in FIELD_ALIASES are served prebuilt; other spellings (any case) and
+    unknown fields (an empty list) are built per request.
+    """
+    prebuilt = FIELD_RESPONSES.get(field)
+    if prebuilt is None:
+        name = FIELD_ALIASES.get(field.lower())
+        prebuilt = PrebuiltResponse(field_payload(field, COURSE_LISTS[name] if name else []))
+    return prebuilt.respond(request)
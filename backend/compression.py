@@ -0,0 +1,39 @@
+# backend/compression.py
+# Compression for stored resume sources (original PDF + full text).
+# zstd is used when the optional `zstandard` package is installed,
+# otherwise zlib. The codec is stored next to the data so either can read
+# what the other wrote.
+import hashlib
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_CODEC = "zstd" if zstandard else "zlib"
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 used to de-duplicate identical uploads"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, ZLIB_LEVEL)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed data")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
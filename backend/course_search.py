@@ -0,0 +1,192 @@
+# backend/course_search.py
+# In-memory course search over the Courses.py catalog and the `courses`
+# collection, fast enough to query on every keystroke:
+#   - title tokens -> postings (exact matches)
+#   - sorted vocabulary + bisect (the last, unfinished word is a prefix)
+#   - single-deletion neighbourhoods of every term and term prefix (typo
+#     tolerance: one insertion, deletion, substitution or transposition
+#     per word, also while the last word is still being typed)
+# The index is built once per worker at startup (load_course_index) and
+# swapped atomically on rebuild, so queries never see a half-built index.
+# CoursesCollection.add_course rebuilds it in the worker that wrote; other
+# workers only see courses written after their startup once they restart.
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+import re
+
+from catalog import COURSE_LISTS, catalog_key
+
+TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+STOPWORDS = {"a", "an", "and", "by", "for", "in", "of", "on", "the", "to", "with"}
+
+FUZZY_MIN_LENGTH = 4  # shorter words have too many one-edit neighbours
+MAX_PREFIX_TERMS = 50
+
+# Per query word: how much each kind of match is worth
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+FUZZY_SCORE = 0.6
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class CourseSearchIndex:
+    def __init__(self, courses: Iterable[dict] = ()):
+        self.courses: List[dict] = []
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self.deletes: Dict[str, Set[str]] = defaultdict(set)
+        self.prefix_deletes: Dict[str, Set[str]] = defaultdict(set)
+
+        seen = set()
+        for course in courses:
+            key = (course["title"].lower(), course.get("url"))
+            if key in seen:
+                continue
+            seen.add(key)
+            doc_id = len(self.courses)
+            self.courses.append(course)
+            for token in tokenize(course["title"]):
+                self.postings[token].add(doc_id)
+
+        self.vocabulary = sorted(self.postings)
+        for term in self.vocabulary:
+            if len(term) >= FUZZY_MIN_LENGTH:
+                for variant in _deletes(term):
+                    self.deletes[variant].add(term)
+            for end in range(FUZZY_MIN_LENGTH, len(term) + 1):
+                prefix = term[:end]
+                for variant in _deletes(prefix) | {prefix}:
+                    self.prefix_deletes[variant].add(term)
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        terms = []
+        for term in self.vocabulary[bisect_left(self.vocabulary, prefix):]:
+            if not term.startswith(prefix) or len(terms) >= MAX_PREFIX_TERMS:
+                break
+            terms.append(term)
+        return terms
+
+    def _fuzzy_terms(self, word: str, is_prefix: bool) -> Set[str]:
+        if len(word) < FUZZY_MIN_LENGTH:
+            return set()
+        # The term's deletes vs. the query, deletes of the query vs. the
+        # term, and deletes on both sides (substitution/transposition)
+        if is_prefix:
+            terms = set(self.prefix_deletes.get(word, ()))
+            for variant in _deletes(word):
+                terms |= self.prefix_deletes.get(variant, set())
+            return terms
+        terms = set(self.deletes.get(word, ()))
+        for variant in _deletes(word):
+            if variant in self.postings:
+                terms.add(variant)
+            terms |= self.deletes.get(variant, set())
+        return terms
+
+    def _word_scores(self, word: str, is_prefix: bool) -> Dict[int, float]:
+        """doc id -> best score of this query word in the doc"""
+        scores: Dict[int, float] = {}
+
+        def add(terms, score):
+            for term in terms:
+                for doc_id in self.postings.get(term, ()):
+                    if scores.get(doc_id, 0.0) < score:
+                        scores[doc_id] = score
+
+        add(self._fuzzy_terms(word, is_prefix), FUZZY_SCORE)
+        if is_prefix:
+            add(self._prefix_terms(word), PREFIX_SCORE)
+        add([word], EXACT_SCORE)
+        return scores
+
+    def search(self, query: str, limit: int = 10, field: Optional[str] = None) -> List[dict]:
+        """
+        Courses matching every word of the query (exact, prefix or one typo),
+        best first. The last word is completed as a prefix unless the query
+        ends with a space.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        complete_last = not query[-1:].isspace()
+
+        totals: Optional[Dict[int, float]] = None
+        for i, word in enumerate(words):
+            scores = self._word_scores(word, is_prefix=complete_last and i == len(words) - 1)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {doc_id: total + scores[doc_id] for doc_id, total in totals.items() if doc_id in scores}
+            if not totals:
+                return []
+
+        if field:
+            field = _field_key(field)
+            totals = {doc_id: score for doc_id, score in totals.items() if self.courses[doc_id]["field"] == field}
+
+        ranked = sorted(totals.items(), key=lambda item: (-item[1], len(self.courses[item[0]]["title"]), item[0]))
+        return [
+            {**self.courses[doc_id], "score": round(score / len(words), 3)}
+            for doc_id, score in ranked[:limit]
+        ]
+
+
+def catalog_courses() -> List[dict]:
+    """Titled entries of the Courses.py catalog (the bare video URLs have nothing to search)"""
+    return [
+        {"title": entry[0], "url": entry[1], "field": field}
+        for field, entries in COURSE_LISTS.items()
+        for entry in entries
+        if isinstance(entry, (list, tuple)) and len(entry) >= 2
+    ]
+
+
+def _field_key(field) -> str:
+    """Catalog key for aliases and display names alike; other fields are only lowercased"""
+    return catalog_key(field) or str(field or "").lower()
+
+
+def database_courses(docs: Iterable[dict]) -> List[dict]:
+    courses = []
+    for doc in docs:
+        if not doc.get("title"):
+            continue
+        courses.append({
+            "title": doc["title"],
+            "url": doc.get("url"),
+            "field": _field_key(doc.get("field")),
+            "platform": doc.get("platform"),
+        })
+    return courses
+
+
+course_index = CourseSearchIndex(catalog_courses())
+
+
+async def load_course_index() -> int:
+    """Rebuild the index from Courses.py plus the courses collection"""
+    global course_index
+    from database import CoursesCollection
+
+    try:
+        docs = await CoursesCollection.get_all_courses()
+    except Exception as e:
+        print(f"⚠️ Course search uses Courses.py only: {e}")
+        docs = []
+    course_index = CourseSearchIndex(catalog_courses() + database_courses(docs))
+    print(f"✅ Course search index: {len(course_index)} courses, {len(course_index.vocabulary)} terms")
+    return len(course_index)
+
+
+def search_courses(query: str, limit: int = 10, field: Optional[str] = None) -> List[dict]:
+    return course_index.search(query, limit, field)
@@ -1,65 +1,96 @@
 # backend/database.py
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, DESCENDING
-from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from pymongo.write_concern import WriteConcern
+from bson import ObjectId, Binary
+from bson.errors import InvalidId
+from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import base64
+import hashlib
 import os
 from dotenv import load_dotenv
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
+
+from cache import TTLCache
+from compression import DEFAULT_CODEC, compress, decompress, content_hash
+from storage import STORAGE_BACKEND, CollectionBackend, create_client
+from indexes import ensure_indexes
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "resume_analyzer")
 
+# Write concern for the analyze write path, e.g. MONGO_WRITE_W=majority MONGO_WRITE_J=true
+# Unset keeps the server/connection default.
+MONGO_WRITE_W = os.getenv("MONGO_WRITE_W")
+MONGO_WRITE_J = os.getenv("MONGO_WRITE_J")
+
+def get_write_concern() -> Optional[WriteConcern]:
+    """WriteConcern from MONGO_WRITE_W / MONGO_WRITE_J, or None for the default"""
+    if MONGO_WRITE_W is None and MONGO_WRITE_J is None:
+        return None
+    w = MONGO_WRITE_W
+    if w is not None and w.isdigit():
+        w = int(w)
+    j = MONGO_WRITE_J.lower() == "true" if MONGO_WRITE_J is not None else None
+    return WriteConcern(w=w, j=j)
+
+def with_write_concern(collection: CollectionBackend) -> CollectionBackend:
+    """Collection handle using the configured write concern"""
+    write_concern = get_write_concern()
+    if write_concern is None:
+        return collection
+    return collection.with_options(write_concern=write_concern)
+
 class Database:
     client: AsyncIOMotorClient = None
     db = None
+    backend: str = None
+    index_task: asyncio.Task = None
     
-    async def connect(self):
-        """Connect to MongoDB"""
+    async def connect(self, backend: Optional[str] = None, database_name: Optional[str] = None):
+        """Connect to the configured storage backend (MongoDB unless STORAGE_BACKEND says otherwise)"""
+        self.backend = backend or STORAGE_BACKEND
+        database_name = database_name or DATABASE_NAME
         try:
-            self.client = AsyncIOMotorClient(MONGO_URI)
-            self.db = self.client[DATABASE_NAME]
+            self.client = create_client(self.backend, mongo_uri=MONGO_URI)
+            self.db = self.client[database_name]
             
             # Test connection
             await self.client.admin.command('ping')
-            print(f"✅ Connected to MongoDB: {DATABASE_NAME}")
+            print(f"✅ Connected to {self.backend}: {database_name}")
             
-            # Create indexes
-            await self.create_indexes()
+            # Build missing indexes without holding up startup
+            self.create_indexes()
             
         except Exception as e:
-            print(f"❌ Failed to connect to MongoDB: {e}")
+            print(f"❌ Failed to connect to {self.backend}: {e}")
             raise
     
-    async def create_indexes(self):
-        """Create database indexes for performance"""
-        try:
-            # Users collection indexes
-            await self.db.users.create_index([("email", ASCENDING)], unique=True)
-            await self.db.users.create_index([("created_at", DESCENDING)])
-            
-            # Resume analyses collection indexes
-            await self.db.resume_analyses.create_index([("user_id", ASCENDING)])
-            await self.db.resume_analyses.create_index([("analysis_date", DESCENDING)])
-            await self.db.resume_analyses.create_index([
-                ("user_id", ASCENDING),
-                ("analysis_date", DESCENDING)
-            ])
-            
-            # Courses collection indexes
-            await self.db.courses.create_index([("field", ASCENDING)])
-            
-            print("✅ Database indexes created successfully")
-            
-        except Exception as e:
-            print(f"⚠️ Failed to create indexes: {e}")
+    def create_indexes(self) -> asyncio.Task:
+        """Start building the missing indexes (declared in indexes.py) in the background"""
+        self.index_task = asyncio.create_task(ensure_indexes(self.db))
+        return self.index_task
+    
+    async def wait_for_indexes(self) -> Tuple[List[str], List[str]]:
+        """Block until the background index build has finished; (created, failed) as from ensure_indexes"""
+        if self.index_task:
+            return await self.index_task
+        return [], []
     
     async def disconnect(self):
-        """Disconnect from MongoDB"""
+        """Disconnect from the storage backend"""
+        if self.index_task and not self.index_task.done():
+            self.index_task.cancel()
+        if self.db is not None:
+            await UsersCollection.flush_logins()
         if self.client:
             self.client.close()
-            print("✅ Disconnected from MongoDB")
+            print(f"✅ Disconnected from {self.backend}")
 
 # Database instance
 db = Database()
@@ -72,12 +103,124 @@ def convert_objectid(doc):
         del doc['_id']
     return doc
 
+# Fields the history list renders - everything else comes from GET /resume/{id}
+ANALYSIS_SUMMARY_PROJECTION = {
+    "resume_score": 1,
+    "ats_score": 1,
+    "predicted_field": 1,
+    "candidate_level": 1,
+    "original_filename": 1,
+    "analysis_date": 1,
+}
+
+# Detail view never returns the raw text excerpt
+ANALYSIS_DETAIL_PROJECTION = {
+    "extracted_data.raw_text": 0,
+}
+
+# Opaque keyset cursors for (analysis_date, _id) pagination
+def encode_cursor(analysis_date: datetime, doc_id) -> str:
+    """Encode the sort key of the last item on a page"""
+    raw = f"{analysis_date.isoformat()}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor from encode_cursor, raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(date_part), ObjectId(id_part)
+    except (ValueError, InvalidId, UnicodeDecodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+# Query shapes shared by the collection classes and indexes.py, which
+# explain()s them to check that every one is served by an index
+def history_sort(date_key: str = "analysis_date") -> List[tuple]:
+    """Newest first, _id as the tie-breaker (keyset pagination order)"""
+    return [(date_key, DESCENDING), ("_id", DESCENDING)]
+
+def owned_query(object_id: ObjectId, user_key: str, user_id: str) -> dict:
+    """One analysis, only if user_id owns it"""
+    return {"_id": object_id, user_key: user_id}
+
+def archive_batch_query(cutoff: datetime) -> dict:
+    """Hot analyses due for the archive (read oldest first, ARCHIVE_BATCH_SORT)"""
+    return {"analysis_date": {"$lt": cutoff}}
+
+ARCHIVE_BATCH_SORT = [("analysis_date", ASCENDING)]
+
+def keyset_query(user_key: str, date_key: str, user_id: str, cursor: Optional[str] = None) -> dict:
+    """History filter for one page; the hot and archive collections name their fields differently"""
+    query = {user_key: user_id}
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        # Range on the index, then drop the already-seen ties on the same date
+        query[date_key] = {"$lte": last_date}
+        query["$nor"] = [{date_key: last_date, "_id": {"$gte": last_id}}]
+    return query
+
+def selection_query(
+    user_key: str,
+    date_key: str,
+    user_id: str,
+    analysis_ids: Optional[List[str]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> dict:
+    """A user's analyses by id and/or analysis_date range [start, end); malformed ids match nothing"""
+    query = {user_key: user_id}
+    if analysis_ids is not None:
+        object_ids = []
+        for analysis_id in analysis_ids:
+            try:
+                object_ids.append(ObjectId(analysis_id))
+            except (InvalidId, TypeError):
+                pass
+        query["_id"] = {"$in": object_ids}
+    if start_date or end_date:
+        query[date_key] = {}
+        if start_date:
+            query[date_key]["$gte"] = start_date
+        if end_date:
+            query[date_key]["$lt"] = end_date
+    return query
+
+# Authenticated users by id, so auth doesn't cost a query per request.
+# Every write to a user document below invalidates its entry; the TTL
+# bounds staleness for writes made by other worker processes.
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+_user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+# last_login writes are batched: logins only record the time in memory and
+# one $max update per user is flushed every LAST_LOGIN_FLUSH_INTERVAL seconds
+LAST_LOGIN_FLUSH_INTERVAL = float(os.getenv("LAST_LOGIN_FLUSH_INTERVAL", "5"))
+_pending_logins = {}
+_login_flush_task: Optional[asyncio.Task] = None
+
 # Collection getters with helper functions
 class UsersCollection:
     @staticmethod
-    def get_collection():
+    def get_collection() -> CollectionBackend:
         return db.db.users
     
+    @staticmethod
+    async def get_cached(user_id: str):
+        """find_by_id through the in-process user cache"""
+        user = _user_cache.get(user_id)
+        if user is None:
+            generation = _user_cache.generation
+            user = await UsersCollection.find_by_id(user_id)
+            if user is None:
+                return None
+            _user_cache.set(user_id, user, generation)
+        return dict(user)
+    
+    @staticmethod
+    def invalidate(user_id: str):
+        """Drop a user from the cache after any change to their document"""
+        _user_cache.pop(user_id)
+    
     @staticmethod
     async def find_by_email(email: str):
         """Find user by email"""
@@ -111,72 +254,788 @@ class UsersCollection:
             {"_id": ObjectId(user_id)},
             {"$set": update_data}
         )
+        UsersCollection.invalidate(user_id)
         return result.modified_count > 0
     
+    @staticmethod
+    async def update_user_returning(user_id: str, update_data: dict):
+        """Update user data and return the updated user in the same round trip"""
+        collection = UsersCollection.get_collection()
+        user = await collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        UsersCollection.invalidate(user_id)
+        return convert_objectid(user)
+    
+    @staticmethod
+    async def upsert_oauth_user(email: str, name: str):
+        """Find or create an OAuth user and stamp last_login, in one round trip"""
+        collection = UsersCollection.get_collection()
+        now = datetime.utcnow()
+        update = {
+            "$setOnInsert": {
+                "name": name,
+                "hashed_password": None,
+                "created_at": now,
+                "resume_count": 0,
+                "subscription_tier": "free",
+                "is_active": True,
+            },
+            "$max": {"last_login": now},
+        }
+        try:
+            user = await collection.find_one_and_update(
+                {"email": email}, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost a race with a concurrent first login - the user exists now
+            user = await collection.find_one_and_update(
+                {"email": email}, update, return_document=ReturnDocument.AFTER
+            )
+        user = convert_objectid(user)
+        UsersCollection.invalidate(user["id"])
+        return user
+    
+    @staticmethod
+    def record_login(user_id: str):
+        """Fire-and-forget last_login update, coalesced per user"""
+        global _login_flush_task
+        _pending_logins[user_id] = datetime.utcnow()
+        if _login_flush_task is None or _login_flush_task.done():
+            _login_flush_task = asyncio.create_task(UsersCollection._flush_logins_later())
+    
+    @staticmethod
+    async def _flush_logins_later():
+        await asyncio.sleep(LAST_LOGIN_FLUSH_INTERVAL)
+        await UsersCollection.flush_logins()
+    
+    @staticmethod
+    async def flush_logins():
+        """Write the pending last_login times (one update per user)"""
+        global _pending_logins
+        if not _pending_logins:
+            return
+        pending, _pending_logins = _pending_logins, {}
+        collection = UsersCollection.get_collection()
+        try:
+            await asyncio.gather(*(
+                collection.update_one({"_id": ObjectId(user_id)}, {"$max": {"last_login": logged_in_at}})
+                for user_id, logged_in_at in pending.items()
+            ))
+        except Exception as e:
+            print(f"⚠️ Failed to record last_login: {e}")
+    
+    @staticmethod
+    async def deactivate_user(user_id: str):
+        """Deactivate an account; cached sessions stop working immediately on this worker"""
+        return await UsersCollection.update_user(user_id, {"is_active": False})
+    
     @staticmethod
     async def increment_resume_count(user_id: str):
         """Increment user's resume count"""
-        collection = UsersCollection.get_collection()
+        collection = with_write_concern(UsersCollection.get_collection())
         await collection.update_one(
             {"_id": ObjectId(user_id)},
             {"$inc": {"resume_count": 1}}
         )
+        UsersCollection.invalidate(user_id)
+
+    @staticmethod
+    async def decrement_resume_count(user_id: str):
+        """Decrement user's resume count (never below zero)"""
+        collection = with_write_concern(UsersCollection.get_collection())
+        await collection.update_one(
+            {"_id": ObjectId(user_id), "resume_count": {"$gt": 0}},
+            {"$inc": {"resume_count": -1}}
+        )
+        UsersCollection.invalidate(user_id)
 
 class ResumeAnalysesCollection:
     @staticmethod
-    def get_collection():
+    def get_collection() -> CollectionBackend:
         return db.db.resume_analyses
     
     @staticmethod
     async def create_analysis(analysis_data: dict):
         """Create a new resume analysis record"""
-        collection = ResumeAnalysesCollection.get_collection()
-        result = await collection.insert_one(analysis_data)
+        collection = with_write_concern(ResumeAnalysesCollection.get_collection())
+        created = await UserStatsCollection.begin_write(analysis_data["user_id"])
+        try:
+            result = await collection.insert_one(analysis_data)
+        except BaseException:
+            await UserStatsCollection.end_write(analysis_data["user_id"])
+            raise
         analysis_data['id'] = str(result.inserted_id)
+        await UserStatsCollection.record_analysis(analysis_data, rebuild=created)
         return analysis_data
     
     @staticmethod
-    async def get_user_analyses(user_id: str, limit: int = 10, skip: int = 0):
-        """Get all resume analyses for a user"""
+    async def save_user_analysis(analysis_data: dict):
+        """
+        Persist a new analysis and bump the owner's resume_count.
+
+        The two writes touch different collections and don't depend on each
+        other, so they run concurrently instead of as two serial round trips.
+        """
+        saved, _ = await asyncio.gather(
+            ResumeAnalysesCollection.create_analysis(analysis_data),
+            UsersCollection.increment_resume_count(analysis_data["user_id"])
+        )
+        return saved
+    
+    @staticmethod
+    async def get_user_analyses(
+        user_id: str,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        include_total: bool = False,
+        projection: Optional[dict] = None
+    ):
+        """
+        Get a page of resume analyses for a user, newest first.
+
+        Pages are keyed on (analysis_date, _id): pass the previous page's
+        next_cursor to continue, so deep pages cost the same as the first.
+        `skip` is only kept for legacy page-number callers. The exact total
+        needs an extra count query and is only computed on request.
+        Pass ANALYSIS_SUMMARY_PROJECTION for list views.
+
+        The hot collection and the archive are read as one view: every
+        archived analysis is older than every hot one, so the archive is
+        only queried once the hot collection runs out, with the same cursor.
+        """
         collection = ResumeAnalysesCollection.get_collection()
         
-        cursor = collection.find({"user_id": user_id}) \
-            .sort("analysis_date", DESCENDING) \
-            .skip(skip) \
-            .limit(limit)
+        hot_skip = archive_skip = 0
+        if skip and not cursor:
+            hot_total = await collection.count_documents({"user_id": user_id})
+            hot_skip, archive_skip = min(skip, hot_total), max(0, skip - hot_total)
         
-        analyses = []
-        async for doc in cursor:
-            analyses.append(convert_objectid(doc))
+        find = collection.find(keyset_query("user_id", "analysis_date", user_id, cursor), projection) \
+            .sort(history_sort()) \
+            .limit(limit + 1)
+        if hot_skip:
+            find = find.skip(hot_skip)
+        
+        docs = [doc async for doc in find]
+        if len(docs) <= limit:
+            docs += await ArchivedAnalysesCollection.get_user_page(
+                user_id, limit + 1 - len(docs), cursor, archive_skip, projection
+            )
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        
+        next_cursor = None
+        if has_more:
+            last = docs[-1]
+            next_cursor = encode_cursor(last["analysis_date"], last["_id"])
         
-        total = await collection.count_documents({"user_id": user_id})
+        total = None
+        if include_total:
+            hot_total, archived_total = await asyncio.gather(
+                collection.count_documents({"user_id": user_id}),
+                ArchivedAnalysesCollection.get_collection().count_documents({ARCHIVE_FIELDS["user_id"]: user_id})
+            )
+            total = hot_total + archived_total
         
         return {
-            "analyses": analyses,
+            "analyses": [convert_objectid(doc) for doc in docs],
             "total_count": total,
-            "has_more": (skip + len(analyses)) < total
+            "has_more": has_more,
+            "next_cursor": next_cursor
         }
     
     @staticmethod
-    async def get_analysis_by_id(analysis_id: str):
+    async def count_selection(user_id: str, **selection) -> int:
+        """Number of analyses (both tiers) matching selection_query()"""
+        hot_total, archived_total = await asyncio.gather(
+            ResumeAnalysesCollection.get_collection().count_documents(
+                selection_query("user_id", "analysis_date", user_id, **selection)
+            ),
+            ArchivedAnalysesCollection.get_collection().count_documents(
+                selection_query(ARCHIVE_FIELDS["user_id"], ARCHIVE_FIELDS["analysis_date"], user_id, **selection)
+            )
+        )
+        return hot_total + archived_total
+    
+    @staticmethod
+    async def iter_selection(user_id: str, projection: Optional[dict] = None, **selection) -> AsyncIterator[dict]:
+        """
+        Stream the analyses matching selection_query(), newest first, hot
+        collection then archive. Documents are read in cursor batches, so
+        large exports never hold the whole selection in memory.
+        """
+        hot = ResumeAnalysesCollection.get_collection() \
+            .find(selection_query("user_id", "analysis_date", user_id, **selection), projection) \
+            .sort(history_sort())
+        async for doc in hot:
+            yield convert_objectid(doc)
+        
+        user_key, date_key = ARCHIVE_FIELDS["user_id"], ARCHIVE_FIELDS["analysis_date"]
+        archived = ArchivedAnalysesCollection.get_collection() \
+            .find(selection_query(user_key, date_key, user_id, **selection), archive_projection(projection)) \
+            .sort(history_sort(date_key))
+        async for doc in archived:
+            yield convert_objectid(unpack_analysis(doc))
+    
+    @staticmethod
+    async def get_analysis_by_id(analysis_id: str, projection: Optional[dict] = None):
         """Get a specific analysis by ID"""
         collection = ResumeAnalysesCollection.get_collection()
         try:
-            analysis = await collection.find_one({"_id": ObjectId(analysis_id)})
+            object_id = ObjectId(analysis_id)
+            analysis = await collection.find_one({"_id": object_id}, projection)
+            if analysis is None:
+                analysis = await ArchivedAnalysesCollection.get_by_id(object_id, projection)
             return convert_objectid(analysis)
         except:
             return None
     
+    @staticmethod
+    async def _delete(analysis_id: str, user_id: Optional[str] = None) -> bool:
+        """
+        Delete an analysis from whichever tier holds it - only if user_id owns
+        it, when given (part of the delete filter, so no lookup and no race) -
+        then take it out of the owner's counters atomically.
+        """
+        try:
+            object_id = ObjectId(analysis_id)
+        except (InvalidId, TypeError):
+            return False
+        
+        collection = with_write_concern(ResumeAnalysesCollection.get_collection())
+        if user_id is None:
+            # The rollup has to be marked before the delete - find the owner first
+            owner = await collection.find_one({"_id": object_id}, {"user_id": 1})
+            if owner is None:
+                owner = unpack_analysis(await ArchivedAnalysesCollection.get_collection().find_one(
+                    {"_id": object_id}, {ARCHIVE_FIELDS["user_id"]: 1}
+                ))
+            if owner is None:
+                return False
+            user_id = owner["user_id"]
+        hot_query = owned_query(object_id, "user_id", user_id)
+        archive_query = owned_query(object_id, ARCHIVE_FIELDS["user_id"], user_id)
+        
+        await UserStatsCollection.begin_write(user_id)
+        try:
+            deleted = await collection.find_one_and_delete(hot_query, projection=STATS_PROJECTION)
+            if not deleted:
+                deleted = await ArchivedAnalysesCollection.delete(archive_query)
+        except BaseException:
+            await UserStatsCollection.end_write(user_id)
+            raise
+        if not deleted:
+            await UserStatsCollection.end_write(user_id)
+            return False
+        
+        await asyncio.gather(
+            UserStatsCollection.remove_analysis(deleted),
+            UsersCollection.decrement_resume_count(deleted["user_id"])
+        )
+        return True
+
     @staticmethod
     async def delete_analysis(analysis_id: str):
-        """Delete a resume analysis"""
-        collection = ResumeAnalysesCollection.get_collection()
-        result = await collection.delete_one({"_id": ObjectId(analysis_id)})
-        return result.deleted_count > 0
+        """Delete a resume analysis, whoever owns it"""
+        return await ResumeAnalysesCollection._delete(analysis_id)
+
+    @staticmethod
+    async def delete_user_analysis(analysis_id: str, user_id: str):
+        """
+        Delete an analysis owned by user_id.
+        Returns False if it doesn't exist or belongs to someone else.
+        """
+        return await ResumeAnalysesCollection._delete(analysis_id, user_id)
+
+# ----------------- ARCHIVE TIER -----------------
+# Analyses older than ARCHIVE_AFTER_DAYS are moved to analyses_archive by
+# archive.py. Archived documents use short field names, drop the text
+# excerpt (the full text is in resume_sources) and store recommended
+# courses as references into the Courses.py catalog.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+
+ARCHIVE_FIELDS = {
+    "user_id": "u",
+    "resume_score": "rs",
+    "ats_score": "as",
+    "candidate_level": "cl",
+    "predicted_field": "pf",
+    "skills": "sk",
+    "recommended_skills": "rk",
+    "recommended_courses": "rc",
+    "tips": "tp",
+    "scoring_version": "sv",
+    "rescored_at": "ra",
+    "original_filename": "fn",
+    "analysis_date": "d",
+    "source_id": "src",
+    "extracted_data": "x",
+}
+ARCHIVE_EXTRACTED_FIELDS = {
+    "name": "n",
+    "email": "e",
+    "mobile_number": "m",
+    "degree": "g",
+    "no_of_pages": "p",
+}
+_ARCHIVE_NAMES = {short: name for name, short in ARCHIVE_FIELDS.items()}
+_ARCHIVE_EXTRACTED_NAMES = {short: name for name, short in ARCHIVE_EXTRACTED_FIELDS.items()}
+
+@lru_cache(maxsize=1)
+def _course_refs() -> Tuple[dict, dict]:
+    """title -> ref and ref -> title; refs are hashes of the title, so reordering Courses.py is safe"""
+    from Courses import ds_course, web_course, android_course, ios_course, uiux_course
+    
+    by_title = {}
+    for title, _ in ds_course + web_course + android_course + ios_course + uiux_course:
+        by_title[title] = int.from_bytes(hashlib.sha1(title.encode()).digest()[:4], "big") & 0x7FFFFFFF
+    return by_title, {ref: title for title, ref in by_title.items()}
+
+def pack_analysis(doc: dict) -> dict:
+    """Hot analysis document -> compact archive document"""
+    by_title, _ = _course_refs()
+    packed = {}
+    for key, value in doc.items():
+        if key == "extracted_data":
+            value = {ARCHIVE_EXTRACTED_FIELDS.get(k, k): v for k, v in (value or {}).items() if k != "raw_text"}
+        elif key == "recommended_courses":
+            # Unknown titles (catalog changed since) are kept as text
+            value = [by_title.get(title, title) for title in value or []]
+        packed[ARCHIVE_FIELDS.get(key, key)] = value
+    return packed
+
+def unpack_analysis(doc: Optional[dict]) -> Optional[dict]:
+    """Archive document -> the same shape as a hot analysis"""
+    if doc is None:
+        return None
+    _, by_ref = _course_refs()
+    unpacked = {}
+    for key, value in doc.items():
+        name = _ARCHIVE_NAMES.get(key, key)
+        if name == "extracted_data":
+            value = {_ARCHIVE_EXTRACTED_NAMES.get(k, k): v for k, v in (value or {}).items()}
+        elif name == "recommended_courses":
+            value = [by_ref.get(ref, ref) if isinstance(ref, int) else ref for ref in value or []]
+        unpacked[name] = value
+    return unpacked
+
+def _archive_path(path: str) -> str:
+    head, _, rest = path.partition(".")
+    if head == "extracted_data" and rest:
+        rest = ARCHIVE_EXTRACTED_FIELDS.get(rest, rest)
+    return ARCHIVE_FIELDS.get(head, head) + (f".{rest}" if rest else "")
+
+def archive_projection(projection: Optional[dict]) -> Optional[dict]:
+    """Translate a hot-collection projection to archive field names"""
+    if not projection:
+        return projection
+    return {_archive_path(path): value for path, value in projection.items()}
+
+class ArchivedAnalysesCollection:
+    @staticmethod
+    def get_collection() -> CollectionBackend:
+        return db.db.analyses_archive
+    
+    @staticmethod
+    async def get_user_page(
+        user_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+        skip: int = 0,
+        projection: Optional[dict] = None
+    ):
+        """Continuation of a history page, same cursor and order as the hot collection"""
+        user_key, date_key = ARCHIVE_FIELDS["user_id"], ARCHIVE_FIELDS["analysis_date"]
+        find = ArchivedAnalysesCollection.get_collection() \
+            .find(keyset_query(user_key, date_key, user_id, cursor), archive_projection(projection)) \
+            .sort(history_sort(date_key)) \
+            .limit(limit)
+        if skip and not cursor:
+            find = find.skip(skip)
+        return [unpack_analysis(doc) async for doc in find]
+    
+    @staticmethod
+    async def get_by_id(object_id: ObjectId, projection: Optional[dict] = None):
+        collection = ArchivedAnalysesCollection.get_collection()
+        return unpack_analysis(await collection.find_one({"_id": object_id}, archive_projection(projection)))
+    
+    @staticmethod
+    async def delete(query: dict):
+        """Delete one archived analysis, returning its stats fields (hot names) or None"""
+        collection = with_write_concern(ArchivedAnalysesCollection.get_collection())
+        deleted = await collection.find_one_and_delete(query, projection=archive_projection(STATS_PROJECTION))
+        return unpack_analysis(deleted)
+    
+    @staticmethod
+    async def archive_before(cutoff: datetime, batch_size: int = 500, dry_run: bool = False) -> int:
+        """
+        Move analyses older than cutoff out of the hot collection, oldest
+        first. Each batch is upserted into the archive before it is deleted
+        from the hot collection, so an interrupted run can simply be repeated.
+        Rollups and resume_count don't change - the analyses still exist.
+        """
+        hot = with_write_concern(ResumeAnalysesCollection.get_collection())
+        archive = with_write_concern(ArchivedAnalysesCollection.get_collection())
+        query = archive_batch_query(cutoff)
+        
+        if dry_run:
+            return await hot.count_documents(query)
+        
+        moved = 0
+        while True:
+            batch = await hot.find(query).sort(ARCHIVE_BATCH_SORT).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+            await asyncio.gather(*(
+                archive.replace_one({"_id": doc["_id"]}, pack_analysis(doc), upsert=True)
+                for doc in batch
+            ))
+            await hot.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+            moved += len(batch)
+            print(f"✅ Archived {moved} analyses")
+        return moved
+
+# Fields the per-user rollup is built from
+STATS_PROJECTION = {
+    "user_id": 1,
+    "resume_score": 1,
+    "predicted_field": 1,
+    "skills": 1,
+    "analysis_date": 1,
+}
+
+def _stat_key(name) -> str:
+    """Field/skill names are used as sub-document keys - escape what Mongo reserves"""
+    key = str(name if name else "Unknown").replace(".", "\uff0e")
+    return "\uff04" + key[1:] if key.startswith("$") else key
+
+def _stat_name(key: str) -> str:
+    return key.replace("\uff0e", ".").replace("\uff04", "$")
+
+REBUILD_ATTEMPTS = 3
+REBUILD_BACKOFF = 0.05  # seconds, times the attempt number
+# A write that stays pending this long is assumed to have died mid-way
+PENDING_TIMEOUT = timedelta(seconds=60)
+
+class UserStatsCollection:
+    """
+    One rollup document per user, kept up to date with atomic $inc/$max on
+    every insert and delete, so the stats summary is a single _id read.
+    Missing or invalidated rollups are rebuilt with an aggregation pipeline.
+
+    An insert or delete is bracketed on the rollup: begin_write bumps
+    `pending` and `version` before the analysis is written, the $inc that
+    folds it in (or end_write) drops `pending` again. A rebuild only
+    replaces the rollup if nothing was pending when it read the version
+    and the version is unchanged since, so its aggregation can neither
+    count an analysis whose $inc is still to come nor miss one whose $inc
+    it overwrites. Otherwise it loses cleanly and the rollup stays stale.
+    """
+    @staticmethod
+    def get_collection() -> CollectionBackend:
+        return db.db.user_stats
+    
+    @staticmethod
+    def _delta(analysis: dict, sign: int) -> dict:
+        inc = {
+            "version": 1,
+            "total_analyses": sign,
+            "score_sum": sign * analysis.get("resume_score", 0),
+            f"fields.{_stat_key(analysis.get('predicted_field'))}": sign,
+        }
+        for skill in set(analysis.get("skills", [])):
+            inc[f"skills.{_stat_key(skill)}"] = sign
+        return inc
+    
+    @staticmethod
+    async def begin_write(user_id: str) -> bool:
+        """Mark an analysis insert/delete as in flight; True if that created the rollup"""
+        collection = with_write_concern(UserStatsCollection.get_collection())
+        # Upsert, so a rollup created now starts out stale (it only counts
+        # what is folded in from here) and a concurrent rebuild's insert fails
+        result = await collection.update_one(
+            {"_id": user_id},
+            {
+                "$inc": {"pending": 1, "version": 1},
+                "$set": {"pending_at": datetime.utcnow()},
+                "$setOnInsert": {"stale": True},
+            },
+            upsert=True
+        )
+        return result.upserted_id is not None
+    
+    @staticmethod
+    async def end_write(user_id: str):
+        """Close a begin_write whose insert/delete didn't happen"""
+        collection = with_write_concern(UserStatsCollection.get_collection())
+        await collection.update_one({"_id": user_id}, {"$inc": {"pending": -1, "version": 1}})
+    
+    @staticmethod
+    async def record_analysis(analysis: dict, rebuild: bool = False):
+        """Fold a newly inserted analysis into the user's rollup and close its begin_write"""
+        collection = with_write_concern(UserStatsCollection.get_collection())
+        await collection.update_one(
+            {"_id": analysis["user_id"]},
+            {
+                "$inc": {**UserStatsCollection._delta(analysis, 1), "pending": -1},
+                "$max": {
+                    "best_score": analysis.get("resume_score", 0),
+                    "last_analysis_date": analysis.get("analysis_date"),
+                },
+                "$setOnInsert": {"stale": True},
+            },
+            upsert=True
+        )
+        if rebuild:
+            # The new rollup only counts this analysis - fold in the older ones
+            await UserStatsCollection.rebuild(analysis["user_id"])
+    
+    @staticmethod
+    async def remove_analysis(analysis: dict):
+        """Take a deleted analysis back out of the user's rollup and close its begin_write"""
+        collection = UserStatsCollection.get_collection()
+        before = await collection.find_one_and_update(
+            {"_id": analysis["user_id"]},
+            {"$inc": {**UserStatsCollection._delta(analysis, -1), "pending": -1}},
+            projection={"best_score": 1, "last_analysis_date": 1}
+        )
+        # Maxima can't be decremented - rebuild when the deleted one held them
+        if (
+            before is None
+            or analysis.get("resume_score", 0) >= before.get("best_score", 0)
+            or analysis.get("analysis_date") == before.get("last_analysis_date")
+        ):
+            await UserStatsCollection.rebuild(analysis["user_id"])
+    
+    @staticmethod
+    def _pipeline(user_id: str, names: dict) -> list:
+        """Rollup aggregation; `names` maps field names to the collection's own"""
+        field = lambda name: names.get(name, name)
+        return [
+            {"$match": {field("user_id"): user_id}},
+            {"$facet": {
+                "totals": [{"$group": {
+                    "_id": None,
+                    "total_analyses": {"$sum": 1},
+                    "score_sum": {"$sum": f"${field('resume_score')}"},
+                    "best_score": {"$max": f"${field('resume_score')}"},
+                    "last_analysis_date": {"$max": f"${field('analysis_date')}"},
+                }}],
+                "fields": [{"$group": {"_id": f"${field('predicted_field')}", "count": {"$sum": 1}}}],
+                # Each analysis counts a skill once, like _delta's set(skills)
+                "skills": [
+                    {"$project": {"skill": {"$setUnion": [{"$ifNull": [f"${field('skills')}", []]}]}}},
+                    {"$unwind": "$skill"},
+                    {"$group": {"_id": "$skill", "count": {"$sum": 1}}},
+                ],
+            }},
+        ]
+    
+    @staticmethod
+    async def _aggregate(user_id: str) -> dict:
+        """A user's rollup from the hot and archived analyses (one aggregation each)"""
+        results = await asyncio.gather(
+            ResumeAnalysesCollection.get_collection()
+                .aggregate(UserStatsCollection._pipeline(user_id, {})).to_list(length=1),
+            ArchivedAnalysesCollection.get_collection()
+                .aggregate(UserStatsCollection._pipeline(user_id, ARCHIVE_FIELDS)).to_list(length=1)
+        )
+        
+        rollup = {
+            "total_analyses": 0,
+            "score_sum": 0,
+            "best_score": 0,
+            "last_analysis_date": None,
+            "fields": {},
+            "skills": {},
+        }
+        for result in results:
+            facets = result[0] if result else {"totals": [], "fields": [], "skills": []}
+            totals = facets["totals"][0] if facets["totals"] else {}
+            rollup["total_analyses"] += totals.get("total_analyses", 0)
+            rollup["score_sum"] += totals.get("score_sum", 0)
+            rollup["best_score"] = max(rollup["best_score"], totals.get("best_score") or 0)
+            last = totals.get("last_analysis_date")
+            if last and (rollup["last_analysis_date"] is None or last > rollup["last_analysis_date"]):
+                rollup["last_analysis_date"] = last
+            for group, counts in (("fields", facets["fields"]), ("skills", facets["skills"])):
+                for item in counts:
+                    key = _stat_key(item["_id"])
+                    rollup[group][key] = rollup[group].get(key, 0) + item["count"]
+        return rollup
+    
+    @staticmethod
+    async def rebuild(user_id: str):
+        """Recompute and store a user's rollup, unless an insert/delete is in flight or lands while it runs"""
+        collection = UserStatsCollection.get_collection()
+        for attempt in range(REBUILD_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(REBUILD_BACKOFF * attempt)
+            current = await collection.find_one({"_id": user_id}, {"version": 1, "pending": 1, "pending_at": 1})
+            if (
+                current is not None
+                and current.get("pending", 0) > 0
+                and current.get("pending_at", datetime.min) > datetime.utcnow() - PENDING_TIMEOUT
+            ):
+                rollup = None
+                continue  # an analysis is between its write and its $inc
+            rollup = await UserStatsCollection._aggregate(user_id)
+            if current is None:
+                try:
+                    await collection.insert_one({"_id": user_id, "version": 0, "pending": 0, **rollup})
+                    return rollup
+                except DuplicateKeyError:
+                    continue  # created concurrently - retry against it
+            version = current.get("version")
+            result = await collection.replace_one(
+                {"_id": user_id, "version": version}, {"version": version, "pending": 0, **rollup}
+            )
+            if result.matched_count:
+                return rollup
+        # Kept losing to concurrent writes: serve the fresh numbers and flag
+        # the stored rollup, so the next read rebuilds it
+        await collection.update_one({"_id": user_id}, {"$set": {"stale": True}})
+        return rollup if rollup is not None else await UserStatsCollection._aggregate(user_id)
+    
+    @staticmethod
+    async def get_summary(user_id: str, top_skills: int = 10):
+        """Stats summary for the profile page"""
+        rollup = await UserStatsCollection.get_collection().find_one({"_id": user_id})
+        if rollup is None or rollup.get("stale"):
+            rollup = await UserStatsCollection.rebuild(user_id)
+        
+        total = rollup.get("total_analyses", 0)
+        if total <= 0:
+            return {
+                "total_analyses": 0,
+                "average_score": 0,
+                "best_score": 0,
+                "most_common_field": "N/A",
+                "skill_frequency": {},
+                "last_analysis_date": None
+            }
+        
+        fields = {k: v for k, v in rollup.get("fields", {}).items() if v > 0}
+        skills = sorted(
+            ((k, v) for k, v in rollup.get("skills", {}).items() if v > 0),
+            key=lambda x: x[1],
+            reverse=True
+        )[:top_skills]
+        
+        return {
+            "total_analyses": total,
+            "average_score": rollup.get("score_sum", 0) / total,
+            "best_score": rollup.get("best_score", 0),
+            "most_common_field": _stat_name(max(fields, key=fields.get)) if fields else "N/A",
+            "skill_frequency": {_stat_name(k): v for k, v in skills},
+            "last_analysis_date": rollup.get("last_analysis_date")
+        }
+
+# Stay clear of the 16MB document limit - larger PDFs keep only their text
+MAX_STORED_PDF_BYTES = 15 * 1024 * 1024
+
+class ResumeSourcesCollection:
+    """
+    Original PDFs and full extracted text, compressed and de-duplicated by
+    content hash. Analyses only keep the hash (source_id), so they stay
+    small while everything needed for a full re-analysis is retained.
+    """
+    @staticmethod
+    def get_collection() -> CollectionBackend:
+        return db.db.resume_sources
+    
+    @staticmethod
+    def source_id(pdf_bytes: bytes) -> str:
+        return content_hash(pdf_bytes)
+    
+    @staticmethod
+    def _pack(pdf_bytes: bytes, text: str) -> dict:
+        packed_text = compress(text.encode("utf-8"))
+        packed_pdf = compress(pdf_bytes)
+        doc = {
+            "codec": DEFAULT_CODEC,
+            "text": Binary(packed_text),
+            "text_size": len(text),
+            "pdf_size": len(pdf_bytes),
+            "created_at": datetime.utcnow(),
+        }
+        if len(packed_pdf) <= MAX_STORED_PDF_BYTES:
+            doc["pdf"] = Binary(packed_pdf)
+        return doc
+    
+    @staticmethod
+    async def store_source(pdf_bytes: bytes, text: str, source_id: Optional[str] = None) -> str:
+        """Store a PDF and its text once; re-uploads of the same file are no-ops"""
+        source_id = source_id or ResumeSourcesCollection.source_id(pdf_bytes)
+        collection = with_write_concern(ResumeSourcesCollection.get_collection())
+        
+        # Cheap existence check first so duplicates skip compression entirely
+        if await collection.find_one({"_id": source_id}, {"_id": 1}):
+            return source_id
+        
+        doc = await asyncio.to_thread(ResumeSourcesCollection._pack, pdf_bytes, text)
+        await collection.update_one(
+            {"_id": source_id},
+            {"$setOnInsert": doc},
+            upsert=True
+        )
+        return source_id
+    
+    @staticmethod
+    async def get_source(source_id: str, include_pdf: bool = False):
+        """Decompressed {"text", "pdf"} for a source id, or None"""
+        projection = None if include_pdf else {"pdf": 0}
+        doc = await ResumeSourcesCollection.get_collection().find_one({"_id": source_id}, projection)
+        return ResumeSourcesCollection.unpack(doc, include_pdf)
+    
+    @staticmethod
+    def unpack(doc: Optional[dict], include_pdf: bool = False):
+        if not doc:
+            return None
+        codec = doc.get("codec", "zlib")
+        source = {
+            "id": doc["_id"],
+            "text": decompress(doc["text"], codec).decode("utf-8"),
+            "pdf": None,
+        }
+        if include_pdf and doc.get("pdf") is not None:
+            source["pdf"] = decompress(doc["pdf"], codec)
+        return source
+
+class ReportsCollection:
+    """
+    Rendered PDF reports, one document per analysis (_id = analysis id, or
+    the content hash for reports without one). `hash` identifies the
+    inputs the PDF was rendered from; a different hash is a cache miss.
+    """
+    @staticmethod
+    def get_collection() -> CollectionBackend:
+        return db.db.reports
+    
+    @staticmethod
+    async def get_report(key: str, content_hash: str) -> Optional[bytes]:
+        doc = await ReportsCollection.get_collection().find_one({"_id": key, "hash": content_hash}, {"pdf": 1})
+        return bytes(doc["pdf"]) if doc else None
+    
+    @staticmethod
+    async def store_report(key: str, content_hash: str, pdf: bytes):
+        await ReportsCollection.get_collection().replace_one(
+            {"_id": key},
+            {"hash": content_hash, "pdf": Binary(pdf), "size": len(pdf), "created_at": datetime.utcnow()},
+            upsert=True
+        )
+    
+    @staticmethod
+    async def delete_report(key: str):
+        await ReportsCollection.get_collection().delete_one({"_id": key})
 
 class CoursesCollection:
     @staticmethod
-    def get_collection():
+    def get_collection() -> CollectionBackend:
         return db.db.courses
     
     @staticmethod
@@ -191,10 +1050,19 @@ class CoursesCollection:
         
         return courses
     
+    @staticmethod
+    async def get_all_courses():
+        """Every course, only the fields the search index uses"""
+        cursor = CoursesCollection.get_collection().find({}, {"title": 1, "url": 1, "field": 1, "platform": 1})
+        return [convert_objectid(doc) async for doc in cursor]
+    
     @staticmethod
     async def add_course(course_data: dict):
-        """Add a new course to the database"""
+        """Add a new course to the database (and to this worker's search index)"""
+        from course_search import load_course_index
+
         collection = CoursesCollection.get_collection()
         result = await collection.insert_one(course_data)
         course_data['id'] = str(result.inserted_id)
+        await load_course_index()
         return course_data
\ No newline at end of file
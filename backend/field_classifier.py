@@ -0,0 +1,108 @@
+# backend/field_classifier.py
+# TF-IDF + logistic regression over the resume text, predicting the career
+# field with a confidence. Trained offline (train_classifier.py) and saved
+# with joblib; each worker loads the model once, on first use. Without a
+# model file (or without scikit-learn) predictions return None and the
+# analyzer keeps its keyword rules - until the file appears: a failed load
+# is not cached, so a model trained after startup is picked up without a
+# restart.
+from typing import Dict, List, Optional, Sequence
+import os
+
+try:
+    import joblib
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+except ImportError:
+    joblib = None
+
+FIELD_MODEL_PATH = os.getenv("FIELD_MODEL_PATH", "field_classifier.joblib")
+# Below this the analyzer falls back to the keyword rules
+FIELD_MIN_CONFIDENCE = float(os.getenv("FIELD_MIN_CONFIDENCE", "0.5"))
+MAX_TEXT_CHARS = 20000  # longer resumes don't change the prediction, only the latency
+
+_models: Dict[str, "Pipeline"] = {}
+_load_failures: Dict[str, str] = {}  # path -> last error, so each one is reported once
+
+
+def build_pipeline() -> "Pipeline":
+    return Pipeline([
+        ("tfidf", TfidfVectorizer(
+            lowercase=True,
+            sublinear_tf=True,
+            ngram_range=(1, 2),
+            min_df=2,
+            max_features=50000,
+            token_pattern=r"(?u)\w[\w+#.]*[\w+#]",  # keeps c++, c#, node.js
+            dtype=np.float32,
+        )),
+        ("clf", LogisticRegression(max_iter=2000, C=4.0)),
+    ])
+
+
+def train(texts: Sequence[str], labels: Sequence[str]) -> "Pipeline":
+    if joblib is None:
+        raise RuntimeError("scikit-learn and joblib are required to train the field classifier")
+    model = build_pipeline()
+    model.fit([text[:MAX_TEXT_CHARS] for text in texts], list(labels))
+    return model
+
+
+def save_model(model: "Pipeline", path: str = FIELD_MODEL_PATH):
+    tmp = f"{path}.tmp"
+    joblib.dump(model, tmp, compress=3)
+    os.replace(tmp, path)
+
+
+def load_model(path: str = FIELD_MODEL_PATH) -> Optional["Pipeline"]:
+    """The trained pipeline, loaded once per process; None if unavailable (retried on the next call)"""
+    if joblib is None:
+        return None
+    if path in _models:
+        return _models[path]
+    try:
+        model = joblib.load(path)
+    except FileNotFoundError:
+        error = f"⚠️ No field classifier at {path}, using keyword field detection"
+    except Exception as e:
+        error = f"⚠️ Failed to load field classifier {path}: {e}"
+    else:
+        _load_failures.pop(path, None)
+        _models[path] = model
+        print(f"✅ Field classifier loaded: {', '.join(model.classes_)}")
+        return model
+    if _load_failures.get(path) != error:
+        _load_failures[path] = error
+        print(error)
+    return None
+
+
+def predict_fields(texts: Sequence[str], model: Optional["Pipeline"] = None) -> List[Optional[dict]]:
+    """
+    Batch prediction: one {"field", "confidence", "scores"} per text, in
+    order (None for every text if there is no model). One vectorizer pass
+    and one matrix product for the whole batch.
+    """
+    model = model or load_model()
+    if model is None:
+        return [None] * len(texts)
+    if not texts:
+        return []
+
+    probabilities = model.predict_proba([(text or "")[:MAX_TEXT_CHARS] for text in texts])
+    classes = [str(label) for label in model.classes_]
+    predictions = []
+    for row in probabilities:
+        best = int(row.argmax())
+        predictions.append({
+            "field": classes[best],
+            "confidence": round(float(row[best]), 4),
+            "scores": {label: round(float(p), 4) for label, p in zip(classes, row)},
+        })
+    return predictions
+
+
+def predict_field(text: str) -> Optional[dict]:
+    return predict_fields([text])[0]
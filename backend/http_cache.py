@@ -0,0 +1,47 @@
+# backend/http_cache.py
+# HTTP caching helpers shared by the report and course endpoints. No
+# imports beyond the standard library, so modules that only serve cached
+# responses don't pull in the database or the PDF renderer.
+from typing import Optional
+
+
+def report_etag(digest: str) -> str:
+    """Strong ETag for a content hash"""
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for it)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _quality(params: str) -> float:
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """
+    True if an Accept-Encoding header allows `coding` (RFC 9110 12.5.3):
+    an explicit entry wins over `*`, and q=0 means "not acceptable".
+    """
+    if not accept_encoding:
+        return False
+    wildcard = None
+    for entry in accept_encoding.split(","):
+        name, _, params = entry.partition(";")
+        name = name.strip().lower()
+        if name == coding:
+            return _quality(params) > 0
+        if name == "*":
+            wildcard = _quality(params) > 0
+    return bool(wildcard)
@@ -0,0 +1,248 @@
+# backend/indexes.py
+# Declared indexes and the queries that must use them.
+#
+#   python indexes.py            # build whatever is missing and exit (1 if any index failed)
+#   python indexes.py --check    # ...then explain() every hot query, exit 1 on a collection scan
+#
+# On startup Database.connect() compares INDEXES with what the collections
+# already have and builds only the missing ones, in a background task, so
+# workers don't re-issue every create_index() before serving requests.
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import sys
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+# collection -> list of (keys, options)
+INDEXES: Dict[str, List[tuple]] = {
+    "users": [
+        ([("email", ASCENDING)], {"unique": True}),
+        ([("created_at", DESCENDING)], {}),
+    ],
+    "resume_analyses": [
+        ([("user_id", ASCENDING)], {}),
+        ([("analysis_date", DESCENDING)], {}),
+        # _id is the tie-breaker for keyset pagination of the history
+        ([("user_id", ASCENDING), ("analysis_date", DESCENDING), ("_id", DESCENDING)], {}),
+    ],
+    # Short field names, see ARCHIVE_FIELDS in database.py
+    "analyses_archive": [
+        ([("u", ASCENDING), ("d", DESCENDING), ("_id", DESCENDING)], {}),
+    ],
+    # resume_sources and user_stats are only read by _id
+    "courses": [
+        ([("field", ASCENDING)], {}),
+    ],
+}
+
+
+def _key_spec(keys) -> tuple:
+    return tuple((field, int(direction)) for field, direction in keys)
+
+
+async def missing_indexes(database) -> List[tuple]:
+    """Declared indexes that don't exist yet, as (collection, keys, options)"""
+    missing = []
+    for collection, declared in INDEXES.items():
+        existing = await database[collection].index_information()
+        existing_specs = {_key_spec(info["key"]): info for info in existing.values()}
+        for keys, options in declared:
+            info = existing_specs.get(_key_spec(keys))
+            if info is None or bool(info.get("unique")) != bool(options.get("unique")):
+                missing.append((collection, keys, options))
+    return missing
+
+
+def _index_label(collection: str, keys) -> str:
+    return f"{collection}." + "_".join(f"{field}_{int(direction)}" for field, direction in keys)
+
+
+async def ensure_indexes(database) -> Tuple[List[str], List[str]]:
+    """
+    Build only the missing indexes, each on its own: one failure (e.g. a
+    unique index over duplicate data) doesn't stop the others. Returns the
+    names that were created and the "collection.index: error" failures.
+    """
+    created, failed = [], []
+    try:
+        missing = await missing_indexes(database)
+    except Exception as e:
+        print(f"⚠️ Failed to list indexes: {e}")
+        return created, [f"*: {e}"]
+
+    for collection, keys, options in missing:
+        try:
+            name = await database[collection].create_index(keys, background=True, **options)
+            created.append(f"{collection}.{name}")
+        except Exception as e:
+            failed.append(f"{_index_label(collection, keys)}: {e}")
+
+    if created:
+        print(f"✅ Created indexes: {', '.join(created)}")
+    elif not failed:
+        print("✅ Database indexes up to date")
+    for failure in failed:
+        print(f"⚠️ Failed to create index {failure}")
+    return created, failed
+
+
+# ----------------- QUERY PLAN ASSERTIONS -----------------
+# Every hot query with representative values, built by the same helpers the
+# collection classes in database.py use, so a changed query shape is checked
+# as it is. `sort` queries must also be served in index order (no blocking
+# SORT stage).
+_SAMPLE_ID = ObjectId()
+_SAMPLE_USER = str(ObjectId())
+_SAMPLE_DATE = datetime(2024, 1, 1)
+
+
+def hot_queries() -> List[dict]:
+    # Imported here: database.py imports ensure_indexes from this module
+    from database import (
+        ARCHIVE_BATCH_SORT,
+        ARCHIVE_FIELDS,
+        archive_batch_query,
+        encode_cursor,
+        history_sort,
+        keyset_query,
+        owned_query,
+        selection_query,
+    )
+
+    cursor = encode_cursor(_SAMPLE_DATE, _SAMPLE_ID)
+    archive_user, archive_date = ARCHIVE_FIELDS["user_id"], ARCHIVE_FIELDS["analysis_date"]
+    return [
+        {
+            "name": "users.find_by_email",
+            "collection": "users",
+            "filter": {"email": "someone@example.com"},
+        },
+        {
+            "name": "users.find_by_id",
+            "collection": "users",
+            "filter": {"_id": _SAMPLE_ID},
+        },
+        {
+            "name": "resume_analyses.history_first_page",
+            "collection": "resume_analyses",
+            "filter": keyset_query("user_id", "analysis_date", _SAMPLE_USER),
+            "sort": history_sort(),
+        },
+        {
+            "name": "resume_analyses.history_next_page",
+            "collection": "resume_analyses",
+            "filter": keyset_query("user_id", "analysis_date", _SAMPLE_USER, cursor),
+            "sort": history_sort(),
+        },
+        {
+            "name": "resume_analyses.by_owner",
+            "collection": "resume_analyses",
+            "filter": owned_query(_SAMPLE_ID, "user_id", _SAMPLE_USER),
+        },
+        {
+            "name": "resume_analyses.archive_batch",
+            "collection": "resume_analyses",
+            "filter": archive_batch_query(_SAMPLE_DATE),
+            "sort": ARCHIVE_BATCH_SORT,
+        },
+        {
+            "name": "resume_analyses.export_range",
+            "collection": "resume_analyses",
+            "filter": selection_query(
+                "user_id", "analysis_date", _SAMPLE_USER, start_date=_SAMPLE_DATE, end_date=datetime(2025, 1, 1)
+            ),
+            "sort": history_sort(),
+        },
+        {
+            "name": "analyses_archive.history_page",
+            "collection": "analyses_archive",
+            "filter": keyset_query(archive_user, archive_date, _SAMPLE_USER, cursor),
+            "sort": history_sort(archive_date),
+        },
+        {
+            "name": "user_stats.get_summary",
+            "collection": "user_stats",
+            "filter": {"_id": _SAMPLE_USER},
+        },
+        {
+            "name": "courses.get_courses_by_field",
+            "collection": "courses",
+            "filter": {"field": "Data Science"},
+        },
+    ]
+
+
+def plan_stages(explain: dict) -> List[str]:
+    """All stage names in an explain() document (classic and SBE layouts)"""
+    stages = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if isinstance(node.get("stage"), str):
+                stages.append(node["stage"])
+            for key, value in node.items():
+                if key != "rejectedPlans":
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain.get("queryPlanner", {}).get("winningPlan", explain))
+    return stages
+
+
+async def check_query_plans(database, queries: Optional[List[dict]] = None) -> List[str]:
+    """explain() every hot query; returns a list of failures (empty = all indexed)"""
+    failures = []
+    for query in queries or hot_queries():
+        cursor = database[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        stages = plan_stages(await cursor.explain())
+
+        problem = None
+        if "COLLSCAN" in stages:
+            problem = "collection scan"
+        elif query.get("sort") and "SORT" in stages:
+            problem = "in-memory sort"
+
+        print(f"{'❌' if problem else '✅'} {query['name']}: {' > '.join(stages)}" + (f" ({problem})" if problem else ""))
+        if problem:
+            failures.append(f"{query['name']}: {problem}")
+    return failures
+
+
+async def _run(check: bool, backend: Optional[str]) -> int:
+    from database import db
+
+    await db.connect(backend=backend)
+    try:
+        _, failed = await db.wait_for_indexes()
+        if failed:
+            print(f"\n{len(failed)} index{'' if len(failed) == 1 else 'es'} could not be built")
+            return 1
+        if not check:
+            return 0
+        failures = await check_query_plans(db.db)
+        if failures:
+            print(f"\n{len(failures)} hot quer{'y' if len(failures) == 1 else 'ies'} not served by an index")
+            return 1
+        print("\nAll hot queries use an index")
+        return 0
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build missing indexes and check hot query plans")
+    parser.add_argument("--check", action="store_true", help="Fail if a hot query falls back to a collection scan")
+    parser.add_argument("--backend", default=None, help="Storage backend (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_run(args.check, args.backend)))
+
+
+if __name__ == "__main__":
+    main()
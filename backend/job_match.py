@@ -1,9 +1,10 @@
-import requests
 import os
 
+from rapidapi import scheduler, PRIORITY_BACKGROUND
+
 RAPID_KEY = os.getenv("RAPIDAPI_KEY")
 
-def fetch_jobs(query, location="India"):
+def fetch_jobs(query, location="India", priority=PRIORITY_BACKGROUND):
     url = "https://jsearch.p.rapidapi.com/search"
 
     params = {
@@ -18,7 +19,7 @@ def fetch_jobs(query, location="India"):
         "x-rapidapi-host": "jsearch.p.rapidapi.com"
     }
 
-    response = requests.get(url, headers=headers, params=params)
+    response = scheduler.get(url, priority=priority, headers=headers, params=params)
 
     data = response.json()
     return data.get("data", [])
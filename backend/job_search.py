@@ -0,0 +1,280 @@
+# backend/job_search.py
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from rapidapi import scheduler, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, QUEUE_TIMEOUT, RapidAPIError
+
+load_dotenv()
+
+RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+RAPIDAPI_HOST = os.getenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
+
+JSEARCH_SEARCH_URL = f"https://{RAPIDAPI_HOST}/search"
+JSEARCH_DETAILS_URL = f"https://{RAPIDAPI_HOST}/job-details"
+
+# ----------------- COMPACT JOB MODEL -----------------
+# Only what the Job Finder list actually renders. Everything else
+# (highlights, employer metadata, full HTML description...) is opt-in.
+COMPACT_FIELDS = (
+    "job_id",
+    "job_title",
+    "employer_name",
+    "employer_logo",
+    "job_city",
+    "job_state",
+    "job_country",
+    "job_is_remote",
+    "job_employment_type",
+    "job_apply_link",
+    "job_posted_at_datetime_utc",
+)
+
+DESCRIPTION_SNIPPET_LENGTH = 300
+
+# Raw jobs seen in recent searches, so the detail view rarely needs
+# another upstream call.
+RAW_JOB_CACHE_SIZE = int(os.getenv("JOB_DETAIL_CACHE_SIZE", "500"))
+_raw_jobs: "OrderedDict[str, dict]" = OrderedDict()
+
+# Search results by (query, location), filled by interactive searches and
+# by the prefetch that runs after a resume analysis.
+SEARCH_CACHE_TTL = int(os.getenv("JOB_SEARCH_CACHE_TTL", "1800"))  # seconds
+SEARCH_CACHE_SIZE = int(os.getenv("JOB_SEARCH_CACHE_SIZE", "200"))
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+
+_cache_lock = threading.Lock()
+
+
+def _remember(job: dict):
+    job_id = job.get("job_id")
+    if not job_id:
+        return
+    with _cache_lock:
+        _raw_jobs[job_id] = job
+        _raw_jobs.move_to_end(job_id)
+        while len(_raw_jobs) > RAW_JOB_CACHE_SIZE:
+            _raw_jobs.popitem(last=False)
+
+
+def _search_key(query: str, location: str) -> tuple:
+    return (" ".join(query.lower().split()), " ".join(location.lower().split()))
+
+
+def _cached_search(key: tuple) -> Optional[List[dict]]:
+    with _cache_lock:
+        entry = _search_cache.get(key)
+        if not entry:
+            return None
+        stored_at, jobs = entry
+        if time.monotonic() - stored_at > SEARCH_CACHE_TTL:
+            del _search_cache[key]
+            return None
+        _search_cache.move_to_end(key)
+        return jobs
+
+
+def _store_search(key: tuple, jobs: List[dict]):
+    with _cache_lock:
+        _search_cache[key] = (time.monotonic(), jobs)
+        _search_cache.move_to_end(key)
+        while len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+
+
+def _snippet(description: Optional[str]) -> str:
+    if not description:
+        return ""
+    text = " ".join(description.split())
+    if len(text) <= DESCRIPTION_SNIPPET_LENGTH:
+        return text
+    return text[:DESCRIPTION_SNIPPET_LENGTH].rsplit(" ", 1)[0] + "..."
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Parse a comma separated ?fields= value"""
+    if not fields:
+        return []
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+
+def compact_job(job: dict, extra_fields: Iterable[str] = ()) -> dict:
+    """Project a raw JSearch job onto the compact list model"""
+    compact = {field: job.get(field) for field in COMPACT_FIELDS}
+    compact["job_description"] = _snippet(job.get("job_description"))
+    for field in extra_fields:
+        if field in job:
+            compact[field] = job[field]
+    return compact
+
+
+def full_job(job: dict) -> dict:
+    """Full detail model (compact fields + complete description and extras)"""
+    return {**compact_job(job), **job}
+
+
+class JobSearchUpstreamError(RapidAPIError):
+    """JSearch answered with an error status"""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"JSearch returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _data(response) -> List[dict]:
+    """The `data` list of a JSearch response; error statuses raise instead of parsing the error body"""
+    if response.status_code != 200:
+        raise JobSearchUpstreamError(response.status_code)
+    return response.json().get("data", []) or []
+
+
+def _headers() -> dict:
+    return {
+        "x-rapidapi-key": RAPIDAPI_KEY,
+        "x-rapidapi-host": RAPIDAPI_HOST
+    }
+
+
+def fetch_raw_jobs(
+    query: str,
+    location: str,
+    priority: int = PRIORITY_INTERACTIVE,
+    timeout: float = QUEUE_TIMEOUT
+) -> List[dict]:
+    """Return the raw job list, from the search cache or JSearch (through the RapidAPI scheduler)"""
+    key = _search_key(query, location)
+    cached = _cached_search(key)
+    if cached is not None:
+        return cached
+
+    params = {
+        "query": f"{query} jobs in {location}",
+        "num_pages": 1
+    }
+
+    response = scheduler.get(
+        JSEARCH_SEARCH_URL,
+        priority=priority,
+        timeout=timeout,
+        headers=_headers(),
+        params=params
+    )
+    jobs = _data(response)
+
+    _store_search(key, jobs)
+    for job in jobs:
+        _remember(job)
+    return jobs
+
+
+def search_jobs(query: str, location: str, fields: Optional[str] = None, detail: Optional[str] = None) -> Dict:
+    """Search jobs and shape them for the list view"""
+    raw_jobs = fetch_raw_jobs(query, location)
+
+    if detail == "full":
+        jobs = [full_job(job) for job in raw_jobs]
+    else:
+        extra_fields = parse_fields(fields)
+        jobs = [compact_job(job, extra_fields) for job in raw_jobs]
+
+    return {
+        "query": query,
+        "location": location,
+        "count": len(jobs),
+        "jobs": jobs
+    }
+
+
+def get_job_details(job_id: str) -> Optional[dict]:
+    """Full description for a single job, from the recent-search cache or JSearch"""
+    with _cache_lock:
+        job = _raw_jobs.get(job_id)
+
+    if job is None:
+        response = scheduler.get(
+            JSEARCH_DETAILS_URL,
+            headers=_headers(),
+            params={"job_id": job_id}
+        )
+        data = _data(response)
+        if not data:
+            return None
+        job = data[0]
+        _remember(job)
+
+    return full_job(job)
+
+
+# ----------------- PREDICTIVE PREFETCH -----------------
+PREFETCH_ENABLED = os.getenv("JOB_PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_MAX_SKILLS = int(os.getenv("JOB_PREFETCH_MAX_SKILLS", "2"))
+PREFETCH_CONCURRENCY = int(os.getenv("JOB_PREFETCH_CONCURRENCY", "1"))
+PREFETCH_QUEUE_TIMEOUT = 2.0  # background work never waits long for a slot
+
+_prefetch_slots = threading.BoundedSemaphore(PREFETCH_CONCURRENCY)
+
+
+def skill_query(skill: str) -> str:
+    return f"{skill} developer"
+
+
+def prefetch_queries(
+    predicted_field: Optional[str],
+    skills: Iterable[str],
+    field_keywords: Iterable[str] = ()
+) -> List[str]:
+    """
+    The Job Finder searches for an analysis, in the order the tab offers
+    them: the predicted field (its default query), then the resume's skills
+    that matter most for that field, in the field's keyword order. The
+    analysis response carries these exact strings to the frontend, so a
+    prefetched search is always a search the UI actually sends.
+    """
+    if not predicted_field or predicted_field == "Not Detected":
+        return []
+    rank = {keyword.lower(): i for i, keyword in enumerate(field_keywords)}
+    unique = {}  # one spelling per skill, searches are case-insensitive
+    for skill in skills or []:
+        unique.setdefault(skill.lower(), skill)
+    relevant = sorted(
+        (skill for key, skill in unique.items() if key in rank),
+        key=lambda skill: rank[skill.lower()]
+    )
+    return [predicted_field] + [skill_query(skill) for skill in relevant[:PREFETCH_MAX_SKILLS]]
+
+
+def prefetch_jobs(queries: List[str], location: Optional[str] = None):
+    """
+    Warm the search cache with prefetch_queries() after a resume analysis.
+
+    Runs as a background task at background priority: it is skipped when
+    another prefetch already holds the slot or when the RapidAPI budget has
+    no headroom, so it never competes with interactive searches.
+    """
+    if not PREFETCH_ENABLED:
+        return
+
+    if not _prefetch_slots.acquire(blocking=False):
+        return
+
+    try:
+        location = location or "India"
+        for query in queries:
+            if _cached_search(_search_key(query, location)) is not None:
+                continue
+            if not scheduler.has_headroom(PRIORITY_BACKGROUND):
+                print("⚠️ Job prefetch skipped: no RapidAPI headroom")
+                break
+            try:
+                fetch_raw_jobs(query, location, priority=PRIORITY_BACKGROUND, timeout=PREFETCH_QUEUE_TIMEOUT)
+            except RapidAPIError as e:
+                print(f"⚠️ Job prefetch stopped: {e}")
+                break
+            except Exception as e:
+                print(f"⚠️ Job prefetch failed for '{query}': {e}")
+    finally:
+        _prefetch_slots.release()
@@ -1,8 +1,10 @@
 # backend/auth.py
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -11,10 +13,28 @@ load_dotenv()
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+# Access tokens are short-lived: their claims (tier, active) are trusted
+# without a lookup until they expire, then the refresh token renews them.
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost factor, e.g. BCRYPT_ROUNDS=4 for tests, 12+ in production.
+# Hashes made with a different cost are re-hashed on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt releases the GIL, so a small thread pool keeps hashing off the
+# event loop; its size caps how many hashes run at once per worker.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -24,6 +44,21 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    """get_password_hash on the bcrypt pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, pwd_context.hash, password)
+
+async def check_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify on the bcrypt pool. Returns (valid, new_hash); new_hash is set
+    when the stored hash uses an outdated cost factor and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -62,11 +97,16 @@ async def authenticate_user(email: str, password: str):
     
     if not user:
         return False
-    if not verify_password(password, user["hashed_password"]):
+    valid, new_hash = await check_password(password, user["hashed_password"])
+    if not valid:
         return False
     
-    # Update last login
-    await UsersCollection.update_user(user["id"], {"last_login": datetime.utcnow()})
+    # Upgrade the hash if the cost factor changed (rare, so awaited)
+    if new_hash:
+        await UsersCollection.update_user(user["id"], {"hashed_password": new_hash})
+    
+    # last_login is written in the background, batched with other logins
+    UsersCollection.record_login(user["id"])
     
     return user
 
@@ -96,15 +136,22 @@ def get_user_id_from_token(token: str) -> Optional[str]:
     return payload.get("user_id")
 
 async def get_current_user_data(token: str):
-    """Get current user data from token"""
+    """Get current user data from token (served from the user cache when possible)"""
     from database import UsersCollection
     
-    email = get_current_user(token)
-    if not email:
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access":
         return None
     
-    user = await UsersCollection.find_by_email(email)
-    return user
+    user_id = payload.get("user_id")
+    if user_id:
+        return await UsersCollection.get_cached(user_id)
+    
+    # Older tokens only carry the email
+    email = payload.get("sub")
+    if not email:
+        return None
+    return await UsersCollection.find_by_email(email)
 
 def validate_token(token: str) -> bool:
     """Validate if a token is valid"""
@@ -123,13 +170,33 @@ def validate_token(token: str) -> bool:
     
     return True
 
-def create_tokens(user_data: dict):
-    """Create both access and refresh tokens for a user"""
-    access_token = create_access_token({
+def token_claims(user_data: dict) -> dict:
+    """Access token claims - the same for password, Google and GitHub logins"""
+    return {
         "sub": user_data["email"],
         "user_id": user_data["id"],
-        "name": user_data["name"]
-    })
+        "name": user_data.get("name"),
+        "tier": user_data.get("subscription_tier", "free"),
+        "active": user_data.get("is_active", True)
+    }
+
+def get_token_claims(token: str) -> Optional[dict]:
+    """Caller identity from a verified access token, without touching storage"""
+    payload = decode_token(token)
+    if not payload or payload.get("type") != "access" or not payload.get("user_id"):
+        return None
+    
+    return {
+        "id": payload["user_id"],
+        "email": payload.get("sub"),
+        "name": payload.get("name"),
+        "tier": payload.get("tier", "free"),
+        "active": payload.get("active", True)
+    }
+
+def create_tokens(user_data: dict):
+    """Create both access and refresh tokens for a user"""
+    access_token = create_access_token(token_claims(user_data))
     
     refresh_token = create_refresh_token({
         "sub": user_data["email"],
@@ -155,17 +222,10 @@ async def refresh_access_token(refresh_token: str):
     if not email or not user_id:
         return None
     
-    # Verify user still exists
+    # Verify user still exists and is active - claims are re-issued from the stored user
     from database import UsersCollection
-    user = await UsersCollection.find_by_email(email)
-    if not user:
+    user = await UsersCollection.get_cached(user_id)
+    if not user or not user.get("is_active", True):
         return None
     
-    # Create new access token
-    new_access_token = create_access_token({
-        "sub": email,
-        "user_id": user_id,
-        "name": user["name"]
-    })
-    
-    return new_access_token
+    return create_access_token(token_claims(user))
@@ -5,13 +5,16 @@ from contextlib import asynccontextmanager
 from database import db  # MongoDB database connection
 import datetime
 # Import your existing modules
-from fastapi import FastAPI, UploadFile, File, HTTPException,status
+from fastapi import FastAPI, UploadFile, File, HTTPException,status, Request, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from dotenv import load_dotenv
 from groq import Groq
-import requests
+import asyncio
+import math
 import os
+from typing import Optional
+import requests
 from starlette.middleware.sessions import SessionMiddleware
 
 
@@ -19,28 +22,24 @@ from starlette.middleware.sessions import SessionMiddleware
 
 # Import your existing analysis modules
 from analyzer import analyze_resume
-from pdf_report import generate_pdf_report
+from job_search import search_jobs, get_job_details, JobSearchUpstreamError
+from rapidapi import scheduler, RapidAPIRateLimited, RapidAPIQuotaExhausted
+from reports import get_report, report_hash, shutdown_pool
+from http_cache import report_etag, etag_matches
+from catalog import field_response, ALL_COURSES_RESPONSE
+from course_search import load_course_index, search_courses
 from models import ResumeAnalysis, RewriteRequest, JobMatchRequest
 
 # Import routes (NEW)
 from routes import users, resume
+from routes.users import get_current_claims
 from routes import oauth
 
-# Import your Courses module
-try:
-    import Courses
-except ImportError:
-    import sys
-    sys.path.append('.')
-    import Courses
-
 # Load environment variables from .env
 load_dotenv()
 
 # ---- KEYS ----
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
-RAPIDAPI_HOST = os.getenv("RAPIDAPI_HOST", "jsearch.p.rapidapi.com")
 
 # ---- Groq Client ----
 client = Groq(api_key=GROQ_API_KEY)
@@ -56,10 +55,14 @@ async def lifespan(app: FastAPI):
         print(f"❌ Failed to connect to MongoDB: {e}")
         # Continue anyway for development
     
+    # Course search index: Courses.py + the courses collection (if connected)
+    await load_course_index()
+    
     yield
     
     # Shutdown: Disconnect from MongoDB
     await db.disconnect()
+    shutdown_pool()
 
 # ============= CREATE FASTAPI APP =============
 app = FastAPI(
@@ -85,6 +88,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Export-Id"],
 )
 
 # ============= INCLUDE ROUTERS =============
@@ -122,119 +126,160 @@ async def health():
 # ========================================================
 # 🔥 NEW COURSES ENDPOINTS - UPDATED FOR AUTH
 # ========================================================
-@app.get("/api/courses/{field}")
-async def get_courses(field: str):
+# Declared before /api/courses/{field}, which would otherwise match "search"
+@app.get("/api/courses/search")
+async def search_course_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    field: Optional[str] = None
+):
     """
-    Get courses for a specific field
-    Example: GET /api/courses/web_development
+    Search course titles - words, prefix of the last word, and typos
+    Example: GET /api/courses/search?q=machin lern
     """
-    # Map frontend field names to your course lists
-    course_mapping = {
-        # Data Science
-        "data_science": Courses.ds_course,
-        "datascience": Courses.ds_course,
-        "data-science": Courses.ds_course,
-        
-        # Web Development
-        "web_development": Courses.web_course,
-        "webdevelopment": Courses.web_course,
-        "web": Courses.web_course,
-        
-        # Android
-        "android": Courses.android_course,
-        "android_development": Courses.android_course,
-        "androiddevelopment": Courses.android_course,
-        
-        # iOS
-        "ios": Courses.ios_course,
-        "ios_development": Courses.ios_course,
-        "iosdevelopment": Courses.ios_course,
-        
-        # UI/UX
-        "ui_ux": Courses.uiux_course,
-        "uiux": Courses.uiux_course,
-        "ui_ux_design": Courses.uiux_course,
-        "design": Courses.uiux_course,
-        
-        # Resume Videos
-        "resume": Courses.resume_videos,
-        "resume_writing": Courses.resume_videos,
-        "resumevideos": Courses.resume_videos,
-        
-        # Interview Videos
-        "interview": Courses.interview_videos,
-        "interview_preparation": Courses.interview_videos,
-        "interviewvideos": Courses.interview_videos,
-    }
-    
-    # Get courses or return empty list
-    courses = course_mapping.get(field.lower(), [])
-    
+    courses = search_courses(q, limit, field)
     return {
-        "field": field,
+        "query": q,
         "courses": courses,
-        "count": len(courses),
-        "message": f"Found {len(courses)} courses for {field}"
+        "count": len(courses)
     }
 
+@app.get("/api/courses/{field}")
+async def get_courses(field: str, request: Request):
+    """
+    Get courses for a specific field
+    Example: GET /api/courses/web_development
+    """
+    return field_response(field, request)
+
 @app.get("/api/all-courses")
-async def get_all_courses():
+async def get_all_courses(request: Request):
     """
     Get all available courses
     Example: GET /api/all-courses
     """
-    return {
-        "data_science": Courses.ds_course,
-        "web_development": Courses.web_course,
-        "android": Courses.android_course,
-        "ios": Courses.ios_course,
-        "ui_ux": Courses.uiux_course,
-        "resume_videos": Courses.resume_videos,
-        "interview_videos": Courses.interview_videos,
-        "message": "All available courses",
-        "total_count": len(Courses.ds_course) + len(Courses.web_course) + len(Courses.android_course) + 
-                     len(Courses.ios_course) + len(Courses.uiux_course) + 
-                     len(Courses.resume_videos) + len(Courses.interview_videos)
-    }
+    return ALL_COURSES_RESPONSE.respond(request)
 
 # ========================================================
 # 1️⃣ DOWNLOAD PDF REPORT - UPDATED FOR AUTH
 # ========================================================
 @app.post("/download-report")
-async def download_report(data: dict):
-    pdf_buffer = generate_pdf_report(data)
-
-    return StreamingResponse(
-        pdf_buffer,
+async def download_report(
+    data: dict,
+    request: Request,
+    current_user: dict = Depends(get_current_claims)
+):
+    """Report for an analysis result posted by a signed-in user (saved analyses: GET /resume/{id}/report)"""
+    # Same inputs -> same ETag, so a repeat request can be answered without a body
+    etag = report_etag(report_hash(data))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # Arbitrary client payload: never stored or cached under the client's
+    # "id" (saved analyses use GET /resume/{id}/report). Without an
+    # analysis_id the memory cache is keyed by the content hash, so a
+    # repeat download is served from it without being persisted.
+    pdf, etag = await get_report(data, persist=False)
+
+    return Response(
+        pdf,
         media_type="application/pdf",
-        headers={"Content-Disposition": "attachment; filename=resume_report.pdf"}
+        headers={
+            "Content-Disposition": "attachment; filename=resume_report.pdf",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
+        }
     )
 
 
 # ========================================================
 # 2️⃣ REAL JOB SEARCH (RapidAPI JSearch)
 # ========================================================
+def _rate_limited(e: RapidAPIRateLimited) -> HTTPException:
+    retry_after = math.ceil(e.retry_after or 1)
+    return HTTPException(
+        status_code=429,
+        detail="Job search is busy, please retry shortly",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def _quota_exhausted(e: RapidAPIQuotaExhausted) -> HTTPException:
+    headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+    return HTTPException(
+        status_code=503,
+        detail="Job search is temporarily unavailable (API quota reached)",
+        headers=headers
+    )
+
+
+def _upstream_error(e: JobSearchUpstreamError) -> HTTPException:
+    return HTTPException(
+        status_code=502,
+        detail=f"Job search provider returned HTTP {e.status_code}"
+    )
+
+
+def _network_error(e: requests.RequestException) -> HTTPException:
+    if isinstance(e, requests.Timeout):
+        return HTTPException(status_code=504, detail="Job search provider timed out")
+    return HTTPException(status_code=502, detail="Job search provider is unreachable")
+
+
 @app.get("/job-search")
-async def job_search(query: str = "developer", location: str = "India"):
+async def job_search(
+    query: str = "developer",
+    location: str = "India",
+    fields: Optional[str] = None,
+    detail: Optional[str] = None
+):
     """
     Search real jobs using RapidAPI JSearch
-    """
-
-    url = "https://jsearch.p.rapidapi.com/search"
-
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": RAPIDAPI_HOST
-    }
 
-    params = {
-        "query": f"{query} jobs in {location}",
-        "num_pages": 1
-    }
+    Returns the compact job model by default. Extra raw fields can be
+    requested with ?fields=job_highlights,job_min_salary or the complete
+    jobs with ?detail=full.
+    """
+    try:
+        return await asyncio.to_thread(search_jobs, query, location, fields, detail)
+    except RapidAPIRateLimited as e:
+        raise _rate_limited(e)
+    except RapidAPIQuotaExhausted as e:
+        raise _quota_exhausted(e)
+    except JobSearchUpstreamError as e:
+        raise _upstream_error(e)
+    except requests.RequestException as e:
+        raise _network_error(e)
+
+
+@app.get("/job-search/usage")
+async def job_search_usage(current_user: dict = Depends(get_current_claims)):
+    """
+    RapidAPI quota usage counters (signed-in users only)
+    """
+    return scheduler.usage()
 
-    response = requests.get(url, headers=headers, params=params)
 
-    return response.json()
+@app.get("/job-details")
+async def job_details(job_id: str):
+    """
+    Full description for a single job from the search results
+    """
+    try:
+        job = await asyncio.to_thread(get_job_details, job_id)
+    except RapidAPIRateLimited as e:
+        raise _rate_limited(e)
+    except RapidAPIQuotaExhausted as e:
+        raise _quota_exhausted(e)
+    except JobSearchUpstreamError as e:
+        raise _upstream_error(e)
+    except requests.RequestException as e:
+        raise _network_error(e)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job
 
 
 @app.post("/job-match")
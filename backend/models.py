@@ -79,9 +79,14 @@ class LoginRequest(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: Optional[int] = None
     user: Optional[UserResponse] = None
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     email: Optional[str] = None
     user_id: Optional[str] = None
@@ -99,6 +104,7 @@ class ResumeAnalysis(BaseModel):
 
     candidate_level: str
     predicted_field: str
+    field_confidence: Optional[float] = None  # None when detected by keyword rules
     skills: List[str]
     recommended_skills: List[str]
     recommended_courses: List[str]
@@ -122,6 +128,7 @@ class ResumeAnalysisCreate(BaseModel):
     ats_score: int
     candidate_level: str
     predicted_field: str
+    field_confidence: Optional[float] = None  # None when detected by keyword rules
     skills: List[str]
     recommended_skills: List[str]
     recommended_courses: List[str]
@@ -132,14 +139,39 @@ class ResumeAnalysisCreate(BaseModel):
 class ResumeAnalysisResponse(ResumeAnalysis):
     """Response model for resume analysis with ID"""
     id: str
+    job_queries: List[str] = []  # Job Finder searches, already prefetched
     
     class Config:
         from_attributes = True
 
+class ResumeAnalysisSummary(BaseModel):
+    """Lightweight history list item - full details via GET /resume/{id}"""
+    id: str
+    resume_score: int
+    ats_score: int
+    predicted_field: str
+    candidate_level: Optional[str] = None
+    original_filename: Optional[str] = None
+    analysis_date: Optional[datetime] = None
+
 class ResumeAnalysisHistory(BaseModel):
     """Model for user's resume analysis history"""
-    analyses: List[ResumeAnalysisResponse]
+    analyses: List[ResumeAnalysisSummary]
     total_count: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None  # pass as ?cursor= to fetch the next page
+
+class ReportExportRequest(BaseModel):
+    """Bulk report export - a list of analysis ids, or an analysis_date range"""
+    analysis_ids: Optional[List[str]] = Field(None, min_length=1, max_length=5000)
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None  # exclusive
+    
+    @validator('end_date')
+    def validate_range(cls, v, values, **kwargs):
+        if v and values.get('start_date') and v <= values['start_date']:
+            raise ValueError('end_date must be after start_date')
+        return v
 
 # ============================================
 # Job Matching & Rewrite Models
@@ -178,6 +210,24 @@ class CourseRecommendation(BaseModel):
     field: str
     courses: List[Course]
 
+class CourseRecommendationRequest(BaseModel):
+    """Rank courses by the skills missing for a field (predicted_field) or a job description"""
+    skills: List[str] = []
+    field: Optional[str] = None
+    job_description: Optional[str] = Field(None, max_length=20000)
+    k: int = Field(10, ge=1, le=50)
+
+class RankedCourse(BaseModel):
+    title: str
+    url: Optional[str] = None
+    field: str
+    score: float = Field(..., ge=0, le=1, description="Share of the missing skills the course covers")
+    covers: List[str] = []  # missing skills named in the course title
+
+class CourseRecommendationResponse(BaseModel):
+    missing_skills: List[str]
+    courses: List[RankedCourse]
+
 # ============================================
 # Profile Update Models
 # ============================================
@@ -1,94 +1,178 @@
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.fonts import tt2ps
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.units import inch
 from io import BytesIO
 from reportlab.lib.enums import TA_LEFT
+from xml.sax.saxutils import escape
 
-def generate_pdf_report(data):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    
-    # Create story (content) list
-    story = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=12,
-        alignment=TA_LEFT
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=6,
-        spaceBefore=12,
-        alignment=TA_LEFT
-    )
-    
-    normal_style = styles["Normal"]
-    
-    # Title
-    story.append(Paragraph("AI Resume Analysis Report", title_style))
-    story.append(Paragraph("=" * 50, normal_style))
-    story.append(Spacer(1, 0.2 * inch))
-    
-    # Basic Information
-    story.append(Paragraph("Candidate Information:", heading_style))
-    story.append(Paragraph(f"<b>Name:</b> {data.get('name', 'N/A')}", normal_style))
-    story.append(Paragraph(f"<b>Email:</b> {data.get('email', 'N/A')}", normal_style))
-    story.append(Paragraph(f"<b>Phone:</b> {data.get('mobile_number', 'N/A')}", normal_style))
-    story.append(Spacer(1, 0.1 * inch))
-    
-    # Scores
-    story.append(Paragraph("Scores:", heading_style))
-    story.append(Paragraph(f"<b>Resume Score:</b> {data.get('resume_score', 0)}/100", normal_style))
-    story.append(Paragraph(f"<b>ATS Score:</b> {data.get('ats_score', 0)}/100", normal_style))
-    story.append(Paragraph(f"<b>Candidate Level:</b> {data.get('candidate_level', 'N/A')}", normal_style))
-    story.append(Spacer(1, 0.1 * inch))
-    
-    # Extracted Skills
-    story.append(Paragraph("Extracted Skills:", heading_style))
-    skills = data.get('skills', [])
+# ----------------- TEMPLATES -----------------
+# Styles and page geometry are built once per process (each report worker
+# imports this module once), not on every report.
+_styles = getSampleStyleSheet()
+
+title_style = ParagraphStyle(
+    'CustomTitle',
+    parent=_styles['Heading1'],
+    fontSize=18,
+    spaceAfter=12,
+    alignment=TA_LEFT
+)
+
+heading_style = ParagraphStyle(
+    'CustomHeading',
+    parent=_styles['Heading2'],
+    fontSize=14,
+    spaceAfter=6,
+    spaceBefore=12,
+    alignment=TA_LEFT
+)
+
+normal_style = _styles["Normal"]
+label_font = tt2ps(normal_style.fontName, 1, 0)  # <b> in normal_style
+
+# SimpleDocTemplate's frame: 1 inch margins plus 6pt padding
+PAGE_WIDTH, PAGE_HEIGHT = letter
+FRAME_LEFT = inch + 6
+FRAME_TOP = PAGE_HEIGHT - inch - 6
+FRAME_BOTTOM = inch + 6
+FRAME_WIDTH = PAGE_WIDTH - 2 * FRAME_LEFT
+
+PAGE_BREAK = "page-break"
+
+
+def report_outline(data):
+    """
+    The report as a flat list shared by both renderers: (style, label, text)
+    lines, float spacer heights and PAGE_BREAK.
+    """
+    outline = [
+        (title_style, None, "AI Resume Analysis Report"),
+        (normal_style, None, "=" * 50),
+        0.2 * inch,
+
+        # Basic Information
+        (heading_style, None, "Candidate Information:"),
+        (normal_style, "Name:", data.get('name') or 'N/A'),
+        (normal_style, "Email:", data.get('email') or 'N/A'),
+        (normal_style, "Phone:", data.get('mobile_number') or 'N/A'),
+        0.1 * inch,
+
+        # Scores
+        (heading_style, None, "Scores:"),
+        (normal_style, "Resume Score:", f"{data.get('resume_score') or 0}/100"),
+        (normal_style, "ATS Score:", f"{data.get('ats_score') or 0}/100"),
+        (normal_style, "Candidate Level:", data.get('candidate_level') or 'N/A'),
+        0.1 * inch,
+
+        # Extracted Skills
+        (heading_style, None, "Extracted Skills:"),
+    ]
+    skills = data.get('skills') or []
     if skills:
-        for skill in skills:
-            story.append(Paragraph(f"• {skill}", normal_style))
+        outline += [(normal_style, None, f"• {skill}") for skill in skills]
     else:
-        story.append(Paragraph("No skills detected", normal_style))
-    story.append(Spacer(1, 0.1 * inch))
-    
+        outline.append((normal_style, None, "No skills detected"))
+    outline.append(0.1 * inch)
+
     # Recommended Skills
-    recommended_skills = data.get('recommended_skills', [])
+    recommended_skills = data.get('recommended_skills') or []
     if recommended_skills:
-        story.append(Paragraph("Recommended Skills:", heading_style))
-        for skill in recommended_skills:
-            story.append(Paragraph(f"• {skill}", normal_style))
-        story.append(Spacer(1, 0.1 * inch))
-    
-    # Recommended Courses - Add page break if needed
-    recommended_courses = data.get('recommended_courses', [])
+        outline.append((heading_style, None, "Recommended Skills:"))
+        outline += [(normal_style, None, f"• {skill}") for skill in recommended_skills]
+        outline.append(0.1 * inch)
+
+    # Recommended Courses start on their own page
+    recommended_courses = data.get('recommended_courses') or []
     if recommended_courses:
-        # Add page break before courses if we have a lot of content
-        story.append(PageBreak())
-        story.append(Paragraph("Recommended Courses:", heading_style))
-        for i, course in enumerate(recommended_courses, 1):
-            story.append(Paragraph(f"{i}. {course}", normal_style))
-        story.append(Spacer(1, 0.1 * inch))
-    
+        outline += [PAGE_BREAK, (heading_style, None, "Recommended Courses:")]
+        outline += [(normal_style, None, f"{i}. {course}") for i, course in enumerate(recommended_courses, 1)]
+        outline.append(0.1 * inch)
+
     # Improvement Tips
-    tips = data.get('tips', [])
+    tips = data.get('tips') or []
     if tips:
-        story.append(Paragraph("Improvement Tips:", heading_style))
-        for tip in tips:
-            story.append(Paragraph(f"✓ {tip}", normal_style))
-    
-    # Build PDF
+        outline.append((heading_style, None, "Improvement Tips:"))
+        outline += [(normal_style, None, f"✓ {tip}") for tip in tips]
+
+    return outline
+
+
+def render_canvas(data):
+    """
+    Fast path: draw the outline straight onto a canvas with the same styles
+    and frame as the platypus layout. Returns None when a line would need
+    wrapping or a page would overflow - those reports go through platypus.
+    """
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    y = FRAME_TOP
+    at_top = True
+
+    for entry in report_outline(data):
+        if entry is PAGE_BREAK:
+            pdf.showPage()
+            y, at_top = FRAME_TOP, True
+            continue
+        if isinstance(entry, float):
+            y -= entry
+            continue
+
+        style, label, text = entry
+        runs = [(style.fontName, " ".join(str(text).split()))]
+        if label:
+            runs = [(label_font, label), (style.fontName, " " + runs[0][1])]
+        widths = [stringWidth(run, font, style.fontSize) for font, run in runs]
+        if sum(widths) > FRAME_WIDTH:
+            return None
+
+        if not at_top:
+            y -= style.spaceBefore
+        baseline = y - style.fontSize
+        y -= style.leading
+        if y < FRAME_BOTTOM:
+            return None
+
+        x = FRAME_LEFT
+        for (font, run), width in zip(runs, widths):
+            pdf.setFont(font, style.fontSize)
+            pdf.drawString(x, baseline, run)
+            x += width
+        y -= style.spaceAfter
+        at_top = False
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def render_platypus(data):
+    """Flowing layout for reports that don't fit the fast path"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+
+    story = []
+    for entry in report_outline(data):
+        if entry is PAGE_BREAK:
+            story.append(PageBreak())
+        elif isinstance(entry, float):
+            story.append(Spacer(1, entry))
+        else:
+            style, label, text = entry
+            text = escape(str(text))
+            story.append(Paragraph(f"<b>{label}</b> {text}" if label else text, style))
+
     doc.build(story)
-    buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer.getvalue()
+
+
+def render_pdf_bytes(data):
+    """Entry point for the report worker pool (module-level so it pickles)"""
+    return render_canvas(data) or render_platypus(data)
+
+
+def generate_pdf_report(data):
+    return BytesIO(render_pdf_bytes(data))
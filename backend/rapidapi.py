@@ -0,0 +1,298 @@
+# backend/rapidapi.py
+# Outbound scheduler shared by every JSearch call, so we stay inside the
+# plan's per-second and monthly quotas instead of bursting into 429s:
+#   - a token bucket paces requests to RAPIDAPI_RATE_PER_SECOND
+#   - waiting callers are served by priority (interactive before background)
+#   - a 429 blocks the whole bucket for its Retry-After before retrying
+#   - usage counters are exposed through scheduler.usage()
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+RATE_PER_SECOND = float(os.getenv("RAPIDAPI_RATE_PER_SECOND", "5"))
+BURST = int(os.getenv("RAPIDAPI_BURST", str(max(1, int(RATE_PER_SECOND)))))
+MONTHLY_QUOTA = int(os.getenv("RAPIDAPI_MONTHLY_QUOTA", "0"))  # 0 = unknown, trust response headers
+BACKGROUND_RESERVE = float(os.getenv("RAPIDAPI_BACKGROUND_RESERVE", "0.1"))
+MAX_RETRIES = int(os.getenv("RAPIDAPI_MAX_RETRIES", "2"))
+QUEUE_TIMEOUT = float(os.getenv("RAPIDAPI_QUEUE_TIMEOUT", "10"))
+REQUEST_TIMEOUT = float(os.getenv("RAPIDAPI_REQUEST_TIMEOUT", "15"))
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class RapidAPIError(Exception):
+    """Base class for scheduler errors"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RapidAPIRateLimited(RapidAPIError):
+    """Request could not be sent within the queue timeout or kept hitting 429"""
+
+
+class RapidAPIQuotaExhausted(RapidAPIError):
+    """Monthly quota (or the background share of it) is used up"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class OutboundScheduler:
+    def __init__(
+        self,
+        rate_per_second: float = RATE_PER_SECOND,
+        burst: int = BURST,
+        monthly_quota: int = MONTHLY_QUOTA,
+        background_reserve: float = BACKGROUND_RESERVE,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.monthly_quota = monthly_quota
+        self.background_reserve = background_reserve
+        self.max_retries = max_retries
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+
+        self._month = datetime.utcnow().strftime("%Y-%m")
+        self._counters = {
+            "requests": 0,
+            "requests_this_month": 0,
+            "throttled": 0,
+            "retries": 0,
+            "errors": 0,
+            "rejected": 0,
+            "queue_wait_seconds": 0.0,
+        }
+        # Values reported by RapidAPI itself (x-ratelimit-* headers)
+        self._upstream = {"limit": None, "remaining": None, "reset_seconds": None}
+        self._upstream_at = None  # monotonic time the headers were observed
+
+    # ----------------- QUOTA -----------------
+    def _roll_month(self):
+        month = datetime.utcnow().strftime("%Y-%m")
+        if month != self._month:
+            self._month = month
+            self._counters["requests_this_month"] = 0
+            self._clear_upstream()
+        elif self._upstream_reset_in() == 0:
+            # The upstream window has reset since the headers were seen
+            self._clear_upstream()
+
+    def _clear_upstream(self):
+        self._upstream = {"limit": self._upstream["limit"], "remaining": None, "reset_seconds": None}
+        self._upstream_at = None
+
+    def _upstream_reset_in(self) -> Optional[float]:
+        """Seconds until the upstream quota window resets, if RapidAPI told us"""
+        if self._upstream_at is None or self._upstream["reset_seconds"] is None:
+            return None
+        return max(0.0, self._upstream_at + self._upstream["reset_seconds"] - time.monotonic())
+
+    def _remaining_quota(self) -> Optional[int]:
+        if self._upstream["remaining"] is not None:
+            return self._upstream["remaining"]
+        if self.monthly_quota:
+            return self.monthly_quota - self._counters["requests_this_month"]
+        return None
+
+    def _quota_limit(self) -> Optional[int]:
+        return self._upstream["limit"] or self.monthly_quota or None
+
+    def _check_quota(self, priority: int):
+        self._roll_month()
+        remaining = self._remaining_quota()
+        if remaining is None:
+            return
+        if remaining <= 0:
+            raise RapidAPIQuotaExhausted("RapidAPI monthly quota exhausted", retry_after=self._upstream_reset_in())
+
+        # Background work may not eat into the share kept for users
+        limit = self._quota_limit()
+        if priority > PRIORITY_INTERACTIVE and limit:
+            if remaining <= limit * self.background_reserve:
+                raise RapidAPIQuotaExhausted("Quota reserved for interactive requests")
+
+    def has_headroom(self, priority: int = PRIORITY_BACKGROUND) -> bool:
+        """True if a request at this priority would currently be admitted without queueing"""
+        with self._cond:
+            try:
+                self._check_quota(priority)
+            except RapidAPIQuotaExhausted:
+                return False
+            self._refill(time.monotonic())
+            return (
+                not self._waiters
+                and self._tokens >= 1
+                and time.monotonic() >= self._blocked_until
+            )
+
+    # ----------------- TOKEN BUCKET -----------------
+    def _refill(self, now: float):
+        elapsed = now - self._refilled_at
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._refilled_at = now
+
+    def acquire(self, priority: int = PRIORITY_INTERACTIVE, timeout: Optional[float] = QUEUE_TIMEOUT):
+        """Block until this caller may send one request"""
+        ticket = (priority, next(self._seq))
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+
+        with self._cond:
+            self._check_quota(priority)
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+
+                    if self._waiters[0] == ticket and now >= self._blocked_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        heapq.heappop(self._waiters)
+                        self._counters["queue_wait_seconds"] += now - started
+                        self._cond.notify_all()
+                        return
+
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    elif self._waiters[0] == ticket:
+                        wait = (1 - self._tokens) / self.rate
+                    else:
+                        wait = None  # woken when the head of the queue moves
+
+                    if deadline is not None:
+                        left = deadline - now
+                        if left <= 0:
+                            self._counters["rejected"] += 1
+                            raise RapidAPIRateLimited(
+                                "Too many job searches in flight, please retry shortly",
+                                retry_after=max(self._blocked_until - now, 1 / self.rate),
+                            )
+                        wait = left if wait is None else min(wait, left)
+
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def _block_for(self, seconds: float):
+        with self._cond:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._cond.notify_all()
+
+    # ----------------- REQUESTS -----------------
+    def _record(self, response: requests.Response):
+        headers = response.headers
+        with self._cond:
+            self._roll_month()
+            self._counters["requests"] += 1
+            self._counters["requests_this_month"] += 1
+            for key, header in (
+                ("limit", "x-ratelimit-requests-limit"),
+                ("remaining", "x-ratelimit-requests-remaining"),
+                ("reset_seconds", "x-ratelimit-requests-reset"),
+            ):
+                value = headers.get(header)
+                if value is not None and value.isdigit():
+                    self._upstream[key] = int(value)
+                    self._upstream_at = time.monotonic()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        timeout: Optional[float] = QUEUE_TIMEOUT,
+        **kwargs
+    ) -> requests.Response:
+        """Send a request through the limiter, honouring Retry-After on 429"""
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        retry_after = DEFAULT_RETRY_AFTER
+
+        for attempt in range(self.max_retries + 1):
+            self.acquire(priority, timeout=timeout)
+            try:
+                response = requests.request(method, url, **kwargs)
+            except requests.RequestException:
+                with self._cond:
+                    self._counters["errors"] += 1
+                raise
+
+            self._record(response)
+            if response.status_code != 429:
+                return response
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After")) or DEFAULT_RETRY_AFTER * (2 ** attempt)
+            with self._cond:
+                self._counters["throttled"] += 1
+                if attempt < self.max_retries:
+                    self._counters["retries"] += 1
+            self._block_for(retry_after)
+
+        raise RapidAPIRateLimited("RapidAPI rate limit reached", retry_after=retry_after)
+
+    def get(self, url: str, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> requests.Response:
+        return self.request("GET", url, priority=priority, **kwargs)
+
+    async def aget(self, url: str, priority: int = PRIORITY_INTERACTIVE, **kwargs) -> requests.Response:
+        """Async wrapper - waits in a worker thread so the event loop stays free"""
+        return await asyncio.to_thread(self.get, url, priority, **kwargs)
+
+    def usage(self) -> dict:
+        """Quota usage counters"""
+        with self._cond:
+            self._roll_month()
+            self._refill(time.monotonic())
+            return {
+                **self._counters,
+                "month": self._month,
+                "monthly_quota": self._quota_limit(),
+                "remaining_quota": self._remaining_quota(),
+                "upstream": dict(self._upstream),
+                "upstream_reset_in_seconds": self._upstream_reset_in(),
+                "rate_per_second": self.rate,
+                "tokens_available": round(self._tokens, 2),
+                "queued": len(self._waiters),
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            }
+
+
+# Shared scheduler instance
+scheduler = OutboundScheduler()
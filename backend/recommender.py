@@ -0,0 +1,100 @@
+# backend/recommender.py
+# Skill-gap course ranking. Every course is turned into a skill vector once:
+# the skills its title names, plus a weak prior on its field's skills. The
+# skills a resume is missing (for its field or for a job description) form
+# one vector, and the whole catalog is scored with a single matrix-vector
+# product, so ranking stays cheap for catalogs of thousands of courses.
+from typing import Dict, List, Optional, Sequence
+import re
+
+import numpy as np
+
+FIELD_PRIOR = 0.25  # a course in a field's list teaches that field's skills a little
+
+_SEPARATORS = re.compile(r"[^a-z0-9+#./]+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case words separated by single spaces, padded so ` skill ` matches whole words"""
+    return " " + " ".join(_SEPARATORS.sub(" ", str(text).lower()).split()) + " "
+
+
+class CourseRecommender:
+    def __init__(self, field_courses: Dict[str, Sequence], field_skills: Dict[str, Sequence[str]]):
+        """
+        field_courses: field -> [title, url] entries (repeated titles are kept once)
+        field_skills: field -> skill keywords; their union is the skill vocabulary
+        """
+        self.field_skills = {
+            field: list(dict.fromkeys(normalize(skill).strip() for skill in skills))
+            for field, skills in field_skills.items()
+        }
+        self.skills = list(dict.fromkeys(skill for skills in self.field_skills.values() for skill in skills))
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+
+        self.courses = []
+        seen = set()
+        for field, entries in field_courses.items():
+            for title, url in entries:
+                if title.lower() in seen:
+                    continue
+                seen.add(title.lower())
+                self.courses.append({"title": title, "url": url, "field": field})
+
+        # Dense is fine at this size: courses x skills, float32
+        self.matrix = np.zeros((len(self.courses), len(self.skills)), dtype=np.float32)
+        for row, course in enumerate(self.courses):
+            for skill in self.field_skills.get(course["field"], ()):
+                self.matrix[row, self.skill_index[skill]] = FIELD_PRIOR
+            for skill in self.skills_in(course["title"]):
+                self.matrix[row, self.skill_index[skill]] = 1.0
+        self.named = self.matrix == 1.0  # skills the title itself names
+
+    def skills_in(self, text: str) -> List[str]:
+        """Vocabulary skills mentioned in a text (course title, job description)"""
+        text = normalize(text)
+        return [skill for skill in self.skills if f" {skill} " in text]
+
+    def missing_skills(
+        self,
+        skills: Sequence[str],
+        field: Optional[str] = None,
+        job_description: Optional[str] = None
+    ) -> List[str]:
+        """Skills required by the job description (or else the field) that the resume lacks"""
+        have = {normalize(skill).strip() for skill in skills}
+        required = self.skills_in(job_description) if job_description else self.field_skills.get(field, [])
+        return [skill for skill in required if skill not in have]
+
+    def rank(self, missing: Sequence[str], k: int = 10) -> List[dict]:
+        """
+        Top-k courses by the share of the missing skills they cover, with
+        the skills each one names. Ties keep catalog order.
+        """
+        gap = np.zeros(len(self.skills), dtype=np.float32)
+        indices = [self.skill_index[skill] for skill in missing if skill in self.skill_index]
+        if not indices or not self.courses:
+            return []
+        gap[indices] = 1.0
+
+        scores = self.matrix @ gap / gap.sum()
+        k = min(k, len(self.courses))
+        # Everything above the k-th best score, then the earliest courses
+        # tied with it, so ties at the cut-off also keep catalog order
+        cutoff = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > cutoff)
+        tied = np.flatnonzero(scores == cutoff)[:k - len(above)]
+        top = np.concatenate([above, tied])
+        top = top[np.lexsort((top, -scores[top]))]
+
+        gap_mask = gap > 0
+        ranked = []
+        for row in top:
+            if scores[row] <= 0:
+                break
+            ranked.append({
+                **self.courses[row],
+                "score": round(float(scores[row]), 3),
+                "covers": [self.skills[i] for i in np.flatnonzero(self.named[row] & gap_mask)],
+            })
+        return ranked
@@ -0,0 +1,264 @@
+# backend/reports.py
+# PDF report delivery. A rendered report is cached by analysis id + a hash
+# of the fields the renderer reads, in a memory LRU and in the `reports`
+# collection, and served with that hash as its ETag - repeat downloads are
+# answered from stored bytes (or with a 304) without re-rendering.
+# Cache misses are rendered in a process pool, off the event loop.
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+import asyncio
+import json
+import multiprocessing
+import os
+import uuid
+import zipfile
+
+from cache import TTLCache
+from compression import content_hash
+from database import ReportsCollection
+from http_cache import report_etag
+from pdf_report import render_pdf_bytes
+
+# Everything generate_pdf_report reads - nothing else affects the output
+REPORT_FIELDS = (
+    "name",
+    "email",
+    "mobile_number",
+    "resume_score",
+    "ats_score",
+    "candidate_level",
+    "skills",
+    "recommended_skills",
+    "recommended_courses",
+    "tips",
+)
+
+# Bump when the report layout changes so cached PDFs are re-rendered
+RENDERER_VERSION = 2
+
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "200"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "3600"))  # seconds
+_memory = TTLCache(REPORT_CACHE_SIZE, REPORT_CACHE_TTL)  # key -> (hash, pdf bytes)
+
+
+def report_hash(data: dict) -> str:
+    """Content hash of the report inputs (stable across key order and extra fields)"""
+    payload = {field: data.get(field) for field in REPORT_FIELDS}
+    raw = json.dumps([RENDERER_VERSION, payload], sort_keys=True, default=str)
+    return content_hash(raw.encode())
+
+
+# Only what the renderer needs from a stored analysis - raw_text stays in the database
+REPORT_PROJECTION = {
+    "user_id": 1,
+    "resume_score": 1,
+    "ats_score": 1,
+    "candidate_level": 1,
+    "skills": 1,
+    "recommended_skills": 1,
+    "recommended_courses": 1,
+    "tips": 1,
+    "extracted_data.name": 1,
+    "extracted_data.email": 1,
+    "extracted_data.mobile_number": 1,
+}
+
+
+def report_data(analysis: dict) -> dict:
+    """Renderer input from a stored analysis (extracted_data is flattened)"""
+    extracted = analysis.get("extracted_data") or {}
+    return {
+        **{field: analysis.get(field) for field in REPORT_FIELDS},
+        "name": extracted.get("name"),
+        "email": extracted.get("email"),
+        "mobile_number": extracted.get("mobile_number"),
+    }
+
+
+# ----------------- RENDER POOL -----------------
+# reportlab is pure-Python CPU work, so renders go to processes (spawned,
+# so workers only import pdf_report). REPORT_WORKERS=0 renders in a thread.
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def render_report(data: dict) -> bytes:
+    if REPORT_WORKERS <= 0:
+        return await asyncio.to_thread(render_pdf_bytes, data)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), render_pdf_bytes, data)
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def get_report(
+    data: dict,
+    analysis_id: Optional[str] = None,
+    remember: bool = True,
+    persist: bool = True
+) -> Tuple[bytes, str]:
+    """
+    PDF bytes and ETag - from memory, the reports collection, or a fresh
+    render. remember=False skips the memory LRU (bulk exports would flush it).
+    persist=False never touches the reports collection: only callers that
+    checked the caller owns analysis_id may write under that key.
+    """
+    digest = report_hash(data)
+    key = str(analysis_id) if analysis_id else digest
+
+    cached = _memory.get(key)
+    if cached and cached[0] == digest:
+        return cached[1], report_etag(digest)
+
+    generation = _memory.generation
+    pdf = await ReportsCollection.get_report(key, digest) if persist else None
+    if pdf is None:
+        pdf = await render_report(data)
+        if persist:
+            try:
+                await ReportsCollection.store_report(key, digest, pdf)
+            except Exception as e:
+                # The download itself doesn't depend on the persistent copy
+                print(f"⚠️ Failed to store report {key}: {e}")
+
+    if remember:
+        _memory.set(key, (digest, pdf), generation)
+    return pdf, report_etag(digest)
+
+
+async def forget_report(analysis_id: str):
+    """Drop both cached copies of an analysis' report"""
+    _memory.pop(str(analysis_id))
+    await ReportsCollection.delete_report(str(analysis_id))
+
+
+# ----------------- BULK EXPORT -----------------
+# Many reports as one zip, written entry by entry as renders finish. PDFs are
+# stored uncompressed (they don't shrink) with data descriptors, so the zip
+# is produced front to back and only the renders in flight are in memory.
+# Progress lives in this process, keyed by the X-Export-Id response header.
+EXPORT_MAX_REPORTS = int(os.getenv("EXPORT_MAX_REPORTS", "5000"))
+EXPORT_CONCURRENCY = max(1, REPORT_WORKERS) * 2
+_exports = TTLCache(1000, 6 * 3600)  # export id -> progress dict
+
+
+class _ZipSink:
+    """Write-only file object for zipfile; drained into the response after every entry"""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def start_export(user_id: str, total: int) -> dict:
+    export = {
+        "id": uuid.uuid4().hex,
+        "user_id": user_id,
+        "status": "running",
+        "total": total,
+        "done": 0,
+        "failed": 0,
+        "started_at": datetime.utcnow(),
+        "finished_at": None,
+    }
+    _exports.set(export["id"], export)
+    return export
+
+
+def get_export(export_id: str) -> Optional[dict]:
+    return _exports.get(export_id)
+
+
+async def _render_each(analyses: AsyncIterator[dict]) -> AsyncIterator[Tuple[dict, Optional[bytes]]]:
+    """(analysis, pdf) in completion order with EXPORT_CONCURRENCY renders in flight; pdf is None if it failed"""
+
+    async def render(analysis: dict):
+        try:
+            pdf, _ = await get_report(report_data(analysis), analysis["id"], remember=False)
+            return analysis, pdf
+        except Exception as e:
+            print(f"⚠️ Failed to render report {analysis['id']}: {e}")
+            return analysis, None
+
+    source = analyses.__aiter__()
+    pending = set()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < EXPORT_CONCURRENCY:
+                try:
+                    pending.add(asyncio.create_task(render(await source.__anext__())))
+                except StopAsyncIteration:
+                    exhausted = True
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _zip_time(when: Optional[datetime]) -> tuple:
+    when = when if isinstance(when, datetime) and when.year >= 1980 else datetime.utcnow()
+    return when.timetuple()[:6]
+
+
+async def stream_export(export: dict, analyses: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Zip body for StreamingResponse; updates the export's progress as it goes"""
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED)
+    failed = []
+    renders = _render_each(analyses)
+    try:
+        async for analysis, pdf in renders:
+            if pdf is None:
+                failed.append(analysis["id"])
+                export["failed"] += 1
+                continue
+            entry = zipfile.ZipInfo(f"resume_report_{analysis['id']}.pdf", _zip_time(analysis.get("analysis_date")))
+            archive.writestr(entry, pdf)
+            export["done"] += 1
+            yield sink.drain()
+
+        if failed:
+            archive.writestr("failed.txt", "Reports that could not be rendered:\n" + "\n".join(failed) + "\n")
+        archive.close()
+        yield sink.drain()
+        export["status"] = "completed"
+    except (asyncio.CancelledError, GeneratorExit):
+        export["status"] = "cancelled"  # client went away
+        raise
+    except Exception:
+        export["status"] = "failed"
+        raise
+    finally:
+        await renders.aclose()  # cancels the renders still in flight
+        export["finished_at"] = datetime.utcnow()
+        _exports.set(export["id"], export)  # restart the TTL from completion
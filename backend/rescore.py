@@ -0,0 +1,250 @@
+# backend/rescore.py
+# Offline re-scoring of stored analyses after calculate_ats_score /
+# score_resume change (bump analyzer.SCORING_VERSION first).
+#
+#   python rescore.py                    # re-score everything not on the current version
+#   python rescore.py --all              # re-score every analysis
+#   python rescore.py --workers 8 --batch-size 1000
+#   python rescore.py --backend sqlite   # against the embedded store (default: STORAGE_BACKEND)
+#
+# Documents are streamed through a batched cursor in _id order, scored on a
+# process pool and written back with unordered bulk_write. The last _id of
+# every written batch is checkpointed, so an interrupted run continues
+# where it stopped (use --restart to ignore the checkpoint). The checkpoint
+# records the SCORING_VERSION it was written for - one from another version
+# is ignored - and is removed once a run completes.
+#
+# Both tiers are re-scored: resume_analyses first, then analyses_archive
+# (unpacked to hot field names for scoring, written back under the short
+# names), so the rebuilt user_stats rollups never mix score versions.
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+
+from database import (
+    db,
+    archive_projection,
+    pack_analysis,
+    unpack_analysis,
+    ArchivedAnalysesCollection,
+    ResumeAnalysesCollection,
+    ResumeSourcesCollection,
+    UserStatsCollection,
+    ARCHIVE_FIELDS,
+)
+
+DEFAULT_CHECKPOINT = ".rescore_checkpoint.json"
+
+ANALYSIS_FIELDS = {"_id": 1, "user_id": 1, "skills": 1, "source_id": 1, "extracted_data.raw_text": 1}
+
+
+def _score(item):
+    """Runs in a worker process"""
+    from analyzer import score_text  # imported once per worker
+
+    doc_id, text, skills = item
+    return doc_id, score_text(text, skills)
+
+
+def load_checkpoint(path: str, scoring_version: int):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("scoring_version") != scoring_version:
+        print(f"⚠️ Ignoring checkpoint {path}: written for scoring version {state.get('scoring_version')}")
+        return None
+    return state
+
+
+def save_checkpoint(path: str, state: dict):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def remove_checkpoint(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def iter_batches(cursor, size: int):
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def load_texts(batch, allow_excerpt: bool):
+    """Full text per analysis from resume_sources (one $in query per batch)"""
+    source_ids = list({doc["source_id"] for doc in batch if doc.get("source_id")})
+    texts = {}
+    if source_ids:
+        sources = ResumeSourcesCollection.get_collection()
+        async for source in sources.find({"_id": {"$in": source_ids}}, {"pdf": 0}):
+            texts[source["_id"]] = ResumeSourcesCollection.unpack(source)["text"]
+
+    items, skipped = [], 0
+    for doc in batch:
+        text = texts.get(doc.get("source_id"))
+        if text is None and allow_excerpt:
+            text = doc.get("extracted_data", {}).get("raw_text")
+        if not text:
+            skipped += 1
+            continue
+        items.append((doc["_id"], text, doc.get("skills", [])))
+    return items, skipped
+
+
+def tiers():
+    """(checkpoint name, collection, archived) in re-scoring order"""
+    return [
+        ("resume_analyses", ResumeAnalysesCollection.get_collection(), False),
+        ("analyses_archive", ArchivedAnalysesCollection.get_collection(), True),
+    ]
+
+
+async def rescore_collection(
+    name: str,
+    collection,
+    archived: bool,
+    state: dict,
+    pool: ProcessPoolExecutor,
+    workers: int,
+    batch_size: int,
+    checkpoint_path: str,
+    rescore_all: bool,
+    allow_excerpt: bool,
+    dry_run: bool,
+) -> int:
+    """Re-score one collection, resuming after its checkpointed _id; returns documents processed"""
+    from analyzer import SCORING_VERSION
+
+    loop = asyncio.get_running_loop()
+    query = {}
+    last_id = state["last_id"].get(name)
+    if last_id:
+        query["_id"] = {"$gt": ObjectId(last_id)}
+        print(f"↻ Resuming {name} after {last_id} ({state['processed']} already processed)")
+    if not rescore_all:
+        query[ARCHIVE_FIELDS["scoring_version"] if archived else "scoring_version"] = {"$ne": SCORING_VERSION}
+    projection = archive_projection(ANALYSIS_FIELDS) if archived else ANALYSIS_FIELDS
+
+    cursor = collection.find(query, projection).sort("_id", ASCENDING).batch_size(batch_size)
+
+    started = time.monotonic()
+    run_processed = 0
+    async for batch in iter_batches(cursor, batch_size):
+        batch_started = time.monotonic()
+        if archived:
+            batch = [unpack_analysis(doc) for doc in batch]
+        items, skipped = await load_texts(batch, allow_excerpt)
+
+        now = datetime.utcnow()
+        chunksize = max(1, len(items) // (workers * 4))
+        scored = await loop.run_in_executor(None, lambda: list(pool.map(_score, items, chunksize=chunksize)))
+        pack = pack_analysis if archived else dict
+        operations = [
+            UpdateOne({"_id": doc_id}, {"$set": pack({**scores, "rescored_at": now})})
+            for doc_id, scores in scored
+        ]
+
+        if operations and not dry_run:
+            result = await collection.bulk_write(operations, ordered=False)
+            state["updated"] += result.modified_count
+            # score_sum/best_score changed - drop the rollups, they rebuild on next read
+            user_ids = list({doc["user_id"] for doc in batch if doc.get("user_id")})
+            await UserStatsCollection.get_collection().delete_many({"_id": {"$in": user_ids}})
+
+        state["last_id"][name] = str(batch[-1]["_id"])
+        state["processed"] += len(batch)
+        state["skipped"] += skipped
+        run_processed += len(batch)
+        if not dry_run:
+            save_checkpoint(checkpoint_path, state)
+
+        elapsed = time.monotonic() - started
+        print(
+            f"✅ {state['processed']} processed ({state['updated']} updated, {state['skipped']} skipped) | "
+            f"batch {len(batch) / max(time.monotonic() - batch_started, 1e-9):.0f} docs/s | "
+            f"overall {run_processed / max(elapsed, 1e-9):.0f} docs/s"
+        )
+    return run_processed
+
+
+async def rescore(
+    batch_size: int = 500,
+    workers: int = None,
+    checkpoint_path: str = DEFAULT_CHECKPOINT,
+    restart: bool = False,
+    rescore_all: bool = False,
+    allow_excerpt: bool = False,
+    dry_run: bool = False,
+    backend: str = None,
+):
+    from analyzer import SCORING_VERSION
+
+    state = None if restart else load_checkpoint(checkpoint_path, SCORING_VERSION)
+    state = state or {"scoring_version": SCORING_VERSION, "last_id": {}, "processed": 0, "updated": 0, "skipped": 0}
+
+    await db.connect(backend=backend)
+    try:
+        await db.wait_for_indexes()
+        started = time.monotonic()
+        workers = workers or os.cpu_count()
+
+        run_processed = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, collection, archived in tiers():
+                run_processed += await rescore_collection(
+                    name, collection, archived, state, pool, workers, batch_size,
+                    checkpoint_path, rescore_all, allow_excerpt, dry_run,
+                )
+
+        if not dry_run:
+            remove_checkpoint(checkpoint_path)
+        elapsed = time.monotonic() - started
+        print(f"🏁 Done: {run_processed} documents in {elapsed:.1f}s ({run_processed / max(elapsed, 1e-9):.0f} docs/s)")
+        return state
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored resume analyses with the current formulas")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None, help="Scoring processes (default: CPU count)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--all", dest="rescore_all", action="store_true", help="Include analyses already on the current version")
+    parser.add_argument("--allow-excerpt", action="store_true", help="Fall back to the 1000-char excerpt when no full text is stored")
+    parser.add_argument("--dry-run", action="store_true", help="Score but don't write")
+    parser.add_argument("--backend", default=None, help="Storage backend (default: STORAGE_BACKEND)")
+    args = parser.parse_args()
+
+    asyncio.run(rescore(
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        rescore_all=args.rescore_all,
+        allow_excerpt=args.allow_excerpt,
+        dry_run=args.dry_run,
+        backend=args.backend,
+    ))
+
+
+if __name__ == "__main__":
+    main()
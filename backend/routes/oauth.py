@@ -2,8 +2,8 @@ from fastapi import APIRouter, Request
 from fastapi.responses import RedirectResponse
 from auth.oauth import oauth
 from database import UsersCollection
-from jwt_auth import create_access_token
-from datetime import datetime
+from jwt_auth import create_tokens
+from urllib.parse import urlencode
 import os
 
 router = APIRouter(prefix="/api/auth", tags=["OAuth"])
@@ -11,6 +11,17 @@ router = APIRouter(prefix="/api/auth", tags=["OAuth"])
 FRONTEND_REDIRECT = os.getenv("FRONTEND_REDIRECT_URL")
 
 
+def _login_redirect(user: dict) -> RedirectResponse:
+    """
+    Hand the same token pair as a password login to the frontend, in the
+    URL fragment: unlike the query string it is never sent to a server, so
+    the tokens stay out of access logs, proxies and Referer headers.
+    """
+    tokens = create_tokens(user)
+    fragment = urlencode({"token": tokens["access_token"], "refresh_token": tokens["refresh_token"]})
+    return RedirectResponse(f"{FRONTEND_REDIRECT}#{fragment}")
+
+
 @router.get("/google")
 async def google_login(request: Request):
     redirect_uri = request.url_for("google_callback")
@@ -25,33 +36,10 @@ async def google_callback(request: Request):
     email = user_info["email"]
     name = user_info.get("name", email.split("@")[0])
 
-    user = await UsersCollection.find_by_email(email)
-
-    if not user:
-        user = {
-            "name": name,
-            "email": email,
-            "hashed_password": None,
-            "created_at": datetime.utcnow(),
-            "last_login": datetime.utcnow(),
-            "resume_count": 0,
-            "subscription_tier": "free",
-            "is_active": True,
-        }
-        user = await UsersCollection.create_user(user)
-    else:
-        # optional but good practice
-        await UsersCollection.update_user(
-            user["id"],
-            {"last_login": datetime.utcnow()}
-        )
+    # Find-or-create and last_login in a single upsert
+    user = await UsersCollection.upsert_oauth_user(email, name)
 
-    # ✅ FIXED: use email as sub for consistency with other auth methods
-    access_token = create_access_token({"sub": user["email"]})
-
-    return RedirectResponse(
-        f"{FRONTEND_REDIRECT}?token={access_token}"
-    )
+    return _login_redirect(user)
 
 
 
@@ -74,21 +62,6 @@ async def github_callback(request: Request):
 
     name = profile.get("name") or profile.get("login")
 
-    user = await UsersCollection.find_by_email(email)
-
-    if not user:
-        user = {
-            "name": name,
-            "email": email,
-            "hashed_password": None,
-            "created_at": datetime.utcnow(),
-            "last_login": datetime.utcnow(),
-            "resume_count": 0,
-            "subscription_tier": "free",
-            "is_active": True,
-        }
-        user = await UsersCollection.create_user(user)
-
-    access_token = create_access_token({"sub": user["email"]})
+    user = await UsersCollection.upsert_oauth_user(email, name)
 
-    return RedirectResponse(f"{FRONTEND_REDIRECT}?token={access_token}")
+    return _login_redirect(user)
@@ -1,20 +1,34 @@
 # backend/routes/resume.py
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 import json
 
 # CHANGE THIS IMPORT NAME to avoid conflict
 from analyzer import analyze_resume as analyze_resume_function  # Renamed!
+from analyzer import course_recommender, resolve_field, FIELD_KEYWORDS
 
 from models import (
-    ResumeAnalysis, ResumeAnalysisResponse, ResumeAnalysisHistory,
-    JobMatchRequest, JobMatchResponse, RewriteRequest,
+    ResumeAnalysis, ResumeAnalysisResponse, ResumeAnalysisHistory, ResumeAnalysisSummary,
+    JobMatchRequest, JobMatchResponse, RewriteRequest, ReportExportRequest,
+    CourseRecommendationRequest, CourseRecommendationResponse,
     ErrorResponse
 )
-from database import UsersCollection, ResumeAnalysesCollection, CoursesCollection
-from routes.users import get_current_user
+from database import (
+    ResumeAnalysesCollection, CoursesCollection, UserStatsCollection,
+    ResumeSourcesCollection,
+    ANALYSIS_SUMMARY_PROJECTION, ANALYSIS_DETAIL_PROJECTION
+)
+from routes.users import get_current_user, get_current_claims
 from jwt_auth import get_current_user_data
+from job_search import prefetch_jobs, prefetch_queries
+from http_cache import report_etag, etag_matches
+from reports import (
+    forget_report, get_report, report_data, report_hash,
+    start_export, get_export, stream_export, REPORT_PROJECTION, EXPORT_MAX_REPORTS
+)
 
 router = APIRouter(prefix="/resume", tags=["resume"])
 
@@ -24,6 +38,7 @@ router = APIRouter(prefix="/resume", tags=["resume"])
 
 @router.post("/analyze", response_model=ResumeAnalysisResponse)
 async def analyze_resume_endpoint(  # CHANGE FUNCTION NAME
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="PDF resume file"),
     current_user: dict = Depends(get_current_user)
 ):
@@ -53,27 +68,40 @@ async def analyze_resume_endpoint(  # CHANGE FUNCTION NAME
             "ats_score": analysis_result["ats_score"],
             "candidate_level": analysis_result["candidate_level"],
             "predicted_field": analysis_result["predicted_field"],
+            "field_confidence": analysis_result.get("field_confidence"),
             "skills": analysis_result["skills"],
             "recommended_skills": analysis_result.get("recommended_skills", []),
             "recommended_courses": analysis_result.get("recommended_courses", []),
             "tips": analysis_result.get("tips", []),
+            "scoring_version": analysis_result.get("scoring_version"),
             "original_filename": file.filename,
             "analysis_date": datetime.utcnow(),
+            # Original PDF + full text live in resume_sources (compressed, de-duplicated)
+            "source_id": ResumeSourcesCollection.source_id(contents),
             "extracted_data": {
                 "name": analysis_result.get("name"),
                 "email": analysis_result.get("email"),
                 "mobile_number": analysis_result.get("mobile_number"),
                 "degree": analysis_result.get("degree"),
                 "no_of_pages": analysis_result.get("no_of_pages", 1),
-                "raw_text": analysis_result.get("raw_text", "")[:1000]  # Store first 1000 chars
+                "raw_text": analysis_result.get("raw_text", "")[:1000]  # Excerpt only, full text is in the source
             }
         }
         
-        # Save to database
-        saved_analysis = await ResumeAnalysesCollection.create_analysis(analysis_doc)
+        # Save to database and update user's resume count (concurrently)
+        _, saved_analysis = await asyncio.gather(
+            ResumeSourcesCollection.store_source(
+                contents,
+                analysis_result.get("raw_text", ""),
+                analysis_doc["source_id"]
+            ),
+            ResumeAnalysesCollection.save_user_analysis(analysis_doc)
+        )
         
-        # Update user's resume count
-        await UsersCollection.increment_resume_count(current_user["id"])
+        # Warm the job search cache with the searches the Job Finder tab offers
+        field = analysis_result["predicted_field"]
+        job_queries = prefetch_queries(field, analysis_result["skills"], FIELD_KEYWORDS.get(field, ()))
+        background_tasks.add_task(prefetch_jobs, job_queries, current_user.get("location"))
         
         # Prepare response
         response_data = {
@@ -81,6 +109,7 @@ async def analyze_resume_endpoint(  # CHANGE FUNCTION NAME
             "user_id": current_user["id"],
             "original_filename": file.filename,
             "analysis_date": saved_analysis["analysis_date"],
+            "job_queries": job_queries,
             **analysis_result
         }
         
@@ -96,45 +125,50 @@ async def analyze_resume_endpoint(  # CHANGE FUNCTION NAME
 @router.get("/history", response_model=ResumeAnalysisHistory)
 async def get_resume_history(
     current_user: dict = Depends(get_current_user),
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(10, ge=1, le=50, description="Items per page")
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    page: int = Query(1, ge=1, description="Page number (legacy, prefer cursor)"),
+    limit: int = Query(10, ge=1, le=50, description="Items per page"),
+    include_total: bool = Query(False, description="Run an exact count instead of using the cached counter")
 ):
     """Get user's resume analysis history"""
     skip = (page - 1) * limit
     
-    history = await ResumeAnalysesCollection.get_user_analyses(
-        current_user["id"], 
-        limit=limit, 
-        skip=skip
-    )
+    try:
+        history = await ResumeAnalysesCollection.get_user_analyses(
+            current_user["id"], 
+            limit=limit, 
+            cursor=cursor,
+            skip=skip,
+            include_total=include_total,
+            projection=ANALYSIS_SUMMARY_PROJECTION
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    # Convert to proper response models
-    analyses = []
-    for analysis in history["analyses"]:
-        # Combine extracted data with analysis
-        extracted = analysis.get("extracted_data", {})
-        analysis_response = {
-            **analysis,
-            "name": extracted.get("name"),
-            "email": extracted.get("email"),
-            "mobile_number": extracted.get("mobile_number"),
-            "degree": extracted.get("degree"),
-            "no_of_pages": extracted.get("no_of_pages", 1)
-        }
-        analyses.append(ResumeAnalysisResponse(**analysis_response))
+    # resume_count on the user is maintained incrementally on insert/delete
+    total_count = history["total_count"]
+    if total_count is None:
+        total_count = current_user.get("resume_count", 0)
+    
+    analyses = [ResumeAnalysisSummary(**analysis) for analysis in history["analyses"]]
     
     return ResumeAnalysisHistory(
         analyses=analyses,
-        total_count=history["total_count"]
+        total_count=total_count,
+        has_more=history["has_more"],
+        next_cursor=history["next_cursor"]
     )
 
 @router.get("/{analysis_id}", response_model=ResumeAnalysisResponse)
 async def get_analysis(
     analysis_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_claims)
 ):
     """Get a specific resume analysis"""
-    analysis = await ResumeAnalysesCollection.get_analysis_by_id(analysis_id)
+    analysis = await ResumeAnalysesCollection.get_analysis_by_id(analysis_id, ANALYSIS_DETAIL_PROJECTION)
     
     if not analysis:
         raise HTTPException(
@@ -162,13 +196,14 @@ async def get_analysis(
     
     return ResumeAnalysisResponse(**analysis_response)
 
-@router.delete("/{analysis_id}")
-async def delete_analysis(
+@router.get("/{analysis_id}/report")
+async def get_analysis_report(
     analysis_id: str,
-    current_user: dict = Depends(get_current_user)
+    request: Request,
+    current_user: dict = Depends(get_current_claims)
 ):
-    """Delete a resume analysis"""
-    analysis = await ResumeAnalysesCollection.get_analysis_by_id(analysis_id)
+    """PDF report of a stored analysis, rendered server-side (replaces posting the analysis)"""
+    analysis = await ResumeAnalysesCollection.get_analysis_by_id(analysis_id, REPORT_PROJECTION)
     
     if not analysis:
         raise HTTPException(
@@ -176,28 +211,106 @@ async def delete_analysis(
             detail="Analysis not found"
         )
     
-    # Check if analysis belongs to current user
     if analysis["user_id"] != current_user["id"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this analysis"
+            detail="Not authorized to access this analysis"
         )
     
-    # Delete analysis
-    deleted = await ResumeAnalysesCollection.delete_analysis(analysis_id)
+    data = report_data(analysis)
+    etag = report_etag(report_hash(data))
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     
-    if not deleted:
+    # reportlab renders the whole document in one pass - the PDF is sent as is
+    pdf, etag = await get_report(data, analysis_id)
+    
+    return Response(
+        pdf,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=resume_report_{analysis_id}.pdf",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
+        }
+    )
+
+@router.post("/reports/export")
+async def export_reports(
+    export_request: ReportExportRequest,
+    current_user: dict = Depends(get_current_claims)
+):
+    """
+    Zip of PDF reports for a list of analyses or an analysis_date range.
+    The archive streams as reports finish rendering; poll
+    GET /resume/reports/export/{X-Export-Id} for progress.
+    """
+    selection = export_request.dict()
+    if not (selection["analysis_ids"] or selection["start_date"] or selection["end_date"]):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete analysis"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide analysis_ids or a start_date/end_date range"
+        )
+    
+    total = await ResumeAnalysesCollection.count_selection(current_user["id"], **selection)
+    if total == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No analyses match the export"
+        )
+    if total > EXPORT_MAX_REPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Export is limited to {EXPORT_MAX_REPORTS} reports ({total} selected)"
         )
     
-    # Update user's resume count (decrement)
-    await UsersCollection.update_user(
-        current_user["id"],
-        {"resume_count": max(0, current_user.get("resume_count", 1) - 1)}
+    export = start_export(current_user["id"], total)
+    analyses = ResumeAnalysesCollection.iter_selection(
+        current_user["id"], {**REPORT_PROJECTION, "analysis_date": 1}, **selection
+    )
+    
+    return StreamingResponse(
+        stream_export(export, analyses),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename=resume_reports_{export['id']}.zip",
+            "X-Export-Id": export["id"],
+            "Cache-Control": "no-store"
+        }
     )
+
+@router.get("/reports/export/{export_id}")
+async def get_export_progress(
+    export_id: str,
+    current_user: dict = Depends(get_current_claims)
+):
+    """Progress of a bulk export started by this user"""
+    export = get_export(export_id)
+    
+    if not export or export["user_id"] != current_user["id"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+    
+    return {key: value for key, value in export.items() if key != "user_id"}
+
+@router.delete("/{analysis_id}")
+async def delete_analysis(
+    analysis_id: str,
+    current_user: dict = Depends(get_current_claims)
+):
+    """Delete a resume analysis"""
+    # Ownership is part of the delete filter - no separate lookup, no race
+    deleted = await ResumeAnalysesCollection.delete_user_analysis(analysis_id, current_user["id"])
     
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis not found"
+        )
+    
+    await forget_report(analysis_id)
     return {"message": "Analysis deleted successfully"}
 
 # ============================================
@@ -207,7 +320,7 @@ async def delete_analysis(
 @router.post("/job-match", response_model=JobMatchResponse)
 async def job_match(
     match_request: JobMatchRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_claims)
 ):
     """Match resume with job description"""
     try:
@@ -243,7 +356,7 @@ async def job_match(
 @router.post("/rewrite")
 async def rewrite_resume_section(
     rewrite_request: RewriteRequest,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_claims)
 ):
     """Rewrite a resume section for a specific role"""
     try:
@@ -273,10 +386,40 @@ async def rewrite_resume_section(
 # Course Recommendations Endpoints
 # ============================================
 
+@router.post("/courses/recommend", response_model=CourseRecommendationResponse)
+async def recommend_courses(
+    recommendation_request: CourseRecommendationRequest,
+    current_user: dict = Depends(get_current_claims)
+):
+    """Top-k courses for the skills a resume is missing, for its field or a target job"""
+    if not (recommendation_request.field or recommendation_request.job_description):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a field or a job_description"
+        )
+    
+    field = None
+    if recommendation_request.field:
+        field = resolve_field(recommendation_request.field)
+        if field is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field '{recommendation_request.field}' (expected one of: {', '.join(FIELD_KEYWORDS)})"
+            )
+    
+    missing = course_recommender.missing_skills(
+        recommendation_request.skills,
+        field=field,
+        job_description=recommendation_request.job_description
+    )
+    courses = course_recommender.rank(missing, k=recommendation_request.k)
+    
+    return CourseRecommendationResponse(missing_skills=missing, courses=courses)
+
 @router.get("/courses/{field}")
 async def get_courses_by_field(
     field: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_claims)
 ):
     """Get course recommendations for a specific field"""
     try:
@@ -332,43 +475,11 @@ async def get_courses_by_field(
         )
 
 @router.get("/stats/summary")
-async def get_resume_stats_summary(current_user: dict = Depends(get_current_user)):
+async def get_resume_stats_summary(current_user: dict = Depends(get_current_claims)):
     """Get resume analysis statistics summary"""
     try:
-        history = await ResumeAnalysesCollection.get_user_analyses(current_user["id"], limit=100)
-        
-        if not history["analyses"]:
-            return {
-                "total_analyses": 0,
-                "average_score": 0,
-                "best_score": 0,
-                "most_common_field": "N/A",
-                "skill_frequency": {}
-            }
-        
-        # Calculate statistics
-        scores = [a.get("resume_score", 0) for a in history["analyses"]]
-        fields = [a.get("predicted_field", "Unknown") for a in history["analyses"]]
-        
-        # Count skill frequency
-        skill_frequency = {}
-        for analysis in history["analyses"]:
-            for skill in analysis.get("skills", []):
-                skill_frequency[skill] = skill_frequency.get(skill, 0) + 1
-        
-        # Find most common field
-        from collections import Counter
-        field_counter = Counter(fields)
-        most_common_field = field_counter.most_common(1)[0][0] if field_counter else "N/A"
-        
-        return {
-            "total_analyses": history["total_count"],
-            "average_score": sum(scores) / len(scores) if scores else 0,
-            "best_score": max(scores) if scores else 0,
-            "most_common_field": most_common_field,
-            "skill_frequency": dict(sorted(skill_frequency.items(), key=lambda x: x[1], reverse=True)[:10]),
-            "last_analysis_date": history["analyses"][0].get("analysis_date") if history["analyses"] else None
-        }
+        # Per-user rollup maintained on every insert/delete - one indexed read
+        return await UserStatsCollection.get_summary(current_user["id"])
         
     except Exception as e:
         raise HTTPException(
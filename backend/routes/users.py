@@ -3,15 +3,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from datetime import datetime
+from pymongo.errors import DuplicateKeyError
 import uuid
 
-from models import UserCreate, UserResponse, LoginRequest, Token, ProfileUpdate, PasswordChange, ErrorResponse
+from models import UserCreate, UserResponse, LoginRequest, Token, ProfileUpdate, PasswordChange, ErrorResponse, RefreshRequest
 from database import UsersCollection
 from jwt_auth import (
-    get_password_hash, verify_password, 
+    hash_password, check_password,
     create_tokens, authenticate_user,
     get_current_user_data, validate_token,
-    get_user_id_from_token
+    get_user_id_from_token, get_token_claims,
+    refresh_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -28,18 +30,56 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if not user.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is deactivated"
+        )
     return user
 
+async def get_current_claims(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Caller identity ({id, email, name, tier, active}) from the verified token
+    alone. Use instead of get_current_user when only the caller's id is needed.
+    """
+    token = credentials.credentials
+    claims = get_token_claims(token)
+    if claims is None:
+        # Tokens issued before user_id was a claim - resolve once through storage
+        user = await get_current_user_data(token)
+        if user:
+            claims = {
+                "id": user["id"],
+                "email": user["email"],
+                "name": user.get("name"),
+                "tier": user.get("subscription_tier", "free"),
+                "active": user.get("is_active", True)
+            }
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not claims["active"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is deactivated"
+        )
+    return claims
+
 @router.post("/register", response_model=UserResponse)
 async def register(user_data: UserCreate):
-    existing_user = await UsersCollection.find_by_email(user_data.email)
-    if existing_user:
+    # Cheap indexed lookup first: a taken email shouldn't cost a bcrypt hash
+    # on the shared pool, and duplicates are still rejected if the unique
+    # email index hasn't been built (it is created in the background)
+    if await UsersCollection.find_by_email(user_data.email):
         raise HTTPException(status_code=400, detail="User already exists")
 
     user_dict = user_data.dict()
 
     # Hash password
-    user_dict["hashed_password"] = get_password_hash(user_dict["password"])
+    user_dict["hashed_password"] = await hash_password(user_dict["password"])
     user_dict.pop("password")
     user_dict.pop("confirm_password", None)
 
@@ -52,7 +92,11 @@ async def register(user_data: UserCreate):
         "is_active": True,
     })
 
-    created_user = await UsersCollection.create_user(user_dict)
+    # A concurrent registration of the same email loses on the unique index
+    try:
+        created_user = await UsersCollection.create_user(user_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="User already exists")
 
     return UserResponse(**created_user)
 
@@ -110,17 +154,15 @@ async def update_profile(
             detail="No data provided for update"
         )
     
-    # Update user in database
-    success = await UsersCollection.update_user(current_user["id"], update_data)
+    # Update and read back in one round trip
+    updated_user = await UsersCollection.update_user_returning(current_user["id"], update_data)
     
-    if not success:
+    if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update profile"
         )
     
-    # Get updated user
-    updated_user = await UsersCollection.find_by_id(current_user["id"])
     return updated_user
 
 @router.post("/change-password", responses={
@@ -135,14 +177,15 @@ async def change_password(
     Change user password
     """
     # Verify current password
-    if not verify_password(password_data.current_password, current_user["hashed_password"]):
+    valid, _ = await check_password(password_data.current_password, current_user["hashed_password"])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
         )
     
     # Hash new password
-    new_hashed_password = get_password_hash(password_data.new_password)
+    new_hashed_password = await hash_password(password_data.new_password)
     
     # Update password in database
     success = await UsersCollection.update_user(
@@ -159,20 +202,18 @@ async def change_password(
     return {"detail": "Password updated successfully"}
 
 @router.post("/logout")
-async def logout(current_user = Depends(get_current_user)):
+async def logout(current_user = Depends(get_current_claims)):
     """
     Logout user (client should delete token)
     """
     return {"detail": "Logged out successfully"}
 
 @router.post("/refresh")
-async def refresh_token(refresh_token: str):
+async def refresh_token(refresh_request: RefreshRequest):
     """
     Refresh access token using refresh token
     """
-    from auth import refresh_access_token
-    
-    new_access_token = await refresh_access_token(refresh_token)
+    new_access_token = await refresh_access_token(refresh_request.refresh_token)
     
     if not new_access_token:
         raise HTTPException(
@@ -180,4 +221,8 @@ async def refresh_token(refresh_token: str):
             detail="Invalid refresh token"
         )
     
-    return {"access_token": new_access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {
+        "access_token": new_access_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
\ No newline at end of file
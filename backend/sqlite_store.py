@@ -0,0 +1,1140 @@
+# backend/sqlite_store.py
+# Embedded single-node storage engine (SQLite) exposing the subset of the
+# Motor client/collection API that database.py uses - see storage.py.
+#
+# Documents are stored as BSON blobs, so ObjectId, datetime and Binary
+# round-trip exactly as they do with MongoDB. Every create_index() call adds
+# real SQLite indexes over extracted key columns: equality/range conditions
+# and sorts on indexed fields are pushed down to SQL, and unique indexes
+# raise pymongo's DuplicateKeyError. The full Mongo filter is always
+# re-checked in Python, so pushdown only narrows candidates.
+#
+# All SQLite work runs on one dedicated thread, which keeps the event loop
+# free and makes each read-modify-write operation atomic.
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional
+import asyncio
+import copy
+import json
+import re
+import sqlite3
+
+import bson
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+_MISSING = object()
+
+
+# ============================================
+# Document helpers
+# ============================================
+
+def _walk(value, parts):
+    for i, part in enumerate(parts):
+        if isinstance(value, dict):
+            if part not in value:
+                return _MISSING
+            value = value[part]
+        elif isinstance(value, list):
+            if part.isdigit():
+                index = int(part)
+                if index >= len(value):
+                    return _MISSING
+                value = value[index]
+            else:
+                found = [v for v in (_walk(item, parts[i:]) for item in value) if v is not _MISSING]
+                return found if found else _MISSING
+        else:
+            return _MISSING
+    return value
+
+
+def get_path(doc: dict, path: str):
+    return _walk(doc, path.split("."))
+
+
+def set_path(doc: dict, path: str, value):
+    parts = path.split(".")
+    current = doc
+    for part in parts[:-1]:
+        child = current.get(part)
+        if not isinstance(child, dict):
+            child = {}
+            current[part] = child
+        current = child
+    current[parts[-1]] = value
+
+
+def unset_path(doc: dict, path: str):
+    parts = path.split(".")
+    current = doc
+    for part in parts[:-1]:
+        current = current.get(part)
+        if not isinstance(current, dict):
+            return
+    current.pop(parts[-1], None)
+
+
+def _type_rank(value) -> int:
+    """BSON comparison order: null < numbers < strings < objects < arrays < binary < ObjectId < bool < date"""
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, bytes):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def sort_key(value):
+    rank = _type_rank(value)
+    if rank == 1:
+        return (rank, 0)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def sort_docs(docs: List[dict], sort: List[tuple]) -> List[dict]:
+    for field, direction in reversed(sort):
+        docs.sort(key=lambda d: sort_key(get_path(d, field)), reverse=direction < 0)
+    return docs
+
+
+# ============================================
+# Query matching
+# ============================================
+
+def _is_operator_doc(value) -> bool:
+    return isinstance(value, dict) and bool(value) and all(k.startswith("$") for k in value)
+
+
+def _candidates(value):
+    if isinstance(value, list):
+        return [value] + value
+    return [value]
+
+
+def _same(a, b) -> bool:
+    return _type_rank(a) == _type_rank(b) and a == b
+
+
+def _equals(value, target) -> bool:
+    if value is _MISSING:
+        return target is None
+    return any(_same(v, target) for v in _candidates(value))
+
+
+_COMPARE = {
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+}
+
+
+def _apply_operator(value, op: str, arg) -> bool:
+    if op == "$eq":
+        return _equals(value, arg)
+    if op == "$ne":
+        return not _equals(value, arg)
+    if op in _COMPARE:
+        if value is _MISSING:
+            return False
+        return any(
+            _type_rank(v) == _type_rank(arg) and v is not None and _COMPARE[op](v, arg)
+            for v in _candidates(value)
+        )
+    if op == "$in":
+        return any(_equals(value, a) for a in arg)
+    if op == "$nin":
+        return not any(_equals(value, a) for a in arg)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(arg)
+    if op == "$regex":
+        pattern = re.compile(arg) if isinstance(arg, str) else arg
+        return any(isinstance(v, str) and pattern.search(v) for v in _candidates(value))
+    if op == "$not":
+        return not _match_value(value, arg)
+    if op == "$size":
+        return isinstance(value, list) and len(value) == arg
+    raise NotImplementedError(f"Unsupported query operator: {op}")
+
+
+def _match_value(value, condition) -> bool:
+    if _is_operator_doc(condition):
+        return all(_apply_operator(value, op, arg) for op, arg in condition.items())
+    return _equals(value, condition)
+
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"Unsupported query operator: {key}")
+        elif not _match_value(get_path(doc, key), condition):
+            return False
+    return True
+
+
+# ============================================
+# Projection & updates
+# ============================================
+
+def project(doc: Optional[dict], projection: Optional[dict]):
+    if doc is None or not projection:
+        return doc
+    include_id = bool(projection.get("_id", 1))
+    included = [k for k, v in projection.items() if v and k != "_id"]
+
+    if included:
+        result = {"_id": doc["_id"]} if include_id and "_id" in doc else {}
+        for path in included:
+            value = get_path(doc, path)
+            if value is not _MISSING:
+                set_path(result, path, value)
+        return result
+
+    result = copy.deepcopy(doc)
+    for path, flag in projection.items():
+        if not flag:
+            unset_path(result, path)
+    return result
+
+
+def apply_update(doc: dict, update: dict, inserting: bool = False) -> dict:
+    if not any(k.startswith("$") for k in update):
+        replacement = copy.deepcopy(update)
+        if "_id" in doc:
+            replacement["_id"] = doc["_id"]
+        return replacement
+
+    for op, fields in update.items():
+        for path, value in fields.items():
+            current = get_path(doc, path)
+            if op == "$set":
+                set_path(doc, path, copy.deepcopy(value))
+            elif op == "$setOnInsert":
+                if inserting:
+                    set_path(doc, path, copy.deepcopy(value))
+            elif op == "$unset":
+                unset_path(doc, path)
+            elif op == "$inc":
+                set_path(doc, path, (0 if current is _MISSING else current) + value)
+            elif op == "$max":
+                if current is _MISSING or sort_key(value) > sort_key(current):
+                    set_path(doc, path, value)
+            elif op == "$min":
+                if current is _MISSING or sort_key(value) < sort_key(current):
+                    set_path(doc, path, value)
+            elif op in ("$push", "$addToSet"):
+                items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+                target = [] if current is _MISSING else list(current)
+                for item in items:
+                    if op == "$push" or item not in target:
+                        target.append(item)
+                set_path(doc, path, target)
+            else:
+                raise NotImplementedError(f"Unsupported update operator: {op}")
+    return doc
+
+
+def _seed_from_filter(query: dict) -> dict:
+    """Equality parts of an upsert filter become fields of the new document"""
+    doc = {}
+    for key, condition in query.items():
+        if key.startswith("$"):
+            continue
+        if _is_operator_doc(condition):
+            if "$eq" in condition:
+                set_path(doc, key, copy.deepcopy(condition["$eq"]))
+        else:
+            set_path(doc, key, copy.deepcopy(condition))
+    return doc
+
+
+# ============================================
+# Aggregation
+# ============================================
+
+def _evaluate(doc: dict, expression):
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = get_path(doc, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, dict):
+        if len(expression) == 1:
+            (op, arg), = expression.items()
+            if op == "$ifNull":
+                value = _evaluate(doc, arg[0])
+                return _evaluate(doc, arg[1]) if value is None else value
+            if op == "$size":
+                value = _evaluate(doc, arg)
+                return len(value) if isinstance(value, list) else 0
+            if op == "$setUnion":
+                values = [_evaluate(doc, item) for item in arg]
+                if any(value is None for value in values):
+                    return None
+                union = []
+                for value in values:
+                    for item in value:
+                        if item not in union:
+                            union.append(item)
+                return union
+        return {k: _evaluate(doc, v) for k, v in expression.items()}
+    return expression
+
+
+def _group(docs: List[dict], spec: dict) -> List[dict]:
+    groups: Dict[Any, dict] = {}
+    for doc in docs:
+        key = _evaluate(doc, spec["_id"])
+        hashable = repr(sort_key(key))
+        group = groups.setdefault(hashable, {"_id": key, "__values__": {f: [] for f in spec if f != "_id"}})
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (op, expression), = accumulator.items()
+            group["__values__"][field].append((op, _evaluate(doc, expression)))
+
+    results = []
+    for group in groups.values():
+        result = {"_id": group["_id"]}
+        for field, values in group["__values__"].items():
+            op = values[0][0] if values else next(iter(spec[field]))
+            items = [v for _, v in values]
+            numbers = [v for v in items if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            present = [v for v in items if v is not None]
+            if op == "$sum":
+                result[field] = sum(numbers)
+            elif op == "$avg":
+                result[field] = sum(numbers) / len(numbers) if numbers else None
+            elif op == "$max":
+                result[field] = max(present, key=sort_key) if present else None
+            elif op == "$min":
+                result[field] = min(present, key=sort_key) if present else None
+            elif op == "$first":
+                result[field] = items[0] if items else None
+            elif op == "$last":
+                result[field] = items[-1] if items else None
+            elif op == "$push":
+                result[field] = items
+            elif op == "$addToSet":
+                result[field] = [v for i, v in enumerate(items) if v not in items[:i]]
+            else:
+                raise NotImplementedError(f"Unsupported accumulator: {op}")
+        results.append(result)
+    return results
+
+
+def _project_stage(doc: dict, spec: dict) -> dict:
+    if all(v in (0, False) for v in spec.values()):
+        return project(doc, spec)
+    result = {"_id": doc.get("_id")} if spec.get("_id", 1) else {}
+    for field, value in spec.items():
+        if field == "_id" and value in (0, 1, True, False):
+            continue
+        if value in (1, True):
+            found = get_path(doc, field)
+            if found is not _MISSING:
+                set_path(result, field, found)
+        elif value not in (0, False):
+            set_path(result, field, _evaluate(doc, value))
+    return result
+
+
+def _unwind(docs: List[dict], spec) -> List[dict]:
+    path = (spec if isinstance(spec, str) else spec["path"])[1:]
+    keep_empty = isinstance(spec, dict) and spec.get("preserveNullAndEmptyArrays", False)
+    result = []
+    for doc in docs:
+        value = get_path(doc, path)
+        if isinstance(value, list) and value:
+            for item in value:
+                unwound = copy.copy(doc)
+                set_path(unwound, path, item)
+                result.append(unwound)
+        elif isinstance(value, list) or value is _MISSING or value is None:
+            if keep_empty:
+                result.append(doc)
+        else:
+            result.append(doc)
+    return result
+
+
+def run_pipeline(docs: List[dict], pipeline: List[dict]) -> List[dict]:
+    for stage in pipeline:
+        (op, spec), = stage.items()
+        if op == "$match":
+            spec = _bson_dates(spec)
+            docs = [d for d in docs if matches(d, spec)]
+        elif op == "$project":
+            docs = [_project_stage(d, spec) for d in docs]
+        elif op == "$unwind":
+            docs = _unwind(docs, spec)
+        elif op == "$group":
+            docs = _group(docs, spec)
+        elif op == "$sort":
+            docs = sort_docs(list(docs), list(spec.items()))
+        elif op == "$skip":
+            docs = docs[spec:]
+        elif op == "$limit":
+            docs = docs[:spec]
+        elif op == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif op == "$facet":
+            docs = [{name: run_pipeline(list(docs), sub) for name, sub in spec.items()}]
+        else:
+            raise NotImplementedError(f"Unsupported aggregation stage: {op}")
+    return docs
+
+
+# ============================================
+# Results (same attributes as pymongo.results)
+# ============================================
+
+class InsertOneResult:
+    acknowledged = True
+
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class InsertManyResult:
+    acknowledged = True
+
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class UpdateResult:
+    acknowledged = True
+
+    def __init__(self, matched_count: int, modified_count: int, upserted_id=None):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_id = upserted_id
+
+
+class DeleteResult:
+    acknowledged = True
+
+    def __init__(self, deleted_count: int):
+        self.deleted_count = deleted_count
+
+
+class BulkWriteResult:
+    acknowledged = True
+
+    def __init__(self, matched_count: int, modified_count: int, upserted_ids: Dict[int, Any]):
+        self.matched_count = matched_count
+        self.modified_count = modified_count
+        self.upserted_ids = upserted_ids
+        self.upserted_count = len(upserted_ids)
+
+
+# ============================================
+# SQLite engine
+# ============================================
+
+def _bson_datetime(value: datetime) -> datetime:
+    """A datetime as it reads back from BSON: naive UTC, milliseconds"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+def _bson_dates(value):
+    """A query with its datetimes as the server would see them, so it compares like MongoDB"""
+    if isinstance(value, datetime):
+        return _bson_datetime(value)
+    if isinstance(value, dict):
+        return {key: _bson_dates(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_bson_dates(item) for item in value]
+    return value
+
+
+def _id_key(value) -> str:
+    """Primary key text; the type prefix keeps ObjectId('..') and '..' distinct"""
+    if isinstance(value, ObjectId):
+        return "o:" + str(value)
+    if isinstance(value, str):
+        return "s:" + value
+    if isinstance(value, bool):
+        return "b:" + str(int(value))
+    if isinstance(value, (int, float)):
+        return "n:" + repr(value)
+    if isinstance(value, datetime):
+        return "d:" + _bson_datetime(value).strftime("%Y-%m-%dT%H:%M:%S.%f")
+    return "x:" + json.dumps(value, sort_keys=True, default=str)
+
+
+class _Multikey(Exception):
+    pass
+
+
+def _index_value(value):
+    """
+    SQLite-comparable key for an indexed field. Numbers stay numeric (SQLite
+    sorts them before text, like BSON); other types are text prefixed with
+    their BSON type rank, so ObjectId('..') never equals its hex string and
+    mixed-type columns sort in BSON order.
+    """
+    if value is _MISSING or value is None:
+        return None
+    if isinstance(value, bool):
+        return f"{_type_rank(value)}:{int(value)}"
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return f"{_type_rank(value)}:{value}"
+    if isinstance(value, bytes):
+        return f"{_type_rank(value)}:{value.hex()}"
+    if isinstance(value, ObjectId):
+        return f"{_type_rank(value)}:{value}"
+    if isinstance(value, datetime):
+        # Keyed from the document being written, compared with values read back
+        return f"{_type_rank(value)}:{_bson_datetime(value).strftime('%Y-%m-%dT%H:%M:%S.%f')}"
+    raise _Multikey()
+
+
+def _column(field: str) -> str:
+    return "_id" if field == "_id" else "ix_" + re.sub(r"\W", "_", field)
+
+
+def _normalize_keys(keys) -> List[tuple]:
+    if isinstance(keys, str):
+        return [(keys, 1)]
+    return [(field, direction) for field, direction in keys]
+
+
+class Engine:
+    """Synchronous core - only ever called on the engine's own thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS _indexes ("
+            "collection TEXT, name TEXT, keys TEXT, is_unique INTEGER, "
+            "PRIMARY KEY (collection, name))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS _multikey (collection TEXT, field TEXT, PRIMARY KEY (collection, field))"
+        )
+        self.conn.commit()
+        self._tables = set()
+        self._indexes: Dict[str, Dict[str, dict]] = {}
+        self._multikey: Dict[str, set] = {}
+        for collection, name, keys, unique in self.conn.execute("SELECT * FROM _indexes"):
+            self._indexes.setdefault(collection, {})[name] = {"key": [tuple(k) for k in json.loads(keys)], "unique": bool(unique)}
+        for collection, field in self.conn.execute("SELECT * FROM _multikey"):
+            self._multikey.setdefault(collection, set()).add(field)
+
+    # ----------------- SCHEMA -----------------
+    @staticmethod
+    def table(collection: str) -> str:
+        return '"c_' + collection.replace('"', "") + '"'
+
+    def _ensure_table(self, collection: str):
+        if collection in self._tables:
+            return
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table(collection)} (_id TEXT PRIMARY KEY, doc BLOB NOT NULL)")
+        self._tables.add(collection)
+
+    def _indexed_fields(self, collection: str) -> List[str]:
+        fields = []
+        for index in self._indexes.get(collection, {}).values():
+            for field, _ in index["key"]:
+                if field != "_id" and field not in fields:
+                    fields.append(field)
+        return fields
+
+    def _usable_column(self, collection: str, field: str) -> Optional[str]:
+        if field == "_id":
+            return "_id"
+        if field in self._indexed_fields(collection) and field not in self._multikey.get(collection, set()):
+            return _column(field)
+        return None
+
+    def _mark_multikey(self, collection: str, field: str):
+        self._multikey.setdefault(collection, set()).add(field)
+        self.conn.execute("INSERT OR IGNORE INTO _multikey VALUES (?, ?)", (collection, field))
+
+    def _unique_null_conflict(self, collection: str, values: Dict[str, Any], key: Optional[str] = None) -> Optional[str]:
+        """
+        Name of a unique index this row would violate through a missing/null
+        key. SQLite lets any number of NULLs into a UNIQUE index, MongoDB
+        indexes a missing field as null and allows it once.
+        """
+        multikey = self._multikey.get(collection, set())
+        for name, index in self._indexes.get(collection, {}).items():
+            fields = [field for field, _ in index["key"]]
+            if not index["unique"] or any(f in multikey for f in fields):
+                continue
+            columns = [_column(f) for f in fields]
+            if all(values[c] is not None for c in columns):
+                continue  # the SQLite index enforces this one
+            sql = f"SELECT 1 FROM {self.table(collection)} WHERE " + " AND ".join(f"{c} IS ?" for c in columns)
+            params = [values[c] for c in columns]
+            if key is not None:
+                sql += " AND _id != ?"
+                params.append(key)
+            if self.conn.execute(sql + " LIMIT 1", params).fetchone():
+                return name
+        return None
+
+    def _row_values(self, collection: str, doc: dict) -> Dict[str, Any]:
+        values = {"_id": _id_key(doc["_id"]), "doc": bson.encode(doc)}
+        for field in self._indexed_fields(collection):
+            try:
+                values[_column(field)] = _index_value(get_path(doc, field))
+            except _Multikey:
+                self._mark_multikey(collection, field)
+                values[_column(field)] = None
+        return values
+
+    def create_index(self, collection: str, keys, unique: bool = False, name: Optional[str] = None, **kwargs) -> str:
+        self._ensure_table(collection)
+        keys = _normalize_keys(keys)
+        name = name or "_".join(f"{field}_{direction}" for field, direction in keys)
+        if name in self._indexes.get(collection, {}):
+            return name
+
+        table = self.table(collection)
+        existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        new_fields = [f for f, _ in keys if f != "_id" and _column(f) not in existing]
+        for field in new_fields:
+            self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {_column(field)}")
+
+        self._indexes.setdefault(collection, {})[name] = {"key": keys, "unique": unique}
+        try:
+            if new_fields:
+                # Backfill key columns for documents written before this index existed
+                rows = self.conn.execute(f"SELECT _id, doc FROM {table}").fetchall()
+                for key, blob in rows:
+                    values = self._row_values(collection, bson.decode(blob))
+                    assignments = ", ".join(f"{_column(f)} = ?" for f in new_fields)
+                    self.conn.execute(
+                        f"UPDATE {table} SET {assignments} WHERE _id = ?",
+                        [values[_column(f)] for f in new_fields] + [key]
+                    )
+            columns = ", ".join(f"{_column(f)} {'DESC' if d == -1 else 'ASC'}" for f, d in keys)
+            self.conn.execute(
+                f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS '
+                f'"{table[1:-1]}__{name}" ON {table} ({columns})'
+            )
+            multikey = self._multikey.get(collection, set())
+            if unique and not any(f in multikey for f, _ in keys):
+                # GROUP BY treats NULLs as equal, which is what MongoDB does
+                key_columns = ", ".join(_column(f) for f, _ in keys)
+                duplicate = self.conn.execute(
+                    f"SELECT 1 FROM {table} GROUP BY {key_columns} HAVING COUNT(*) > 1 LIMIT 1"
+                ).fetchone()
+                if duplicate:
+                    self.conn.execute(f'DROP INDEX IF EXISTS "{table[1:-1]}__{name}"')
+                    raise sqlite3.IntegrityError(f"duplicate missing/null key in {key_columns}")
+        except sqlite3.IntegrityError as e:
+            self.conn.rollback()
+            del self._indexes[collection][name]
+            raise DuplicateKeyError(f"E11000 duplicate key error building index {name}: {e}", 11000)
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO _indexes VALUES (?, ?, ?, ?)",
+            (collection, name, json.dumps(keys), int(unique))
+        )
+        self.conn.commit()
+        return name
+
+    def index_information(self, collection: str) -> Dict[str, dict]:
+        info = {"_id_": {"key": [("_id", 1)], "v": 2}}
+        for name, index in self._indexes.get(collection, {}).items():
+            info[name] = {"key": list(index["key"]), "v": 2}
+            if index["unique"]:
+                info[name]["unique"] = True
+        return info
+
+    def drop_index(self, collection: str, name: str):
+        self._indexes.get(collection, {}).pop(name, None)
+        self.conn.execute(f'DROP INDEX IF EXISTS "{self.table(collection)[1:-1]}__{name}"')
+        self.conn.execute("DELETE FROM _indexes WHERE collection = ? AND name = ?", (collection, name))
+        self.conn.commit()
+
+    def drop(self, collection: str):
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.table(collection)}")
+        self.conn.execute("DELETE FROM _indexes WHERE collection = ?", (collection,))
+        self.conn.execute("DELETE FROM _multikey WHERE collection = ?", (collection,))
+        self.conn.commit()
+        self._tables.discard(collection)
+        self._indexes.pop(collection, None)
+        self._multikey.pop(collection, None)
+
+    def collection_names(self) -> List[str]:
+        rows = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'c\\_%' ESCAPE '\\'")
+        return [row[0][2:] for row in rows]
+
+    # ----------------- QUERY PLANNING -----------------
+    def _pushdown(self, collection: str, query: dict):
+        """SQL conditions for the indexed parts of a filter (superset of the matches)"""
+        clauses, params = [], []
+        for field, condition in (query or {}).items():
+            if field.startswith("$"):
+                continue
+            column = self._usable_column(collection, field)
+            if column is None:
+                continue
+            encode = _id_key if column == "_id" else _index_value
+
+            def encoded(value):
+                if value is None or isinstance(value, (list, dict)):
+                    return _MISSING
+                try:
+                    return encode(value)
+                except _Multikey:
+                    return _MISSING
+
+            if not _is_operator_doc(condition):
+                value = encoded(condition)
+                if value is not _MISSING:
+                    clauses.append(f"{column} = ?")
+                    params.append(value)
+                continue
+
+            for op, arg in condition.items():
+                if op == "$eq" or op in _COMPARE:
+                    value = encoded(arg)
+                    if value is not _MISSING:
+                        sql_op = {"$eq": "=", "$lt": "<", "$lte": "<=", "$gt": ">", "$gte": ">="}[op]
+                        clauses.append(f"{column} {sql_op} ?")
+                        params.append(value)
+                elif op == "$in" and isinstance(arg, (list, tuple)) and arg:
+                    values = [encoded(a) for a in arg]
+                    if all(v is not _MISSING for v in values):
+                        clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                        params.extend(values)
+        return clauses, params
+
+    def _plan(self, collection: str, query: Optional[dict], sort: List[tuple]):
+        """SQL for the pushed-down part of a query; sorted_in_sql is False when Python must sort"""
+        self._ensure_table(collection)
+        clauses, params = self._pushdown(collection, query)
+        sql = f"SELECT _id, doc FROM {self.table(collection)}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+
+        order_columns = [self._usable_column(collection, field) for field, _ in sort]
+        sorted_in_sql = all(order_columns)
+        if sort and sorted_in_sql:
+            sql += " ORDER BY " + ", ".join(
+                f"{column} {'DESC' if direction < 0 else 'ASC'}"
+                for column, (_, direction) in zip(order_columns, sort)
+            )
+        return sql, params, sorted_in_sql
+
+    def select(
+        self,
+        collection: str,
+        query: Optional[dict] = None,
+        sort: Optional[List[tuple]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        with_keys: bool = False
+    ) -> Iterator:
+        sort = sort or []
+        query = _bson_dates(query)
+        sql, params, sorted_in_sql = self._plan(collection, query, sort)
+
+        rows = ((key, bson.decode(blob)) for key, blob in self.conn.execute(sql, params))
+        rows = ((key, doc) for key, doc in rows if matches(doc, query))
+
+        if sort and not sorted_in_sql:
+            materialized = list(rows)
+            for field, direction in reversed(sort):
+                materialized.sort(key=lambda r: sort_key(get_path(r[1], field)), reverse=direction < 0)
+            rows = iter(materialized)
+
+        produced = 0
+        for index, (key, doc) in enumerate(rows):
+            if index < skip:
+                continue
+            yield (key, doc) if with_keys else doc
+            produced += 1
+            if limit and produced >= limit:
+                return
+
+    def explain(self, collection: str, query: Optional[dict] = None, sort: Optional[List[tuple]] = None) -> dict:
+        """
+        Query plan in the shape of MongoDB's explain() output, built from
+        SQLite's EXPLAIN QUERY PLAN: a full table scan is reported as
+        COLLSCAN, index use as IXSCAN and any sort that can't be served by
+        an index as SORT.
+        """
+        sort = sort or []
+        sql, params, sorted_in_sql = self._plan(collection, query, sort)
+        stages = []
+        for row in self.conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[-1]
+            if detail.startswith("USE TEMP B-TREE"):
+                stages.append({"stage": "SORT", "detail": detail})
+            elif " INDEX " in f" {detail} " or "PRIMARY KEY" in detail:
+                match = re.search(r"INDEX (\S+)", detail)
+                stages.append({"stage": "IXSCAN", "indexName": match.group(1) if match else "_id_", "detail": detail})
+            else:
+                stages.append({"stage": "COLLSCAN", "detail": detail})
+        if sort and not sorted_in_sql:
+            stages.append({"stage": "SORT", "detail": "in-memory sort"})
+        return {
+            "queryPlanner": {
+                "namespace": collection,
+                "parsedQuery": query or {},
+                "winningPlan": {"stage": "FETCH", "inputStages": stages},
+            },
+            "sql": sql,
+        }
+
+    def find(self, collection, query=None, projection=None, sort=None, skip=0, limit=0) -> List[dict]:
+        return [project(doc, projection) for doc in self.select(collection, query, sort, skip, limit)]
+
+    def find_one(self, collection, query=None, projection=None, sort=None):
+        for doc in self.select(collection, query, sort, limit=1):
+            return project(doc, projection)
+        return None
+
+    def count(self, collection, query=None) -> int:
+        if not query:
+            self._ensure_table(collection)
+            return self.conn.execute(f"SELECT COUNT(*) FROM {self.table(collection)}").fetchone()[0]
+        return sum(1 for _ in self.select(collection, query))
+
+    def aggregate(self, collection, pipeline: List[dict]) -> List[dict]:
+        pipeline = list(pipeline)
+        query = pipeline.pop(0)["$match"] if pipeline and "$match" in pipeline[0] else None
+        return run_pipeline(list(self.select(collection, query)), pipeline)
+
+    # ----------------- WRITES -----------------
+    def _write(self, collection: str, doc: dict, key: Optional[str] = None):
+        values = self._row_values(collection, doc)
+        table = self.table(collection)
+        conflict = self._unique_null_conflict(collection, values, key)
+        if conflict:
+            self.conn.rollback()
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {collection} index: {conflict} (null key)", 11000)
+        try:
+            if key is None:
+                columns = ", ".join(values)
+                self.conn.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' for _ in values)})",
+                    list(values.values())
+                )
+            else:
+                assignments = ", ".join(f"{column} = ?" for column in values)
+                self.conn.execute(f"UPDATE {table} SET {assignments} WHERE _id = ?", list(values.values()) + [key])
+        except sqlite3.IntegrityError as e:
+            self.conn.rollback()
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {collection}: {e}", 11000)
+
+    def insert_many(self, collection: str, docs: List[dict]) -> List[Any]:
+        self._ensure_table(collection)
+        ids = []
+        for doc in docs:
+            if "_id" not in doc:
+                doc["_id"] = ObjectId()
+            self._write(collection, doc)
+            ids.append(doc["_id"])
+        self.conn.commit()
+        return ids
+
+    def update(self, collection, query, update, upsert=False, multi=False, sort=None, commit=True):
+        """Returns (matched, modified, upserted_id, before, after) for the first document"""
+        self._ensure_table(collection)
+        matched = modified = 0
+        first_before = first_after = None
+
+        for key, doc in list(self.select(collection, query, sort, limit=0 if multi else 1, with_keys=True)):
+            before = copy.deepcopy(doc)
+            after = apply_update(doc, update)
+            matched += 1
+            if after != before:
+                self._write(collection, after, key)
+                modified += 1
+            if first_before is None:
+                first_before, first_after = before, after
+
+        upserted_id = None
+        if matched == 0 and upsert:
+            doc = apply_update(_seed_from_filter(query or {}), update, inserting=True)
+            seed_id = _seed_from_filter(query or {}).get("_id")
+            if "_id" not in doc:
+                doc["_id"] = seed_id if seed_id is not None else ObjectId()
+            self._write(collection, doc)
+            upserted_id = doc["_id"]
+            first_after = doc
+
+        if commit:
+            self.conn.commit()
+        return matched, modified, upserted_id, first_before, first_after
+
+    def bulk_update(self, collection, operations: List[tuple]):
+        """(filter, update, upsert) single-document updates in one transaction"""
+        matched = modified = 0
+        upserted_ids = {}
+        for index, (query, update, upsert) in enumerate(operations):
+            m, n, upserted_id, _, _ = self.update(collection, query, update, upsert, commit=False)
+            matched += m
+            modified += n
+            if upserted_id is not None:
+                upserted_ids[index] = upserted_id
+        self.conn.commit()
+        return matched, modified, upserted_ids
+
+    def delete(self, collection, query, multi=False, sort=None):
+        """Returns (deleted_count, first deleted document)"""
+        self._ensure_table(collection)
+        deleted = list(self.select(collection, query, sort, limit=0 if multi else 1, with_keys=True))
+        self.conn.executemany(f"DELETE FROM {self.table(collection)} WHERE _id = ?", [(key,) for key, _ in deleted])
+        self.conn.commit()
+        return len(deleted), (deleted[0][1] if deleted else None)
+
+    def close(self):
+        self.conn.close()
+
+
+# ============================================
+# Async (Motor-compatible) facade
+# ============================================
+
+class EmbeddedCursor:
+    def __init__(self, collection: "EmbeddedCollection", query=None, projection=None, pipeline=None):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._pipeline = pipeline
+        self._sort: List[tuple] = []
+        self._skip = 0
+        self._limit = 0
+        self._results: Optional[List[dict]] = None
+
+    def sort(self, key_or_list, direction: int = 1):
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def skip(self, count: int):
+        self._skip = count
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def batch_size(self, size: int):
+        return self
+
+    async def _load(self) -> List[dict]:
+        if self._results is None:
+            engine, name = self._collection._engine, self._collection.name
+            if self._pipeline is not None:
+                self._results = await self._collection._run(engine.aggregate, name, self._pipeline)
+            else:
+                self._results = await self._collection._run(
+                    engine.find, name, self._query, self._projection, self._sort, self._skip, self._limit
+                )
+        return self._results
+
+    async def explain(self) -> dict:
+        return await self._collection._run(
+            self._collection._engine.explain, self._collection.name, self._query, self._sort
+        )
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        results = await self._load()
+        return results[:length] if length else list(results)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in await self._load():
+            yield doc
+
+
+class EmbeddedCollection:
+    def __init__(self, database: "EmbeddedDatabase", name: str):
+        self.database = database
+        self.name = f"{database.name}.{name}"
+        self._engine = database.client._engine
+
+    async def _run(self, fn, *args, **kwargs):
+        return await self.database.client._run(fn, *args, **kwargs)
+
+    def with_options(self, **kwargs):
+        # Write concern has no meaning for a single embedded node
+        return self
+
+    # ----------------- READS -----------------
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None, skip: int = 0, limit: int = 0):
+        cursor = EmbeddedCursor(self, filter, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None, sort=None):
+        return await self._run(self._engine.find_one, self.name, filter, projection, sort)
+
+    async def count_documents(self, filter: dict) -> int:
+        return await self._run(self._engine.count, self.name, filter)
+
+    async def estimated_document_count(self) -> int:
+        return await self._run(self._engine.count, self.name, None)
+
+    def aggregate(self, pipeline: List[dict]):
+        return EmbeddedCursor(self, pipeline=pipeline)
+
+    # ----------------- WRITES -----------------
+    async def insert_one(self, document: dict):
+        ids = await self._run(self._engine.insert_many, self.name, [document])
+        return InsertOneResult(ids[0])
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True):
+        return InsertManyResult(await self._run(self._engine.insert_many, self.name, list(documents)))
+
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False):
+        matched, modified, upserted_id, _, _ = await self._run(self._engine.update, self.name, filter, update, upsert)
+        return UpdateResult(matched, modified, upserted_id)
+
+    async def update_many(self, filter: dict, update: dict, upsert: bool = False):
+        matched, modified, upserted_id, _, _ = await self._run(self._engine.update, self.name, filter, update, upsert, True)
+        return UpdateResult(matched, modified, upserted_id)
+
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False):
+        matched, modified, upserted_id, _, _ = await self._run(self._engine.update, self.name, filter, replacement, upsert)
+        return UpdateResult(matched, modified, upserted_id)
+
+    async def bulk_write(self, requests: list, ordered: bool = True):
+        """pymongo UpdateOne/ReplaceOne requests, applied in order in one transaction"""
+        operations = []
+        for request in requests:
+            if type(request).__name__ not in ("UpdateOne", "ReplaceOne"):
+                raise NotImplementedError(f"Unsupported bulk operation: {type(request).__name__}")
+            # pymongo keeps the arguments on the request object
+            operations.append((request._filter, request._doc, bool(request._upsert)))
+        matched, modified, upserted_ids = await self._run(self._engine.bulk_update, self.name, operations)
+        return BulkWriteResult(matched, modified, upserted_ids)
+
+    async def find_one_and_update(
+        self, filter: dict, update: dict, projection: Optional[dict] = None,
+        sort=None, upsert: bool = False, return_document: bool = False
+    ):
+        # return_document follows pymongo.ReturnDocument (BEFORE=False, AFTER=True)
+        _, _, _, before, after = await self._run(self._engine.update, self.name, filter, update, upsert, False, sort)
+        return project(copy.deepcopy(after if return_document else before), projection)
+
+    async def find_one_and_replace(self, filter: dict, replacement: dict, projection=None, sort=None, upsert=False, return_document=False):
+        return await self.find_one_and_update(filter, replacement, projection, sort, upsert, return_document)
+
+    async def find_one_and_delete(self, filter: dict, projection: Optional[dict] = None, sort=None):
+        _, doc = await self._run(self._engine.delete, self.name, filter, False, sort)
+        return project(doc, projection)
+
+    async def delete_one(self, filter: dict):
+        count, _ = await self._run(self._engine.delete, self.name, filter)
+        return DeleteResult(count)
+
+    async def delete_many(self, filter: dict):
+        count, _ = await self._run(self._engine.delete, self.name, filter, True)
+        return DeleteResult(count)
+
+    # ----------------- INDEXES -----------------
+    async def create_index(self, keys, **kwargs) -> str:
+        return await self._run(self._engine.create_index, self.name, keys, **kwargs)
+
+    async def index_information(self) -> Dict[str, dict]:
+        return await self._run(self._engine.index_information, self.name)
+
+    async def drop_index(self, name: str):
+        await self._run(self._engine.drop_index, self.name, name)
+
+    async def drop(self):
+        await self._run(self._engine.drop, self.name)
+
+
+class EmbeddedDatabase:
+    def __init__(self, client: "EmbeddedClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, EmbeddedCollection] = {}
+
+    def __getitem__(self, name: str) -> EmbeddedCollection:
+        if name not in self._collections:
+            self._collections[name] = EmbeddedCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> EmbeddedCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command, *args, **kwargs):
+        if command == "ping":
+            return {"ok": 1.0}
+        raise NotImplementedError(f"Unsupported command: {command}")
+
+    async def list_collection_names(self) -> List[str]:
+        prefix = f"{self.name}."
+        names = await self.client._run(self.client._engine.collection_names)
+        return [n[len(prefix):] for n in names if n.startswith(prefix)]
+
+
+class EmbeddedClient:
+    """Drop-in for AsyncIOMotorClient backed by one SQLite file (or ':memory:')"""
+
+    def __init__(self, path: str = ":memory:"):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-store")
+        self._engine = self._executor.submit(Engine, path).result()
+        self._databases: Dict[str, EmbeddedDatabase] = {}
+
+    def __getitem__(self, name: str) -> EmbeddedDatabase:
+        if name not in self._databases:
+            self._databases[name] = EmbeddedDatabase(self, name)
+        return self._databases[name]
+
+    async def _run(self, fn, *args, **kwargs):
+        """Run fn on the engine thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args, **kwargs))
+
+    @property
+    def admin(self) -> EmbeddedDatabase:
+        return self["admin"]
+
+    def close(self):
+        self._executor.submit(self._engine.close).result()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,64 @@
+# backend/storage.py
+# Storage backend selection.
+#
+# The collection classes in database.py talk to a Motor-style client, so any
+# client exposing the same subset of the API can back them:
+#   STORAGE_BACKEND=mongo   MongoDB through Motor (default)
+#   STORAGE_BACKEND=sqlite  embedded single-node engine (sqlite_store.py),
+#                           stored in SQLITE_PATH (":memory:" for throwaway runs)
+from typing import Any, List, Optional, Protocol
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "resume_analyzer.db")
+
+BACKENDS = ("mongo", "sqlite")
+
+
+class Cursor(Protocol):
+    def sort(self, key_or_list, direction: int = 1) -> "Cursor": ...
+    def skip(self, count: int) -> "Cursor": ...
+    def limit(self, count: int) -> "Cursor": ...
+    def batch_size(self, size: int) -> "Cursor": ...
+    async def to_list(self, length: Optional[int] = None) -> List[dict]: ...
+    async def explain(self) -> dict: ...
+    def __aiter__(self): ...
+
+
+class CollectionBackend(Protocol):
+    """The part of AsyncIOMotorCollection that database.py relies on (get_collection() returns one)"""
+
+    def with_options(self, **kwargs) -> "CollectionBackend": ...
+    def find(self, filter: Optional[dict] = None, projection: Optional[dict] = None) -> Cursor: ...
+    async def find_one(self, filter: Optional[dict] = None, projection: Optional[dict] = None) -> Optional[dict]: ...
+    async def count_documents(self, filter: dict) -> int: ...
+    def aggregate(self, pipeline: List[dict]) -> Cursor: ...
+    async def insert_one(self, document: dict) -> Any: ...
+    async def update_one(self, filter: dict, update: dict, upsert: bool = False) -> Any: ...
+    async def replace_one(self, filter: dict, replacement: dict, upsert: bool = False) -> Any: ...
+    async def find_one_and_update(self, filter: dict, update: dict, **kwargs) -> Optional[dict]: ...
+    async def find_one_and_delete(self, filter: dict, projection: Optional[dict] = None) -> Optional[dict]: ...
+    async def delete_one(self, filter: dict) -> Any: ...
+    async def delete_many(self, filter: dict) -> Any: ...
+    async def bulk_write(self, requests: list, ordered: bool = True) -> Any: ...
+    async def create_index(self, keys, **kwargs) -> str: ...
+    async def index_information(self) -> dict: ...
+
+
+def create_client(backend: Optional[str] = None, mongo_uri: Optional[str] = None, sqlite_path: Optional[str] = None):
+    """Client for the configured backend; client[name] gives a database handle"""
+    backend = (backend or STORAGE_BACKEND).lower()
+
+    if backend == "mongo":
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(mongo_uri)
+
+    if backend == "sqlite":
+        from sqlite_store import EmbeddedClient
+        return EmbeddedClient(sqlite_path or SQLITE_PATH)
+
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected one of {', '.join(BACKENDS)})")
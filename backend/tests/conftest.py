@@ -0,0 +1,6 @@
+# backend/tests/conftest.py
+# Tests import backend modules the way the app does (from the backend directory)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
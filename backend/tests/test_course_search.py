@@ -0,0 +1,38 @@
+# backend/tests/test_course_search.py
+# Course search index: matching and field filters.
+#
+#   cd backend && python -m pytest tests
+import pytest
+
+pytest.importorskip("streamlit")  # Courses.py, behind the catalog, imports it
+
+from course_search import CourseSearchIndex, catalog_courses, database_courses
+
+
+@pytest.fixture
+def index():
+    added = database_courses([
+        {"title": "Zebra Analytics Bootcamp", "url": "https://example.com/zebra", "field": "Data Science"},
+        {"title": "Zebra Layouts", "url": "https://example.com/layouts", "field": "UI/UX Design"},
+        {"title": "Zebra Gardening", "url": "https://example.com/garden", "field": "Gardening"},
+    ])
+    return CourseSearchIndex(catalog_courses() + added)
+
+
+def test_spaced_field_names_map_to_catalog_keys(index):
+    fields = {course["title"]: course["field"] for course in index.search("zebra", limit=10)}
+    assert fields == {
+        "Zebra Analytics Bootcamp": "data_science",
+        "Zebra Layouts": "ui_ux",
+        "Zebra Gardening": "gardening",
+    }
+
+
+@pytest.mark.parametrize("field", ["Data Science", "data_science", "datascience", "data-science"])
+def test_field_filter_accepts_aliases_and_display_names(index, field):
+    assert [course["title"] for course in index.search("zebra", field=field)] == ["Zebra Analytics Bootcamp"]
+
+
+def test_prefix_and_typo_matches(index):
+    assert index.search("zebr")[0]["title"].startswith("Zebra")
+    assert index.search("zerba analytics ")[0]["title"] == "Zebra Analytics Bootcamp"
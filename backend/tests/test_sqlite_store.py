@@ -0,0 +1,276 @@
+# backend/tests/test_sqlite_store.py
+# The embedded engine against the MongoDB semantics database.py relies on.
+# Every query runs twice - on an unindexed and on an indexed collection -
+# since indexed fields are pushed down to SQL and must not change results.
+#
+#   cd backend && python -m pytest tests
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from sqlite_store import EmbeddedClient
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def database():
+    client = EmbeddedClient(":memory:")
+    yield client["test"]
+    client.close()
+
+
+OID = ObjectId()
+DOCS = [
+    {"_id": 1, "name": "a", "score": 10, "tags": ["x", "y"], "meta": {"level": 1}, "ref": OID, "flag": True},
+    {"_id": 2, "name": "b", "score": 20, "tags": ["y"], "meta": {"level": 2}, "ref": str(OID), "flag": 1},
+    {"_id": 3, "name": "c", "score": 30, "tags": [], "meta": {"level": 3}, "ref": None},
+    {"_id": 4, "name": "d", "score": 25.5, "date": datetime(2024, 1, 1)},
+]
+
+
+async def _seeded(database, indexed: bool):
+    collection = database["indexed" if indexed else "plain"]
+    if indexed:
+        for field in ("name", "score", "meta.level", "ref", "flag", "date"):
+            await collection.create_index([(field, ASCENDING)])
+    await collection.insert_many([dict(doc) for doc in DOCS])
+    return collection
+
+
+async def _ids(collection, query, sort=None):
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    return [doc["_id"] async for doc in cursor]
+
+
+# ----------------- FILTER OPERATORS -----------------
+@pytest.mark.parametrize("indexed", [False, True])
+@pytest.mark.parametrize("query, expected", [
+    ({"name": "b"}, [2]),
+    ({"score": {"$gt": 20}}, [3, 4]),
+    ({"score": {"$gte": 20, "$lt": 30}}, [2, 4]),
+    ({"score": {"$in": [10, 30]}}, [1, 3]),
+    ({"score": {"$nin": [10, 30]}}, [2, 4]),
+    ({"name": {"$ne": "a"}}, [2, 3, 4]),
+    ({"meta.level": {"$lte": 2}}, [1, 2]),
+    ({"tags": "y"}, [1, 2]),
+    ({"date": {"$exists": True}}, [4]),
+    ({"ref": None}, [3, 4]),
+    ({"$or": [{"name": "a"}, {"score": 30}]}, [1, 3]),
+    ({"$nor": [{"name": "a"}, {"score": {"$gte": 25}}]}, [2]),
+    ({"date": {"$lt": datetime(2025, 1, 1)}}, [4]),
+])
+def test_filter_operators(database, indexed, query, expected):
+    async def check():
+        collection = await _seeded(database, indexed)
+        assert sorted(await _ids(collection, query)) == expected
+    run(check())
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_objectid_never_matches_its_hex_string(database, indexed):
+    async def check():
+        collection = await _seeded(database, indexed)
+        assert await _ids(collection, {"ref": OID}) == [1]
+        assert await _ids(collection, {"ref": str(OID)}) == [2]
+    run(check())
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_bool_never_matches_int(database, indexed):
+    async def check():
+        collection = await _seeded(database, indexed)
+        assert await _ids(collection, {"flag": True}) == [1]
+        assert await _ids(collection, {"flag": 1}) == [2]
+    run(check())
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_dates_compare_at_bson_precision(database, indexed):
+    # BSON keeps milliseconds: a date read back (or sent with extra
+    # microseconds) must find the document it came from
+    async def check():
+        collection = database["dates"]
+        if indexed:
+            await collection.create_index([("at", ASCENDING)])
+        written = datetime(2024, 1, 1, 12, 0, 0, 123456)
+        await collection.insert_many([{"_id": 1, "at": written}, {"_id": 2, "at": datetime(2024, 1, 1, 12, 0, 0, 124000)}])
+        stored = (await collection.find_one({"_id": 1}))["at"]
+        assert stored == datetime(2024, 1, 1, 12, 0, 0, 123000)
+        assert await _ids(collection, {"at": stored}) == [1]
+        assert await _ids(collection, {"at": written}) == [1]
+        assert await _ids(collection, {"at": {"$lte": stored}}) == [1]
+        assert await _ids(collection, {"at": {"$lt": stored}}) == []
+    run(check())
+
+
+# ----------------- SORT ORDER -----------------
+@pytest.mark.parametrize("indexed", [False, True])
+def test_sort_numbers(database, indexed):
+    async def check():
+        collection = await _seeded(database, indexed)
+        assert await _ids(collection, {}, [("score", ASCENDING)]) == [1, 2, 4, 3]
+        assert await _ids(collection, {}, [("score", DESCENDING)]) == [3, 4, 2, 1]
+    run(check())
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_sort_mixed_types_in_bson_order(database, indexed):
+    # null < numbers < strings < ObjectId < bool < date
+    async def check():
+        collection = database["mixed"]
+        if indexed:
+            await collection.create_index([("v", ASCENDING)])
+        values = [datetime(2024, 1, 1), True, OID, "text", 5, None]
+        await collection.insert_many([{"_id": i, "v": value} for i, value in enumerate(values)])
+        assert await _ids(collection, {}, [("v", ASCENDING)]) == [5, 4, 3, 2, 1, 0]
+    run(check())
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_sort_history_order_with_id_tie_breaker(database, indexed):
+    async def check():
+        collection = database["history"]
+        if indexed:
+            await collection.create_index([("user_id", ASCENDING), ("analysis_date", DESCENDING), ("_id", DESCENDING)])
+        ids = [ObjectId() for _ in range(4)]
+        dates = [datetime(2024, 1, 1), datetime(2024, 1, 2), datetime(2024, 1, 2), datetime(2024, 1, 3)]
+        await collection.insert_many([
+            {"_id": doc_id, "user_id": "u", "analysis_date": date} for doc_id, date in zip(ids, dates)
+        ])
+        sort = [("analysis_date", DESCENDING), ("_id", DESCENDING)]
+        assert await _ids(collection, {"user_id": "u"}, sort) == [ids[3], ids[2], ids[1], ids[0]]
+    run(check())
+
+
+# ----------------- UNIQUE INDEXES -----------------
+def test_unique_index_rejects_duplicates(database):
+    async def check():
+        users = database["users"]
+        await users.create_index([("email", ASCENDING)], unique=True)
+        await users.insert_one({"email": "a@example.com"})
+        with pytest.raises(DuplicateKeyError):
+            await users.insert_one({"email": "a@example.com"})
+        other = await users.insert_one({"email": "b@example.com"})
+        with pytest.raises(DuplicateKeyError):
+            await users.update_one({"_id": other.inserted_id}, {"$set": {"email": "a@example.com"}})
+        assert await users.count_documents({}) == 2
+    run(check())
+
+
+def test_unique_index_keeps_types_apart(database):
+    async def check():
+        collection = database["refs"]
+        await collection.create_index([("ref", ASCENDING)], unique=True)
+        await collection.insert_many([{"ref": OID}, {"ref": str(OID)}, {"ref": True}, {"ref": 1}])
+        assert await collection.count_documents({}) == 4
+    run(check())
+
+
+def test_unique_index_allows_one_missing_key(database):
+    async def check():
+        users = database["users"]
+        await users.create_index([("email", ASCENDING)], unique=True)
+        await users.insert_one({"name": "no email"})
+        with pytest.raises(DuplicateKeyError):
+            await users.insert_one({"email": None})
+        # Rewriting the document that holds the null is not a conflict
+        await users.update_one({"name": "no email"}, {"$set": {"name": "still none"}})
+        assert await users.count_documents({}) == 1
+    run(check())
+
+
+def test_compound_unique_index_compares_nulls(database):
+    async def check():
+        collection = database["pairs"]
+        await collection.create_index([("a", ASCENDING), ("b", ASCENDING)], unique=True)
+        await collection.insert_one({"a": 1})
+        await collection.insert_one({"a": 2})
+        with pytest.raises(DuplicateKeyError):
+            await collection.insert_one({"a": 1, "b": None})
+    run(check())
+
+
+def test_unique_index_build_fails_on_duplicate_nulls(database):
+    async def check():
+        users = database["users"]
+        await users.insert_many([{"name": "x"}, {"name": "y"}])
+        with pytest.raises(DuplicateKeyError):
+            await users.create_index([("email", ASCENDING)], unique=True)
+        assert "email_1" not in await users.index_information()
+    run(check())
+
+
+# ----------------- find_one_and_* -----------------
+def test_find_one_and_update_returns_before_or_after(database):
+    async def check():
+        collection = database["counters"]
+        await collection.insert_one({"_id": "c", "n": 1, "other": "x"})
+        before = await collection.find_one_and_update({"_id": "c"}, {"$inc": {"n": 1}}, projection={"n": 1})
+        assert before == {"_id": "c", "n": 1}
+        after = await collection.find_one_and_update(
+            {"_id": "c"}, {"$inc": {"n": 1}}, return_document=ReturnDocument.AFTER
+        )
+        assert after["n"] == 3
+        assert await collection.find_one_and_update({"_id": "missing"}, {"$inc": {"n": 1}}) is None
+    run(check())
+
+
+def test_find_one_and_update_upsert(database):
+    async def check():
+        collection = database["users"]
+        await collection.create_index([("email", ASCENDING)], unique=True)
+        update = {"$setOnInsert": {"name": "new"}, "$max": {"last_login": datetime(2024, 1, 1)}}
+        created = await collection.find_one_and_update(
+            {"email": "a@example.com"}, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        assert created["email"] == "a@example.com" and created["name"] == "new"
+        update["$setOnInsert"]["name"] = "ignored"
+        again = await collection.find_one_and_update(
+            {"email": "a@example.com"}, update, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        assert again["_id"] == created["_id"] and again["name"] == "new"
+        assert await collection.count_documents({}) == 1
+    run(check())
+
+
+def test_find_one_and_delete_uses_sort_and_projection(database):
+    async def check():
+        collection = database["queue"]
+        await collection.insert_many([{"_id": i, "priority": p, "body": "x"} for i, p in enumerate([2, 1, 3])])
+        deleted = await collection.find_one_and_delete({}, projection={"priority": 1}, sort=[("priority", ASCENDING)])
+        assert deleted == {"_id": 1, "priority": 1}
+        assert await _ids(collection, {}, [("_id", ASCENDING)]) == [0, 2]
+        assert await collection.find_one_and_delete({"_id": 99}) is None
+    run(check())
+
+
+# ----------------- BULK WRITES / CATALOG -----------------
+def test_bulk_write_update_one(database):
+    async def check():
+        collection = database["scores"]
+        await collection.insert_many([{"_id": i, "score": 0} for i in range(3)])
+        result = await collection.bulk_write(
+            [UpdateOne({"_id": i}, {"$set": {"score": i * 10}}) for i in range(3)]
+            + [UpdateOne({"_id": 9}, {"$set": {"score": 90}}, upsert=True)],
+            ordered=False,
+        )
+        assert (result.matched_count, result.modified_count, result.upserted_count) == (3, 2, 1)
+        assert [doc["score"] async for doc in collection.find({}).sort("_id", ASCENDING)] == [0, 10, 20, 90]
+    run(check())
+
+
+def test_list_collection_names_has_no_side_effects(database):
+    async def check():
+        await database["one"].insert_one({"x": 1})
+        assert await database.list_collection_names() == ["one"]
+        assert await database.list_collection_names() == ["one"]
+    run(check())
@@ -0,0 +1,84 @@
+# backend/tests/test_user_stats.py
+# The per-user rollup under concurrent writes, on the embedded engine.
+#
+#   cd backend && python -m pytest tests
+import asyncio
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from database import db, ResumeAnalysesCollection, UserStatsCollection
+from sqlite_store import EmbeddedClient
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def store():
+    db.client = EmbeddedClient(":memory:")
+    db.db = db.client["test"]
+    yield db.db
+    db.client.close()
+    db.client = db.db = None
+
+
+def _analysis(user_id: str, score: int) -> dict:
+    return {
+        "user_id": user_id,
+        "resume_score": score,
+        "predicted_field": "Data Science",
+        "skills": ["python", "sql"],
+        "analysis_date": datetime.utcnow(),
+    }
+
+
+def test_concurrent_first_analyses_are_counted_once(store, monkeypatch):
+    # B's $inc only lands after A's rebuild of the new rollup has finished -
+    # the rebuild has already seen B's inserted analysis by then
+    record = UserStatsCollection.record_analysis
+    first_done = asyncio.Event()
+
+    async def ordered_record(analysis, rebuild=False):
+        if not rebuild:
+            await first_done.wait()
+        await record(analysis, rebuild=rebuild)
+        if rebuild:
+            first_done.set()
+
+    monkeypatch.setattr(UserStatsCollection, "record_analysis", ordered_record)
+
+    async def check():
+        user_id = str(ObjectId())
+        await asyncio.gather(
+            ResumeAnalysesCollection.save_user_analysis(_analysis(user_id, 60)),
+            ResumeAnalysesCollection.save_user_analysis(_analysis(user_id, 80)),
+        )
+        summary = await UserStatsCollection.get_summary(user_id)
+        assert summary["total_analyses"] == 2
+        assert summary["average_score"] == 70
+        assert summary["skill_frequency"] == {"python": 2, "sql": 2}
+
+        stored = await UserStatsCollection.get_collection().find_one({"_id": user_id})
+        assert stored["total_analyses"] == 2 and stored["pending"] == 0 and not stored.get("stale")
+    run(check())
+
+
+def test_concurrent_inserts_and_deletes_keep_the_rollup_exact(store):
+    async def check():
+        user_id = str(ObjectId())
+        saved = await asyncio.gather(*(
+            ResumeAnalysesCollection.save_user_analysis(_analysis(user_id, score)) for score in range(50, 60)
+        ))
+        await asyncio.gather(
+            *(ResumeAnalysesCollection.delete_user_analysis(doc["id"], user_id) for doc in saved[:4]),
+            *(ResumeAnalysesCollection.save_user_analysis(_analysis(user_id, 90)) for _ in range(3)),
+            UserStatsCollection.rebuild(user_id),
+        )
+        summary = await UserStatsCollection.get_summary(user_id)
+        assert summary["total_analyses"] == 9
+        assert summary["best_score"] == 90
+        assert summary["skill_frequency"] == {"python": 9, "sql": 9}
+    run(check())
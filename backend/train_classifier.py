@@ -0,0 +1,72 @@
+# backend/train_classifier.py
+# Offline training for the field classifier (see field_classifier.py).
+#
+#   python train_classifier.py labeled.csv                   # columns: text, field
+#   python train_classifier.py labeled.jsonl                 # {"text": ..., "field": ...} per line
+#   python train_classifier.py labeled.csv --test-size 0.2   # hold-out report before the final fit
+#   python train_classifier.py labeled.csv --output /models/field_classifier.joblib
+#
+# Labels must be analyzer field names (Data Science, Web Development, ...).
+# The final model is fit on all rows and written atomically, so workers
+# that start during training load either the old or the new file.
+from collections import Counter
+import argparse
+import csv
+import json
+import sys
+import time
+
+from analyzer import FIELD_KEYWORDS
+from field_classifier import FIELD_MODEL_PATH, predict_fields, save_model, train
+
+
+def load_examples(path: str):
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            csv.field_size_limit(sys.maxsize)
+            rows = csv.DictReader(f)
+        for row in rows:
+            if row.get("text") and row.get("field"):
+                texts.append(row["text"])
+                labels.append(row["field"].strip())
+    return texts, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the resume field classifier")
+    parser.add_argument("data", help="Labeled resumes (.csv with text,field columns or .jsonl)")
+    parser.add_argument("--output", default=FIELD_MODEL_PATH)
+    parser.add_argument("--test-size", type=float, default=0.0, help="Hold-out share for an evaluation report")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    texts, labels = load_examples(args.data)
+    unknown = sorted(set(labels) - set(FIELD_KEYWORDS))
+    if unknown:
+        sys.exit(f"❌ Unknown field labels: {', '.join(unknown)} (expected one of: {', '.join(FIELD_KEYWORDS)})")
+    if len(set(labels)) < 2:
+        sys.exit("❌ Need examples of at least two fields")
+    print(f"📄 {len(texts)} examples: " + ", ".join(f"{field} {count}" for field, count in Counter(labels).most_common()))
+
+    if args.test_size:
+        from sklearn.metrics import classification_report
+        from sklearn.model_selection import train_test_split
+
+        train_texts, test_texts, train_labels, test_labels = train_test_split(
+            texts, labels, test_size=args.test_size, random_state=args.seed, stratify=labels
+        )
+        model = train(train_texts, train_labels)
+        predicted = [p["field"] for p in predict_fields(test_texts, model)]
+        print(classification_report(test_labels, predicted, digits=3))
+
+    started = time.monotonic()
+    model = train(texts, labels)
+    save_model(model, args.output)
+    print(f"🏁 Trained on {len(texts)} resumes in {time.monotonic() - started:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
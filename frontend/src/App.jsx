@@ -6,7 +6,7 @@ import RegisterPage from './components/RegisterPage';
 import ResumeUpload from './components/ResumeUpload';
 import Tabs from './components/Tabs';
 import Navbar from './components/Navbar';
-import { updateProfile } from './api';
+import { updateProfile, refreshAccessToken } from './api';
 import './App.css';
 
 function App() {
@@ -77,13 +77,18 @@ useEffect(() => {
 }, []);
 
 
-// 2️⃣ Handle OAuth redirect token
+// 2️⃣ Handle OAuth redirect token (sent in the URL fragment, which never
+// reaches servers, proxies or Referer headers)
 useEffect(() => {
-  const params = new URLSearchParams(window.location.search);
+  const params = new URLSearchParams(window.location.hash.slice(1));
   const token = params.get("token");
+  const refreshToken = params.get("refresh_token");
 
   if (token) {
     localStorage.setItem("access_token", token);
+    if (refreshToken) {
+      localStorage.setItem("refresh_token", refreshToken);
+    }
     
     // Fetch user profile from /me endpoint
     fetch('http://localhost:8000/api/auth/me', {
@@ -117,9 +122,10 @@ useEffect(() => {
 useEffect(() => {
   if (!isAuthenticated) return;
 
+  // Access tokens expire after 15 minutes - renew well before that
   const refreshInterval = setInterval(() => {
     refreshToken();
-  }, 30 * 60 * 1000);
+  }, 10 * 60 * 1000);
 
   return () => clearInterval(refreshInterval);
 }, [isAuthenticated]);
@@ -127,28 +133,18 @@ useEffect(() => {
 
   // Function to refresh token
   const refreshToken = async () => {
-    const refreshToken = localStorage.getItem('refresh_token');
-    if (!refreshToken || !isAuthenticated) return;
+    if (!localStorage.getItem('refresh_token') || !isAuthenticated) return;
 
+    // Same single-flight refresh the api.js 401 interceptor uses
     try {
-      const response = await fetch('http://localhost:8000/api/auth/refresh', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ refresh_token: refreshToken })
-      });
-
-      if (response.ok) {
-        const data = await response.json();
-        localStorage.setItem('access_token', data.access_token);
-        console.log('Token refreshed successfully');
-      } else {
-        // If refresh fails, logout
-        handleLogout();
-      }
+      await refreshAccessToken();
+      console.log('Token refreshed successfully');
     } catch (error) {
       console.error('Token refresh failed:', error);
+      // Rejected refresh token: logout
+      if (error.response?.status === 401) {
+        handleLogout();
+      }
     }
   };
 
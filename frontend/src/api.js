@@ -27,15 +27,49 @@ api.interceptors.request.use(
   }
 );
 
+// Exchange the refresh token for a new access token. Concurrent 401s share
+// one in-flight request, so a burst of expired calls refreshes only once.
+let refreshPromise = null;
+const NO_REFRESH_URLS = ['/api/auth/login', '/api/auth/register', '/api/auth/refresh'];
+
+export function refreshAccessToken() {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    refreshPromise = (refreshToken
+      ? axios.post(`${API_URL}/api/auth/refresh`, { refresh_token: refreshToken }, { timeout: 10000 })
+          .then((response) => {
+            localStorage.setItem('access_token', response.data.access_token);
+            return response.data.access_token;
+          })
+      : Promise.reject(new Error('No refresh token'))
+    ).finally(() => {
+      refreshPromise = null;
+    });
+  }
+  return refreshPromise;
+}
+
 // Response interceptor for error handling
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
-    // Handle 401 Unauthorized
+  async (error) => {
+    const original = error.config;
+    // Handle 401 Unauthorized: refresh once and retry the request
     if (error.response?.status === 401) {
+      if (original && !original._retry && !NO_REFRESH_URLS.includes(original.url)) {
+        original._retry = true;
+        try {
+          const token = await refreshAccessToken();
+          original.headers.Authorization = `Bearer ${token}`;
+          return api(original);
+        } catch (refreshError) {
+          // Fall through: the refresh token is missing, expired or revoked
+        }
+      }
       console.warn("Authentication expired, redirecting to login...");
       // Clear tokens
       localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
       // Redirect to login
       window.location.href = '/login';
@@ -135,14 +169,20 @@ export async function downloadReport(resultData) {
   try {
     console.log("Starting download with data:", resultData);
     
-    const response = await api.post(
-      "/download-report",
-      resultData,
-      { 
-        responseType: "blob",
-        timeout: 30000
-      }
-    );
+    // Saved analyses are rendered from the stored copy; unsaved ones are posted
+    const response = resultData.id
+      ? await api.get(`/resume/${resultData.id}/report`, {
+          responseType: "blob",
+          timeout: 30000
+        })
+      : await api.post(
+          "/download-report",
+          resultData,
+          { 
+            responseType: "blob",
+            timeout: 30000
+          }
+        );
 
     if (!response.data || response.data.size === 0) {
       throw new Error("Empty response from server");
@@ -191,6 +231,9 @@ export async function login(email, password) {
     // Store token if received
     if (response.data.access_token) {
       localStorage.setItem('access_token', response.data.access_token);
+      if (response.data.refresh_token) {
+        localStorage.setItem('refresh_token', response.data.refresh_token);
+      }
       localStorage.setItem('user', JSON.stringify(response.data.user));
     } 
     return response.data;
@@ -260,10 +303,10 @@ export function logout() {
 // ---------------------------------------------
 // 6) Resume History APIs - ADD THESE
 // ---------------------------------------------
-export async function getResumeHistory(page = 1, limit = 10) {
-  const response = await api.get("/resume/history", {
-    params: { page, limit }
-  });
+export async function getResumeHistory(limit = 10, cursor = null) {
+  // Pass the previous page's next_cursor to continue the listing
+  const params = cursor ? { limit, cursor } : { limit };
+  const response = await api.get("/resume/history", { params });
   return response.data;
 }
 
@@ -272,4 +315,21 @@ export async function getAnalysisById(id) {
   return response.data;
 }
 
+// ---------------------------------------------
+// 7) Course APIs
+// ---------------------------------------------
+export async function getCourses(field) {
+  const response = await api.get(`/api/courses/${field}`);
+  return response.data;
+}
+
+export async function searchCourses(query, limit = 20, signal) {
+  // Pass an AbortSignal to cancel the request when a newer query replaces it
+  const response = await api.get("/api/courses/search", {
+    params: { q: query, limit },
+    signal
+  });
+  return response.data;
+}
+
 export default api;
\ No newline at end of file
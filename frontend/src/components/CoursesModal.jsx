@@ -1,14 +1,39 @@
 // frontend/src/components/CoursesModal.jsx
 import React, { useEffect, useState } from 'react';
+import axios from 'axios';
+import { getCourses, searchCourses } from '../api';
 
 export default function CoursesModal({ field, displayField, onClose }) {
   const [courses, setCourses] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [query, setQuery] = useState('');
 
   useEffect(() => {
-    fetchCourses();
-  }, [field]);
+    if (!query.trim()) {
+      fetchCourses();
+      return;
+    }
+    // Search runs on every keystroke; drop responses for outdated queries
+    const controller = new AbortController();
+    runSearch(query, controller.signal);
+    return () => controller.abort();
+  }, [field, query]);
+
+  const runSearch = async (text, signal) => {
+    try {
+      setError(null);
+      const data = await searchCourses(text, 20, signal);
+      // Same [name, url] shape as the Courses.py lists
+      setCourses(data.courses.map(course => [course.title, course.url]));
+    } catch (error) {
+      if (!axios.isCancel(error)) {
+        setError(`Failed to search courses: ${error.message}`);
+      }
+    } finally {
+      setLoading(false);
+    }
+  };
 
   const fetchCourses = async () => {
     try {
@@ -16,17 +41,7 @@ export default function CoursesModal({ field, displayField, onClose }) {
       setError(null);
       
       // Use the specific courses endpoint
-      const backendUrl = import.meta.env.VITE_BACKEND_UR || 'http://localhost:8000';
-      const response = await fetch(`${backendUrl}/api/courses/${field}`);
-      
-      console.log('Courses API Response Status:', response.status);
-      console.log('Courses API URL:', `${backendUrl}/api/courses/${field}`);
-      
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
-      
-      const data = await response.json();
+      const data = await getCourses(field);
       console.log('Courses API Data:', data);
       
       // Handle both array formats from your Courses.py
@@ -99,6 +114,13 @@ export default function CoursesModal({ field, displayField, onClose }) {
             <p className="text-blue-100 text-sm">
               Curated learning resources to enhance your skills
             </p>
+            <input
+              type="search"
+              value={query}
+              onChange={e => setQuery(e.target.value)}
+              placeholder="Search all courses, e.g. machine learning"
+              className="mt-4 w-full max-w-md px-4 py-2 rounded-lg text-slate-800 placeholder-slate-400 focus:outline-none focus:ring-2 focus:ring-white/60"
+            />
           </div>
           <button 
             className="text-white hover:bg-white/20 rounded-full w-10 h-10 flex items-center justify-center transition-all duration-200 text-2xl font-light ml-4"
@@ -228,7 +250,7 @@ export default function CoursesModal({ field, displayField, onClose }) {
         ) : (
           <div className="flex flex-col items-center justify-center py-20 text-center">
             <div className="text-6xl mb-4">📭</div>
-            <p className="text-xl font-semibold text-slate-800 mb-2">No courses found for "{displayField || field}"</p>
+            <p className="text-xl font-semibold text-slate-800 mb-2">No courses found for "{query || displayField || field}"</p>
             <p className="text-slate-600 mb-6">Try refreshing or select a different field.</p>
             <button 
               className="px-6 py-3 bg-gradient-to-r from-blue-600 to-indigo-600 text-white rounded-lg font-medium shadow-md hover:shadow-lg transition-all duration-200"
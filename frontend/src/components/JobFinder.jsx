@@ -1,24 +1,36 @@
 // frontend/src/components/JobFinder.jsx
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import axios from "axios";
 
-export default function JobFinder({ resumeText, skills, onMatch }) {
-  const [query, setQuery] = useState("software developer");
-  const [location, setLocation] = useState("India");
+// Same defaults the backend uses when it prefetches jobs after an analysis
+const defaultQuery = (predictedField) =>
+  predictedField && predictedField !== "Not Detected" ? predictedField : "software developer";
+
+const defaultLocation = () => {
+  try {
+    return JSON.parse(localStorage.getItem("user"))?.location || "India";
+  } catch {
+    return "India";
+  }
+};
+
+export default function JobFinder({ resumeText, skills, predictedField, suggestedQueries = [], onMatch }) {
+  const [query, setQuery] = useState(defaultQuery(predictedField));
+  const [location, setLocation] = useState(defaultLocation);
   const [jobs, setJobs] = useState([]);
   const [loading, setLoading] = useState(false);
   const [matchingJobId, setMatchingJobId] = useState(null); // Track which job is being matched
   const [error, setError] = useState("");
 
   // 🔍 Fetch Jobs From Backend
-  const searchJobs = async () => {
+  const searchJobs = async (searchQuery = query) => {
     try {
       setLoading(true);
       setError("");
 
       const res = await axios.get("http://127.0.0.1:8000/job-search", {
-        params: { query, location },
+        params: { query: searchQuery, location },
       });
 
       setJobs(res.data.jobs || res.data.data || []);
@@ -29,11 +41,34 @@ export default function JobFinder({ resumeText, skills, onMatch }) {
     }
   };
 
+  // Suggested searches are the exact queries the backend prefetched
+  const runSuggestedQuery = (suggested) => {
+    setQuery(suggested);
+    searchJobs(suggested);
+  };
+
+  // First load is usually served from the prefetched cache
+  useEffect(() => {
+    if (predictedField && predictedField !== "Not Detected") {
+      searchJobs();
+    }
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, []);
+
   // 🎯 Match Resume with Selected Job - UPDATED VERSION
-const matchWithJob = async (jobDesc, jobIndex, jobTitle) => {
+const matchWithJob = async (job, jobIndex, jobTitle) => {
   try {
     setMatchingJobId(jobIndex);
 
+    // List results only carry a description snippet - fetch the full one
+    let jobDesc = job.job_description;
+    if (job.job_id) {
+      const details = await axios.get("http://127.0.0.1:8000/job-details", {
+        params: { job_id: job.job_id },
+      });
+      jobDesc = details.data.job_description || jobDesc;
+    }
+
     const requestData = {
       resume_text: resumeText || "",
       job_description: jobDesc || "",
@@ -95,7 +130,7 @@ return (
               ? 'bg-slate-600 cursor-not-allowed'
               : 'bg-gradient-to-r from-indigo-600 to-purple-600 hover:shadow-lg hover:-translate-y-0.5'
           }`}
-          onClick={searchJobs} 
+          onClick={() => searchJobs()} 
           disabled={loading}
         >
           {loading ? (
@@ -112,6 +147,22 @@ return (
         </button>
       </div>
 
+      {/* Suggested Searches */}
+      {suggestedQueries.length > 0 && (
+        <div className="flex flex-wrap gap-2 -mt-3 mb-6">
+          {suggestedQueries.map((suggested) => (
+            <button
+              key={suggested}
+              className="px-3 py-1 rounded-full text-sm bg-slate-700 text-slate-200 border border-slate-600 hover:border-blue-500 transition-colors duration-200"
+              onClick={() => runSuggestedQuery(suggested)}
+              disabled={loading}
+            >
+              {suggested}
+            </button>
+          ))}
+        </div>
+      )}
+
       {/* Error Message */}
       {error && (
         <div className="bg-red-900/20 border border-red-500/30 text-red-400 px-4 py-3 rounded-lg mb-4 flex items-center gap-2">
@@ -131,7 +182,7 @@ return (
 
         {jobs.map((job, idx) => (
           <div 
-            key={idx} 
+            key={job.job_id || idx} 
             className="bg-slate-700/50 rounded-xl p-5 border border-slate-600 hover:border-slate-500 transition-all duration-300 hover:shadow-xl"
           >
             <h3 className="text-xl font-bold text-white mb-2">
@@ -148,7 +199,7 @@ return (
             </p>
             
             <p className="text-slate-300 text-sm leading-relaxed mb-4 line-clamp-3">
-              {job.job_description?.slice(0, 200)}...
+              {job.job_description}
             </p>
 
             <button
@@ -157,7 +208,7 @@ return (
                   ? 'bg-slate-600 cursor-not-allowed'
                   : 'bg-gradient-to-r from-green-600 to-emerald-600 hover:shadow-lg hover:-translate-y-0.5'
               }`}
-              onClick={() => matchWithJob(job.job_description, idx, job.job_title)}
+              onClick={() => matchWithJob(job, idx, job.job_title)}
               disabled={matchingJobId === idx}
             >
               {matchingJobId === idx ? (
@@ -120,6 +120,8 @@ return (
             <JobFinder
               resumeText={result.raw_text}
               skills={result.skills}
+              predictedField={result.predicted_field}
+              suggestedQueries={result.job_queries}
               onMatch={handleJobFinderMatch}
             />
           </div>